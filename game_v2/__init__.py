@@ -1,5 +1,7 @@
-from .game import Game, GameEndCondition
-from .controller import BattleEnv
+from .game import Game, GameEndCondition, RoundResult
+from .controller import BattleEnv, Deal, DealBank
+from .duplicate import DuplicateEvaluation, paired_stats
+from .sweep import RacingSweep
 from .policy import *
 from .player import *
 from .card import *
@@ -1,11 +1,14 @@
 import itertools
-from .base import CardColor, CardType, Card, ActionCard, WeakActionCard, StrongActionCard
+from .base import CardColor, CardType, Card, ActionCard, WeakActionCard, StrongActionCard, num_card_ids
 from .number_card import NumberCard
 from .reverse_card import ReverseCard
 from .skip_card import SkipCard
 from .draw_two_card import DrawTwoCard
 from .draw_four_card import DrawFourCard
 from .wild_card import WildCard
+from .color_permutation import num_color_permutations, identity_permutation, inverse_permutations
+from .color_permutation import canonical_permutation, canonical_permutations
+from .color_permutation import permute_color, permute_card_id, permute_card_ids, permute_play_state
 
 
 def make_standard_deck():
@@ -34,3 +37,10 @@ def make_standard_unique_deck():
         )),
         [WildCard(), DrawFourCard()],  # 1 x (Wildcard + Draw4)
     ))
+
+
+unique_cards = make_standard_unique_deck()  # the card of each card id, shared wherever cards are rebuilt from ids
+
+
+def get_card_by_id(card_id):
+    return unique_cards[card_id]
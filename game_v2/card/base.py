@@ -5,6 +5,10 @@ from colorama import Fore, Back, Style
 
 init()
 
+# cards are identified by their position in the standard unique deck:
+# (0 - 9, Reverse, Skip, DrawTwo) * RGBY, Wild, DrawFour
+num_card_ids = 54
+
 colormap = {
     "WILD": Fore.BLACK + Back.WHITE,
     "RED": Fore.LIGHTRED_EX,
@@ -61,6 +65,7 @@ class Card(object):
         self.color = color
         self.score = score
         self.short_name = None  # to be overriden
+        self.card_id = None  # to be overriden
 
     def __repr__(self):
         return self.color("{}({})".format(type(self).__name__, self.format_attribute()))
@@ -0,0 +1,117 @@
+import itertools
+import numpy as np
+from .base import CardColor, num_card_ids
+
+
+# The rules are symmetric under any permutation of the 4 colors. A permutation is identified by its index
+# in `color_maps`, where color_maps[p][old color value] is the new color value (WILD is always kept).
+# Colored card ids are (color value - 1) * 13 + rank, the wild ones (52 and 53) are kept as well.
+num_colors = 4
+num_ranks = 13
+color_maps = np.array([(0,) + tuple(order) for order in itertools.permutations(range(1, num_colors + 1))],
+                      dtype=np.int64)
+num_color_permutations = len(color_maps)
+identity_permutation = 0
+
+_color_map_index = {tuple(color_map): p for p, color_map in enumerate(color_maps)}
+inverse_permutations = np.array([_color_map_index[tuple(np.argsort(color_map))] for color_map in color_maps],
+                                dtype=np.int64)
+
+card_id_maps = np.tile(np.arange(num_card_ids, dtype=np.int64), (num_color_permutations, 1))
+for _p, _color_map in enumerate(color_maps):
+    for _card_id in range(num_colors * num_ranks):
+        _color, _rank = divmod(_card_id, num_ranks)
+        card_id_maps[_p, _card_id] = (_color_map[_color + 1] - 1) * num_ranks + _rank
+_card_id_map_lists = [list(map(int, card_id_map)) for card_id_map in card_id_maps]
+_colors = [color for color in CardColor]
+
+
+def _color_keys(play_color_value, card_ids):
+    # one integer per color: whether it is the color of the play state, then the count of each rank as
+    # base-16 digits, so that colors with the same key are interchangeable
+    keys = [0] * (num_colors + 1)
+    for card_id in card_ids:
+        if card_id < num_colors * num_ranks:
+            color, rank = divmod(card_id, num_ranks)
+            keys[color + 1] += 1 << (4 * (num_ranks - 1 - rank))
+    if play_color_value is not None and play_color_value > 0:
+        keys[play_color_value] += 1 << (4 * num_ranks)
+    return keys
+
+
+def canonical_permutation(play_color, card_ids):
+    """Get the permutation mapping a decision to its canonical color ordering.
+
+    Parameters
+    ----------
+    play_color: CardColor | int | None
+        Color of the play state.
+
+    card_ids: iterable
+        Ids of the cards the decision depends on, e.g. the playable cards (at most 15 of each card).
+
+    Returns
+    -------
+    p: int
+        Index in `color_maps`. Colors are renamed by decreasing key (play color first, then the counts
+        of the ranks), so decisions equal up to a color permutation get the same canonical form.
+    """
+    play_color_value = play_color.value if isinstance(play_color, CardColor) else play_color
+    keys = _color_keys(play_color_value, card_ids)
+    order = sorted(range(1, num_colors + 1), key=lambda color: -keys[color])  # stable for equal keys
+    color_map = [0] * (num_colors + 1)
+    for new_color, old_color in enumerate(order):
+        color_map[old_color] = new_color + 1
+    return _color_map_index[tuple(color_map)]
+
+
+def canonical_permutations(play_colors, card_offsets, card_ids):
+    """Vectorized `canonical_permutation` for a batch laid out as the chunks of `game_v2.io.ActionRecorder`.
+
+    `play_colors` are color values (-1 or 0 for none), and the card ids of decision i are
+    `card_ids[card_offsets[i]:card_offsets[i + 1]]`. Returns an array of permutation indices.
+    """
+    play_colors = np.asarray(play_colors, dtype=np.int64)
+    card_offsets = np.asarray(card_offsets, dtype=np.int64)
+    card_ids = np.asarray(card_ids, dtype=np.int64)
+    n = len(play_colors)
+
+    # count of each rank of each color in each decision
+    rows = np.repeat(np.arange(n), np.diff(card_offsets))
+    colored = card_ids < num_colors * num_ranks
+    counts = np.zeros((n, num_colors, num_ranks), dtype=np.int64)
+    np.add.at(counts, (rows[colored], card_ids[colored] // num_ranks, card_ids[colored] % num_ranks), 1)
+    assert counts.max(initial=0) < 16
+
+    keys = counts @ (1 << (4 * (num_ranks - 1 - np.arange(num_ranks, dtype=np.int64))))
+    has_color = play_colors > 0
+    keys[np.nonzero(has_color)[0], play_colors[has_color] - 1] += 1 << (4 * num_ranks)
+
+    order = np.argsort(-keys, axis=1, kind="stable")  # old colors (0-based) by new color
+    maps = np.zeros((n, num_colors + 1), dtype=np.int64)
+    maps[np.arange(n)[:, None], order + 1] = np.arange(1, num_colors + 1)
+    lookup = np.zeros((num_colors + 1,) * num_colors, dtype=np.int64)
+    lookup[tuple(color_maps[:, 1:].T)] = np.arange(num_color_permutations)
+    return lookup[tuple(maps[:, 1:].T)]
+
+
+def permute_color(p, color):
+    if color is None:
+        return None
+    return _colors[color_maps[p][color.value]]
+
+
+def permute_card_id(p, card_id):
+    return _card_id_map_lists[p][card_id]
+
+
+def permute_card_ids(p, card_ids):
+    return card_id_maps[p][np.asarray(card_ids, dtype=np.int64)]
+
+
+def permute_play_state(p, play_state):
+    if play_state is None:
+        return None
+    play_state = dict(play_state)
+    play_state["color"] = permute_color(p, play_state.get("color", None))
+    return play_state
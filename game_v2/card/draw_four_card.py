@@ -5,6 +5,7 @@ class DrawFourCard(StrongActionCard):
     def __init__(self):
         super().__init__(CardType.DRAW_4)
         self.short_name = "D4()"
+        self.card_id = 53
 
     def is_draw4(self):
         return True
@@ -5,6 +5,7 @@ class DrawTwoCard(WeakActionCard):
     def __init__(self, color):
         super().__init__(CardType.DRAW_2, color)
         self.short_name = "D2({})".format(self.color.name[0])
+        self.card_id = (self.color.value - 1) * 13 + 12
 
     def is_draw2(self):
         return True
@@ -8,6 +8,7 @@ class NumberCard(Card):
         super().__init__(CardType.NUMBER, color, num)
         self.num = num
         self.short_name = "N({}{})".format(self.color.name[0], self.num)
+        self.card_id = (self.color.value - 1) * 13 + self.num
 
     def format_attribute(self):
         return "{}, {}".format(self.color.name, self.num)
@@ -5,6 +5,7 @@ class ReverseCard(WeakActionCard):
     def __init__(self, color):
         super().__init__(CardType.REVERSE, color)
         self.short_name = "R({})".format(self.color.name[0])
+        self.card_id = (self.color.value - 1) * 13 + 10
 
     def is_reverse(self):
         return True
@@ -5,6 +5,7 @@ class SkipCard(WeakActionCard):
     def __init__(self, color):
         super().__init__(CardType.SKIP, color)
         self.short_name = "S({})".format(self.color.name[0])
+        self.card_id = (self.color.value - 1) * 13 + 11
 
     def is_skip(self):
         return True
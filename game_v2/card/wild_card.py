@@ -5,6 +5,7 @@ class WildCard(StrongActionCard):
     def __init__(self):
         super().__init__(CardType.WILDCARD)
         self.short_name = "W()"
+        self.card_id = 52
 
     def is_wildcard(self):
         return True
@@ -2,5 +2,9 @@ from .base import Controller
 from .deck_controller import DeckController
 from .flow_controller import FlowController
 from .state_controller import StateController
+from .card_counter import CardCounter
+from .snapshot import RoundSnapshot
+from .deal import Deal, DealBank
+from .decision import DecisionRequest, answer_requests, run_rounds
 from .action_controller import ActionController
 from .battle_env import BattleEnv
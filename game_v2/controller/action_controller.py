@@ -1,28 +1,61 @@
+import copy
 import time
 from .base import Controller
 from .deck_controller import DeckController
 from .flow_controller import FlowController
 from .state_controller import StateController
+from .decision import DecisionRequest
+from .snapshot import RoundSnapshot, encode_cards, decode_cards
+from .card_counter import CardCounter
+from .deal import Deal
 from ..player import Player
 from ..card import Card, NumberCard
+from ..io import UnoLogger
+from ..util import RandomService
+from colorama import Fore
 
 
 class ActionController(Controller):
 
     horizontal_rule_len = 60
 
-    def __init__(self, cards, players, num_first_hand=7, clockwise=True, interval=1, stream=True, filename=None):
+    def __init__(self, cards, players, num_first_hand=7, clockwise=True, interval=1, stream=True, filename=None,
+                 rng=None, deal=None, max_decks=None):
         assert isinstance(cards, list)
         assert isinstance(players, list)
+        assert isinstance(deal, Deal) or deal is None
         assert isinstance(num_first_hand, int) and 1 <= num_first_hand <= (len(cards) - 1) / len(players)
         assert isinstance(interval, (int, float)) or interval > 0
         super().__init__(stream=stream, filename=filename)
         self.players = players
-        self.deck_controller = DeckController(cards, stream=stream, filename=filename)
+        self.deck_controller = DeckController(cards, stream=stream, filename=filename, rng=rng, max_decks=max_decks)
         self.flow_controller = FlowController(players, clockwise, stream=stream, filename=filename)
         self.state_controller = StateController(stream=stream, filename=filename)
         self.num_first_hand = num_first_hand
+        self.clockwise = clockwise
         self.interval = interval
+        self.deal = deal  # order of the deck instead of shuffling, see `DealBank`
+        self.num_turns = 0
+        self.round_index = 0  # number of resets, to tell the rounds played on this controller apart
+
+    def reset(self, players=None, deal=None, rng=None):
+        """Get ready for a new round, reusing the sub-controllers instead of building them again: the piles are
+        back to the deck, the play state is cleared and the flow is rewound to the first player.
+
+        `players` are the same players seated in another order (e.g. with the seats rotated), `deal` is the deal
+        of the new round and `rng` its random service, if not the ones of the previous round. Returns self.
+        """
+        assert isinstance(deal, Deal) or deal is None
+        if players is not None:
+            assert len(players) == len(self.players)
+            self.players = players
+        self.deck_controller.reset(rng=rng)
+        self.flow_controller.reset(players=players, clockwise=self.clockwise)
+        self.state_controller.reset()
+        self.deal = deal
+        self.num_turns = 0
+        self.round_index += 1
+        return self
 
     def format_attribute(self):
         return ", ".join([
@@ -32,7 +65,8 @@ class ActionController(Controller):
         ])
 
     def sleep(self):
-        time.sleep(self.interval)
+        if self.interval > 0:
+            time.sleep(self.interval)
 
     def log_state(self):
         self.logger("Current play state: ({}).".format(self.state_controller.format_attribute()))
@@ -51,13 +85,57 @@ class ActionController(Controller):
         player.get_cards(cards)
         return cards
 
-    def player_play_card(self, player, play):
+    @staticmethod
+    def drive(decisions):
+        # run a generator of DecisionRequest to its end, answering each request by its own player
+        try:
+            request = next(decisions)
+            while True:
+                request = decisions.send(request.answer())
+        except StopIteration as stop:
+            return stop.value
+
+    def iter_get_play(self, player):
+        sc = self.state_controller
+        fc = self.flow_controller
+        playable_cards = player.get_playable(sc.current_color, sc.current_value, sc.current_type, sc.current_to_draw)
+        play = None
+        if len(playable_cards) > 0:
+            request = DecisionRequest("get_play", player, playable_cards,
+                                      play_state=sc.state_dict,
+                                      next_player=fc.next_player(),
+                                      clockwise=fc.clockwise,
+                                      used_pile=self.deck_controller.used_pile,
+                                      action_controller=self)
+            play = yield request
+            play = player.commit_play(playable_cards, play, **request.info)
+
+        if play is None:
+            player.logger("Has no playable cards or decides not to play.")
+        return play
+
+    def iter_get_color(self, player):
+        request = DecisionRequest("get_color", player, player.cards,
+                                  play_state=self.state_controller.state_dict,
+                                  next_player=self.flow_controller.next_player(),
+                                  clockwise=self.flow_controller.clockwise,
+                                  action_controller=self)
+        color = yield request
+        return player.commit_color(color, **request.info)
+
+    def iter_play_card(self, player, play):
         index, card = play
         player.play_card(index)
         self.deck_controller.discard_card(card)
-        self.state_controller.accept_card(card, player, self.flow_controller)
+        color = None
+        if card.is_wildcard() or card.is_draw4():
+            color = yield from self.iter_get_color(player)
+        self.state_controller.accept_card(card, player, self.flow_controller, color=color)
 
-    def apply_penalty(self, player=None):
+    def player_play_card(self, player, play):
+        self.drive(self.iter_play_card(player, play))
+
+    def iter_penalty(self, player=None):
         if player is None:
             player = self.flow_controller.current_player
 
@@ -70,19 +148,42 @@ class ActionController(Controller):
             self.logger("Applying penalty: 1 card...")
             card = self.give_player_card(player)
             if self.state_controller.check_new_card_playable(card, player):
-                if player.play_new_playable(card, play_state=self.state_controller.state_dict):
+                request = DecisionRequest("play_new", player, card, play_state=self.state_controller.state_dict,
+                                          action_controller=self)
+                play = yield request
+                if player.commit_play_new(card, play, **request.info):
                     self.logger("Can play!")
-                    self.player_play_card(player, (player.num_cards - 1, card))
+                    yield from self.iter_play_card(player, (player.num_cards - 1, card))
+
+    def apply_penalty(self, player=None):
+        self.drive(self.iter_penalty(player))
+
+    def iter_turn(self, player):
+        play = yield from self.iter_get_play(player)
+        yield from self.iter_apply_play(player, play)
+
+    def iter_apply_play(self, player, play):
+        # the rest of a turn once its play is decided, e.g. to try each option from a snapshot
+        if play is not None:
+            yield from self.iter_play_card(player, play)
+        else:
+            yield from self.iter_penalty(player)
+            self.sleep()
 
     def draw_initial_card(self):
+        self.drive(self.iter_draw_initial_card())
+
+    def iter_draw_initial_card(self):
         self.logger("Drawing initial cards...")
         card = self.deck_controller.draw_card()
         assert isinstance(card, Card)
+        self.deck_controller.reveal_card(card)
 
         while card.is_draw4():
             self.logger("Oops, It\'s a Draw4 card ({}), let\'s try again.".format(card))
             card = self.deck_controller.draw_card()
             assert isinstance(card, Card)
+            self.deck_controller.reveal_card(card)
 
         self.logger("{} is drawn as the initial card.".format(card))
         if card.is_number():
@@ -107,8 +208,7 @@ class ActionController(Controller):
             # the first player determine the current color and begin playing
             player = self.flow_controller.current_player
             assert isinstance(player, Player)
-            color = player.get_color(play_state=self.state_controller.state_dict,
-                                     next_player=self.flow_controller.next_player())
+            color = yield from self.iter_get_color(player)
             self.state_controller.set_color(color)
             self.state_controller.set_value(-1)
 
@@ -117,7 +217,7 @@ class ActionController(Controller):
             self.state_controller.add_to_draw(2)
             self.state_controller.set_color(card.color)
             self.state_controller.set_value(-1)
-            self.apply_penalty()
+            yield from self.iter_penalty()
             self.flow_controller.to_next_player()
 
         else:
@@ -184,46 +284,121 @@ class ActionController(Controller):
         msg.append("-" * self.horizontal_rule_len)
         self.logger("\n".join(msg))
 
-    def run(self):
-        for player in self.players:
-            player.start_round()
-
-        # Do the important thing for three times
-        self.deck_controller.shuffle()
-        self.deck_controller.shuffle()
-        self.deck_controller.shuffle()
-        self.sleep()
-        self.distribute_first_hand()
-        self.sleep()
-        self.draw_initial_card()
-        self.sleep()
-
-        player = None
+    def iter_play_out(self):
+        # play turns until a player is done and return this player, without updating any record,
+        # so it also finishes a round restored from a snapshot taken between two turns
+        player = self.flow_controller.current_player
         while not self.flow_controller.is_player_done():
             self.flow_controller.to_next_player()
             player = self.flow_controller.current_player
             self.logger("Switch to player {}.".format(player))
             # self.sleep()
 
-            play = player.get_play(
-                self.state_controller.current_color,
-                self.state_controller.current_value,
-                self.state_controller.current_type,
-                self.state_controller.current_to_draw,
-                next_player=self.flow_controller.next_player(),
-                clockwise=self.flow_controller.clockwise,
-                used_pile=self.deck_controller.used_pile
-            )
-            if play is not None:
-                self.player_play_card(player, play)
-            else:
-                self.apply_penalty(player)
-                self.sleep()
+            self.num_turns += 1
+            yield from self.iter_turn(player)
             # self.log_state()
             self.logger("-"*self.horizontal_rule_len)
 
         assert isinstance(player, Player)
-        self.logger("{} wins!".format(player.name))
+        return player
+
+    def play_out(self):
+        return self.drive(self.iter_play_out())
+
+    # =========
+    # snapshots
+    # =========
+    def snapshot(self):
+        """Get the current state of the round as a compact and immutable `RoundSnapshot`."""
+        dc = self.deck_controller
+        fc = self.flow_controller
+        sc = self.state_controller
+        return RoundSnapshot(encode_cards(dc.draw_pile), encode_cards(dc.used_pile),
+                             tuple(encode_cards(player.cards) for player in self.players), dc.num_decks,
+                             fc.current_position, fc.clockwise, fc.skip,
+                             sc.current_color, sc.current_value, sc.current_type, sc.current_to_draw)
+
+    def restore(self, snapshot):
+        """Bring the round back to a snapshot taken from it (or from a round with as many players)."""
+        assert isinstance(snapshot, RoundSnapshot) and len(snapshot.hands) == len(self.players)
+        dc = self.deck_controller
+        fc = self.flow_controller
+        sc = self.state_controller
+        dc.set_piles(decode_cards(snapshot.draw_pile), decode_cards(snapshot.used_pile), snapshot.num_decks)
+        for player, hand in zip(self.players, snapshot.hands):
+            player.set_cards(decode_cards(hand))
+        fc.set_current_position(snapshot.current_pos)
+        fc.clockwise = snapshot.clockwise
+        fc.skip = snapshot.skip
+        sc.current_color = snapshot.color
+        sc.current_value = snapshot.value
+        sc.current_type = snapshot.ctype
+        sc.current_to_draw = snapshot.to_draw
+
+    def fork(self, num_forks=1, snapshot=None, rng=None, mute=True):
+        """Get independent copies of the round, e.g. for rollouts.
+
+        Each fork is restored from `snapshot` (the current state if None) with clones of the players
+        (see `Player.clone`), never sleeps, and is muted unless `mute` is False. The forks draw from `rng`,
+        the random service of this round if None. Colluding policies keep looking at the original players.
+        """
+        assert isinstance(num_forks, int) and num_forks > 0
+        assert isinstance(rng, RandomService) or rng is None
+        if snapshot is None:
+            snapshot = self.snapshot()
+        logger = None
+        if mute:
+            logger = UnoLogger(name="Fork", color=Fore.LIGHTBLACK_EX, stream=False)
+            logger.disabled = True
+
+        revealed_counts = self.deck_controller.card_counter.revealed_counts
+        forks = []
+        for _ in range(num_forks):
+            players = [player.clone(logger=logger) for player in self.players]
+            fork = copy.copy(self)
+            fork.players = players
+            fork.deck_controller = copy.copy(self.deck_controller)
+            fork.deck_controller.listeners = []
+            fork.deck_controller.card_counter = CardCounter(fork.deck_controller, revealed_counts=revealed_counts)
+            fork.flow_controller = self.flow_controller.clone(players)
+            fork.state_controller = copy.copy(self.state_controller)
+            fork.interval = 0
+            if rng is not None:
+                fork.deck_controller.rng = rng
+                for player in players:
+                    player.rng = rng
+            if mute:
+                for controller in (fork, fork.deck_controller, fork.flow_controller, fork.state_controller):
+                    controller.logger = logger
+            fork.restore(snapshot)
+            forks.append(fork)
+        return forks
+
+    def iter_run(self):
+        """Play a round as a generator of DecisionRequest.
+
+        Each decision of a player is yielded as a request, and the round resumes with the answer sent back,
+        so that a driver can interleave many rounds and answer their decisions in batches
+        (see `controller.run_rounds`). The winner is the return value of the generator.
+        """
+        for player in self.players:
+            player.start_round()
+
+        if self.deal is None:
+            # Do the important thing for three times
+            self.deck_controller.shuffle()
+            self.deck_controller.shuffle()
+            self.deck_controller.shuffle()
+        else:
+            self.deck_controller.set_piles(self.deal.deal_cards(self.deck_controller.deck), [], 1)
+        self.sleep()
+        self.distribute_first_hand()
+        self.sleep()
+        yield from self.iter_draw_initial_card()
+        self.sleep()
+
+        winner = yield from self.iter_play_out()
+        self.logger("{} wins!".format(winner.name))
         self.sleep()
 
         self.update_loss()
@@ -236,4 +411,7 @@ class ActionController(Controller):
         self.logger("clearing cards for players...")
         for player in self.players:
             player.end_round()
-        return player  # return winner
+        return winner
+
+    def run(self):
+        return self.drive(self.iter_run())
@@ -4,7 +4,9 @@ from .flow_controller import FlowController
 from .state_controller import StateController
 from ..player import Player, PlayerType, construct_player
 from ..card import Card, NumberCard, make_standard_deck, make_standard_unique_deck
+from ..util import RandomService, atomic_write_json
 import numpy as np
+import json
 import gc
 
 
@@ -25,7 +27,8 @@ class BattleEnv(Controller):
     reward_versions = {"score_1", "score_1.1", "count_1", "count_1.1", "final_1", "final_1.1", "type_1"}
 
     def __init__(self, state_version="1d_1", reward_version="score_1",
-                 agent_pos=0, opponent_type=PlayerType.PC_GREEDY, low_dim=False, stream=False, filename=None):
+                 agent_pos=0, opponent_type=PlayerType.PC_GREEDY, low_dim=False, stream=False, filename=None,
+                 seed=None, max_decks=None):
         assert isinstance(state_version, str)
         assert isinstance(reward_version, str)
         assert isinstance(agent_pos, int) and 0 <= agent_pos <= 1
@@ -46,6 +49,9 @@ class BattleEnv(Controller):
             raise ValueError("Unknown reward_verison: {}".format(reward_version))
         self.reward_version = reward_version
 
+        # set random numbers, shared by the deck and the players
+        self.rng = RandomService(seed)
+
         # set players
         self.agent_pos = agent_pos
         self.opponent_type = opponent_type
@@ -60,6 +66,7 @@ class BattleEnv(Controller):
         self.state_controller = None
 
         # set other attributes
+        self.max_decks = max_decks  # cap on the decks of a round, see `DeckController`
         self.done = False
         self.low_dim = low_dim
 
@@ -74,6 +81,8 @@ class BattleEnv(Controller):
                                             stream=self.stream, filename=self.filename)
         self.ext_player = self.players[ap]
         self.opp_player = self.players[op]
+        for player in self.players:
+            player.set_random_service(self.rng)
 
     def _get_state(self):
         # TODO: update this method to add a new version of state
@@ -163,9 +172,8 @@ class BattleEnv(Controller):
 
             # deck state
             state = entire_state[4]
-            state[57] = len(dc.used_pile)
-            for card in dc.used_pile:
-                state[self.action_invmap[card.short_name]] += 1
+            state[57] = dc.used_pile_size
+            state[:54] = dc.card_counter.used_counts  # action index of a card is its card id
 
         return entire_state
 
@@ -223,11 +231,13 @@ class BattleEnv(Controller):
         self.logger("Drawing initial cards...")
         card = self.deck_controller.draw_card()
         assert isinstance(card, Card)
+        self.deck_controller.reveal_card(card)
 
         while card.is_draw4():
             self.logger("Oops, It\'s a Draw4 card ({}), let\'s try again.".format(card))
             card = self.deck_controller.draw_card()
             assert isinstance(card, Card)
+            self.deck_controller.reveal_card(card)
 
         self.logger("{} is drawn as the initial card.".format(card))
         if card.is_number():
@@ -278,7 +288,8 @@ class BattleEnv(Controller):
             self.give_player_cards(player, self.num_first_hand)
 
     def start_round(self):
-        self.deck_controller = DeckController(self.cards, stream=self.stream, filename=self.filename)
+        self.deck_controller = DeckController(self.cards, stream=self.stream, filename=self.filename, rng=self.rng,
+                                              max_decks=self.max_decks)
         self.flow_controller = FlowController(self.players, self.clockwise, stream=self.stream, filename=self.filename)
         self.state_controller = StateController(stream=self.stream, filename=self.filename)
 
@@ -525,6 +536,29 @@ class BattleEnv(Controller):
 
         gc.collect()
 
+    def get_checkpoint(self):
+        # state of the environment between rounds, see `Game.get_checkpoint`
+        assert self.deck_controller is None, "Checkpoints are taken between rounds"
+        return {"rng": self.rng.get_state(), "players": [player.get_state() for player in self.players]}
+
+    def set_checkpoint(self, checkpoint):
+        assert self.deck_controller is None, "Checkpoints are restored between rounds"
+        self.rng.set_state(checkpoint["rng"])
+        for player, state in zip(self.players, checkpoint["players"]):
+            player.set_state(state)
+
+    def save_checkpoint(self, path, **training_state):
+        # with the state of the training loop (e.g. episode, epsilon, windows of results), written atomically;
+        # to be called between `end_round` and `start_round`
+        atomic_write_json({"env": self.get_checkpoint(), "training": training_state}, path, indent=None)
+
+    def load_checkpoint(self, path):
+        # restore the environment and return the state of the training loop given to `save_checkpoint`
+        with open(path, "r") as f:
+            checkpoint = json.load(f)
+        self.set_checkpoint(checkpoint["env"])
+        return checkpoint["training"]
+
     def reset(self):
         self.end_round()
         return self.start_round()
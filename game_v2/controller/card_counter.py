@@ -0,0 +1,139 @@
+import numpy as np
+from ..card import num_card_ids, unique_cards
+
+
+card_scores = np.array([card.score for card in unique_cards], dtype=np.int64)  # score of each card id
+
+
+def count_cards(cards):
+    return np.bincount([card.card_id for card in cards], minlength=num_card_ids).astype(np.int64)
+
+
+class CardCounter(object):
+    # counts of the cards of a round by card id, from public information only, kept up to date as a listener
+    # of its deck controller with O(1) work per card event (O(n) for the n cards of a regeneration or a new deck):
+    # - used_counts: the used pile
+    # - drawn_counts: the cards drawn and still held by the players
+    # - revealed_counts: the cards drawn and shown without being discarded (the initial cards)
+    # - unseen_counts: the cards in the draw pile or in a hand, with their number and total score
+    # they are counted from the piles on the first query, and again after the piles are set at once (e.g. by a restore)
+    def __init__(self, deck_controller, revealed_counts=None):
+        self.deck_controller = deck_controller
+        self.deck_counts = count_cards(deck_controller.deck)
+        self._revealed_counts = (np.zeros(num_card_ids, dtype=np.int64) if revealed_counts is None
+                                 else np.array(revealed_counts, dtype=np.int64))
+        self._used_counts = None
+        self._drawn_counts = None
+        self._unseen_counts = None
+        self._num_unseen = 0
+        self._unseen_score = 0
+        self._dirty = True  # counted on the first query
+        deck_controller.add_listener(self)
+
+    def __repr__(self):
+        return "CardCounter(num_unseen={}, expected_score={})".format(self.num_unseen, self.expected_score)
+
+    def __str__(self):
+        return "CardCounter(num_unseen={}, expected_score={})".format(self.num_unseen, self.expected_score)
+
+    def _recount(self):
+        dc = self.deck_controller
+        total_counts = self.deck_counts * dc.num_decks
+        self._used_counts = count_cards(dc.used_pile)
+        self._unseen_counts = total_counts - self._used_counts - self._revealed_counts
+        self._drawn_counts = self._unseen_counts - count_cards(dc.draw_pile)
+        self._num_unseen = int(self._unseen_counts.sum())
+        self._unseen_score = int(self._unseen_counts @ card_scores)
+        self._dirty = False
+
+    def _refresh(self):
+        if self._dirty:
+            self._recount()
+
+    def _add_unseen(self, card, num):
+        self._unseen_counts[card.card_id] += num
+        self._num_unseen += num
+        self._unseen_score += num * card.score
+
+    def reset(self):
+        # for a new round on the same deck controller, see `DeckController.reset`
+        self._revealed_counts[:] = 0
+        self._dirty = True
+
+    # ==============
+    # deck listeners
+    # ==============
+    def on_card_drawn(self, card):
+        if not self._dirty:
+            self._drawn_counts[card.card_id] += 1
+
+    def on_card_discarded(self, card):
+        if not self._dirty:
+            self._used_counts[card.card_id] += 1
+            self._drawn_counts[card.card_id] -= 1  # played from a hand
+            self._add_unseen(card, -1)
+
+    def on_card_revealed(self, card):
+        self._revealed_counts[card.card_id] += 1
+        if not self._dirty:
+            self._drawn_counts[card.card_id] -= 1
+            self._add_unseen(card, -1)
+
+    def on_draw_pile_regenerated(self, cards):
+        if not self._dirty:
+            for card in cards:
+                self._add_unseen(card, 1)
+            self._used_counts[:] = 0
+
+    def on_deck_added(self, cards):
+        if not self._dirty:
+            for card in cards:
+                self._add_unseen(card, 1)
+
+    def on_piles_set(self):
+        self._dirty = True
+
+    # =======
+    # queries
+    # =======
+    @property
+    def used_counts(self):
+        self._refresh()
+        return self._used_counts
+
+    @property
+    def drawn_counts(self):
+        self._refresh()
+        return self._drawn_counts
+
+    @property
+    def revealed_counts(self):
+        return self._revealed_counts
+
+    @property
+    def unseen_counts(self):
+        self._refresh()
+        return self._unseen_counts
+
+    @property
+    def draw_pile_counts(self):
+        self._refresh()
+        return self._unseen_counts - self._drawn_counts
+
+    @property
+    def num_unseen(self):
+        self._refresh()
+        return self._num_unseen
+
+    @property
+    def expected_score(self):
+        # expected score of an unseen card
+        self._refresh()
+        return float(self._unseen_score) / self._num_unseen if self._num_unseen > 0 else 0.
+
+    def expected_score_without(self, cards):
+        """Expected score of a card unseen by a player holding the given cards."""
+        self._refresh()
+        num_unseen = self._num_unseen - len(cards)
+        unseen_score = self._unseen_score - sum([card.score for card in cards])
+        return float(unseen_score) / num_unseen if num_unseen > 0 else 0.
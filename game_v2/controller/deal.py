@@ -0,0 +1,73 @@
+import numpy as np
+from ..card import make_standard_deck
+from ..util import RandomService
+
+
+class Deal(object):
+    # the randomness of a round, to replay it under other players or seats: the order of the deck
+    # (as indices into the list of cards of the round) and the seed of the random service of the round,
+    # used by the regenerations of the draw pile and by the players
+    __slots__ = ("order", "seed")
+
+    def __init__(self, order, seed):
+        self.order = order
+        self.seed = seed
+
+    def __repr__(self):
+        return "Deal(deck_size={}, seed={})".format(len(self.order), self.seed)
+
+    def __str__(self):
+        return "Deal(deck_size={}, seed={})".format(len(self.order), self.seed)
+
+    def deal_cards(self, cards):
+        # the cards in drawing order
+        assert len(cards) == len(self.order)
+        return [cards[i] for i in self.order]
+
+    def random_service(self):
+        return RandomService(self.seed)
+
+
+class DealBank(object):
+    # pre-generated deals, so that every configuration of a comparison plays the same rounds
+    # (common random numbers), see `ActionController(deal=...)`, `Game(deals=...)` and `DuplicateEvaluation`
+    def __init__(self, num_deals, deck_size=None, seed=None):
+        assert isinstance(num_deals, int) and num_deals > 0
+        deck_size = len(make_standard_deck()) if deck_size is None else deck_size
+        assert isinstance(deck_size, int) and 0 < deck_size <= 2 ** 16
+        generator = RandomService(seed).generator
+        self.seed = seed
+        self.orders = np.argsort(generator.random((num_deals, deck_size)), axis=1).astype(np.uint16)
+        self.seeds = generator.integers(2 ** 63, size=num_deals, dtype=np.int64)
+
+    def __repr__(self):
+        return "DealBank(num_deals={}, deck_size={}, seed={})".format(len(self), self.deck_size, self.seed)
+
+    def __str__(self):
+        return "DealBank(num_deals={}, deck_size={}, seed={})".format(len(self), self.deck_size, self.seed)
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __getitem__(self, index):
+        return Deal(self.orders[index], int(self.seeds[index]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def deck_size(self):
+        return self.orders.shape[1]
+
+    def save(self, path):
+        np.savez(path, orders=self.orders, seeds=self.seeds)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            bank = DealBank.__new__(DealBank)
+            bank.seed = None
+            bank.orders = data["orders"]
+            bank.seeds = data["seeds"]
+        return bank
@@ -0,0 +1,99 @@
+from ..player import Player
+
+
+decision_kinds = ("get_play", "get_color", "play_new")
+
+
+class DecisionRequest(object):
+    """A decision a round is waiting for, as yielded by `ActionController.iter_run`.
+
+    `options` are the legal choices: the playable (index, card) tuples for get_play, the cards of the player
+    for get_color, and the drawn card for play_new. `info` holds the keyword arguments the player would get
+    in the synchronous engine (play_state, next_player, ...). The round resumes with the answer sent back.
+    """
+    def __init__(self, kind, player, options, **info):
+        assert kind in decision_kinds
+        assert isinstance(player, Player)
+        self.kind = kind
+        self.player = player
+        self.options = options
+        self.info = info
+
+    def __repr__(self):
+        return "DecisionRequest({})".format(self.format_attribute())
+
+    def __str__(self):
+        return "DecisionRequest({})".format(self.format_attribute())
+
+    def format_attribute(self):
+        return ", ".join([
+            "kind={}".format(self.kind),
+            "seat={}".format(self.seat),
+            "options={}".format(self.options)
+        ])
+
+    @property
+    def seat(self):
+        return self.player.idx
+
+    @property
+    def play_state(self):
+        return self.info.get("play_state", None)
+
+    def answer(self):
+        return self.player.decide(self)
+
+
+def _batch_policy(request):
+    # the policy that can answer the request together with others, None if it has to be answered alone
+    if request.kind != "get_play" or not request.player.is_policy():
+        return None
+    policy = request.player.get_play_policy
+    return policy if policy.can_batch() else None
+
+
+def answer_requests(requests):
+    """Answer pending decision requests, with a single `get_actions` call for all requests of the same batching policy
+    (e.g. a ModelPolicy with its default strategy)."""
+    answers = [None] * len(requests)
+    batches = {}  # id of policy -> (policy, request positions)
+    for i, request in enumerate(requests):
+        policy = _batch_policy(request)
+        if policy is None:
+            answers[i] = request.answer()
+        else:
+            batches.setdefault(id(policy), (policy, []))[1].append(i)
+
+    for policy, positions in batches.values():
+        kwargs = [requests[i].player.get_play_kwargs(requests[i].options, **requests[i].info) for i in positions]
+        for i, action in zip(positions, policy.get_actions(kwargs)):
+            answers[i] = action
+    return answers
+
+
+def run_rounds(controllers):
+    """Play one round on each ActionController, interleaved, and return the winner of each round.
+
+    All rounds advance to their next decision, then the pending decisions are answered together by
+    `answer_requests`. Controllers must not share Player objects, but their players may share policies.
+    """
+    rounds = [controller.iter_run() for controller in controllers]
+    winners = [None] * len(rounds)
+    pending = {}  # round index -> pending request
+
+    def advance(i, answer=None, start=False):
+        try:
+            pending[i] = next(rounds[i]) if start else rounds[i].send(answer)
+        except StopIteration as stop:
+            pending.pop(i, None)
+            winners[i] = stop.value
+
+    for i in range(len(rounds)):
+        advance(i, start=True)
+
+    while len(pending) > 0:
+        indices = list(pending.keys())
+        answers = answer_requests([pending[i] for i in indices])
+        for i, answer in zip(indices, answers):
+            advance(i, answer)
+    return winners
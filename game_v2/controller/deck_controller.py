@@ -1,12 +1,15 @@
-import random
 from .base import Controller
+from .card_counter import CardCounter
 from ..card import Card
+from ..util import RandomService
 
 
 class DeckController(Controller):
-    def __init__(self, cards, copy=True, stream=True, filename=None):
+    def __init__(self, cards, copy=True, stream=True, filename=None, rng=None, max_decks=None):
         super().__init__(stream=stream, filename=filename)
         assert isinstance(cards, list)
+        assert isinstance(rng, RandomService) or rng is None
+        assert max_decks is None or (isinstance(max_decks, int) and max_decks >= 1)
         assert len(cards) > 0
         for card in cards:
             assert isinstance(card, Card)
@@ -14,6 +17,13 @@ class DeckController(Controller):
         self.num_decks = 1
         self.draw_pile = cards.copy() if copy else cards
         self.used_pile = []
+        self.rng = RandomService() if rng is None else rng
+        self.listeners = []  # notified of the cards moving between the piles, see `add_listener`
+        self.max_decks = max_decks  # cap on the number of decks in play, None for no cap
+        self.num_regenerations = 0
+        self.num_deck_additions = 0
+        self.num_overflows = 0  # decks added over the cap, as the players held every card
+        self.card_counter = CardCounter(self)
 
     @property
     def deck_size(self):
@@ -34,27 +44,72 @@ class DeckController(Controller):
             "used_pile_size={}".format(self.used_pile_size)
         ])
 
+    def add_listener(self, listener):
+        # listener has the methods on_card_drawn(card), on_card_discarded(card), on_card_revealed(card),
+        # on_draw_pile_regenerated(cards), on_deck_added(cards) and on_piles_set()
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def set_piles(self, draw_pile, used_pile, num_decks):
+        # replace the piles at once, e.g. when restoring a snapshot
+        self.draw_pile = draw_pile
+        self.used_pile = used_pile
+        self.num_decks = num_decks
+        for listener in self.listeners:
+            listener.on_piles_set()
+
+    def reset(self, rng=None):
+        # back to a single deck in its order for a new round, reusing the piles;
+        # the listeners are told the piles were set at once
+        assert isinstance(rng, RandomService) or rng is None
+        if rng is not None:
+            self.rng = rng
+        self.num_decks = 1
+        self.num_regenerations = 0
+        self.num_deck_additions = 0
+        self.num_overflows = 0
+        self.draw_pile[:] = self.deck
+        self.used_pile.clear()
+        self.card_counter.reset()
+        for listener in self.listeners:
+            listener.on_piles_set()
+
     def shuffle(self):
         self.logger("Shuffling the draw pile...")
-        random.shuffle(self.draw_pile)
+        self.rng.shuffle(self.draw_pile)
 
     def regenerate_draw_pile(self):
         assert self.draw_pile_size == 0  # only enable regeneration of draw pile while it is run out
         self.logger("Regenerating the draw pile...")
+        self.num_regenerations += 1
 
-        # when there are only a few cards left, there might cause a infinitely looping situation
-        if self.used_pile_size > 10:
+        # when there are only a few cards left, there might cause a infinitely looping situation;
+        # once the decks are capped, the used pile is recycled whatever its size
+        capped = self.max_decks is not None and self.num_decks >= self.max_decks
+        if self.used_pile_size > 10 or (capped and self.used_pile_size > 0):
             self.draw_pile = self.used_pile
             self.used_pile = []
+            for listener in self.listeners:
+                listener.on_draw_pile_regenerated(self.draw_pile)
             self.shuffle()
         else:
+            if capped:
+                # every card is held by the players, the round can only go on over the cap
+                self.num_overflows += 1
+                self.logger("Every card is held by the players, adding a deck over the cap of {}".format(
+                    self.max_decks))
             self.add_deck()  # cards run out, need to add one deck
         self.logger("Done. New draw pile size: {}".format(self.draw_pile_size))
 
     def add_deck(self):
         self.logger("Adding one deck to the draw pile...")
         self.num_decks += 1
+        self.num_deck_additions += 1
         self.draw_pile += self.deck.copy()
+        for listener in self.listeners:
+            listener.on_deck_added(self.deck)
         self.shuffle()
 
     def _draw_card(self):
@@ -62,6 +117,8 @@ class DeckController(Controller):
 
         # get top card and remove it from the data structure
         card = self.draw_pile.pop(0)
+        for listener in self.listeners:
+            listener.on_card_drawn(card)
 
         # regenerate draw pile and shuffle if no cards left after this draw
         if self.draw_pile_size == 0:
@@ -86,9 +143,16 @@ class DeckController(Controller):
         # add log: number of cards drawn
         return cards
 
+    def reveal_card(self, card):
+        # a drawn card shown to every player without being discarded, e.g. an initial card
+        for listener in self.listeners:
+            listener.on_card_revealed(card)
+
     def _discard_card(self, card):
         assert isinstance(card, Card)
         self.used_pile.append(card)
+        for listener in self.listeners:
+            listener.on_card_discarded(card)
 
     def discard_card(self, card):
         self._discard_card(card)
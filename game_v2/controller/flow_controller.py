@@ -1,3 +1,4 @@
+import copy
 from .base import Controller
 from ..player import Player
 
@@ -36,6 +37,9 @@ class FlowController(Controller):
         super().__init__(stream=stream, filename=filename)
         self.num_players = len(players)
         self.player_loop = LinkedList(players)
+        self.player_nodes = [self.player_loop.first_node]  # nodes in the order of the players
+        while len(self.player_nodes) < self.num_players:
+            self.player_nodes.append(self.player_nodes[-1].next_node)
         self.current_player_node = self.player_loop.first_node
         self.current_player = self.current_player_node.data
         self.clockwise = clockwise
@@ -49,6 +53,40 @@ class FlowController(Controller):
             "current_player={}".format(self.current_player)
         ])
 
+    def clone(self, players):
+        # same flow over other players, seated in the same order
+        assert len(players) == self.num_players
+        flow_controller = copy.copy(self)
+        flow_controller.player_loop = LinkedList(players)
+        flow_controller.player_nodes = [flow_controller.player_loop.first_node]
+        while len(flow_controller.player_nodes) < self.num_players:
+            flow_controller.player_nodes.append(flow_controller.player_nodes[-1].next_node)
+        flow_controller.set_current_position(self.current_position)
+        return flow_controller
+
+    def reset(self, players=None, clockwise=True):
+        # rewind to the first player for a new round, with the same players seated as `players` if given,
+        # by relinking the nodes of the loop in place
+        if players is not None:
+            assert len(players) == self.num_players
+            for node, player in zip(self.player_nodes, players):
+                assert isinstance(player, Player)
+                node.data = player
+        self.current_player_node = self.player_loop.first_node
+        self.current_player = self.current_player_node.data
+        self.clockwise = clockwise
+        self.skip = -1
+
+    @property
+    def current_position(self):
+        # position of the current player in the list of players
+        return self.player_nodes.index(self.current_player_node)
+
+    def set_current_position(self, pos):
+        assert isinstance(pos, int) and 0 <= pos < self.num_players
+        self.current_player_node = self.player_nodes[pos]
+        self.current_player = self.current_player_node.data
+
     def reverse(self):
         if self.num_players == 2:
             self.add_skip(1)
@@ -0,0 +1,82 @@
+import numpy as np
+from ..card import unique_cards
+
+
+def encode_cards(cards):
+    # card ids fit in a byte, and bytes are immutable, so snapshots can be shared by any number of forks
+    return bytes([card.card_id for card in cards])
+
+
+def decode_cards(card_ids):
+    return [unique_cards[card_id] for card_id in card_ids]
+
+
+class RoundSnapshot(object):
+    # state of a round at some point of play, see `ActionController.snapshot` and `ActionController.restore`:
+    # the draw pile (in drawing order), the used pile and the hand of each player (in the order of the players)
+    # as bytes of card ids, and the flow and play states as plain values
+    __slots__ = ("draw_pile", "used_pile", "hands", "num_decks",
+                 "current_pos", "clockwise", "skip",
+                 "color", "value", "ctype", "to_draw")
+
+    def __init__(self, draw_pile, used_pile, hands, num_decks, current_pos, clockwise, skip,
+                 color, value, ctype, to_draw):
+        self.draw_pile = draw_pile
+        self.used_pile = used_pile
+        self.hands = hands
+        self.num_decks = num_decks
+        self.current_pos = current_pos
+        self.clockwise = clockwise
+        self.skip = skip
+        self.color = color
+        self.value = value
+        self.ctype = ctype
+        self.to_draw = to_draw
+
+    def __repr__(self):
+        return "RoundSnapshot({})".format(self.format_attribute())
+
+    def __str__(self):
+        return "RoundSnapshot({})".format(self.format_attribute())
+
+    def format_attribute(self):
+        return ", ".join([
+            "draw_pile_size={}".format(len(self.draw_pile)),
+            "used_pile_size={}".format(len(self.used_pile)),
+            "num_cards={}".format([len(hand) for hand in self.hands]),
+            "current_pos={}".format(self.current_pos),
+            "clockwise={}".format(self.clockwise),
+            "skip={}".format(self.skip),
+            "color={}".format(self.color),
+            "value={}".format(self.value),
+            "type={}".format(self.ctype),
+            "to_draw={}".format(self.to_draw)
+        ])
+
+    def replace(self, **fields):
+        # copy with some fields replaced, e.g. the hidden cards dealt again
+        snapshot = RoundSnapshot(*(getattr(self, field) for field in self.__slots__))
+        for field, value in fields.items():
+            setattr(snapshot, field, value)
+        return snapshot
+
+    @property
+    def play_state(self):
+        return {
+            "color": self.color,
+            "value": self.value,
+            "type": self.ctype,
+            "to_draw": self.to_draw
+        }
+
+    # numpy views of the card ids, without copies
+    @property
+    def draw_pile_ids(self):
+        return np.frombuffer(self.draw_pile, dtype=np.uint8)
+
+    @property
+    def used_pile_ids(self):
+        return np.frombuffer(self.used_pile, dtype=np.uint8)
+
+    def hand_ids(self, pos):
+        return np.frombuffer(self.hands[pos], dtype=np.uint8)
@@ -12,6 +12,12 @@ class StateController(Controller):
         self.current_type = None
         self.current_to_draw = 0
 
+    def reset(self):
+        self.current_color = None
+        self.current_value = None
+        self.current_type = None
+        self.current_to_draw = 0
+
     @property
     def state_dict(self):
         return {
@@ -64,10 +70,12 @@ class StateController(Controller):
                                               self.current_to_draw,
                                               card)
 
-    def accept_card(self, card, player, flow_controller):
+    def accept_card(self, card, player, flow_controller, color=None):
+        # color is the one already chosen for a wildcard / draw4, the player is asked for it if not given
         assert isinstance(card, Card)
         assert isinstance(player, Player)
         assert isinstance(flow_controller, FlowController)
+        assert color is None or isinstance(color, CardColor)
 
         new_color = card.color
         new_value = -1
@@ -85,8 +93,9 @@ class StateController(Controller):
             flow_controller.add_skip()
 
         elif card.is_wildcard():
-            new_color = player.get_color(play_state=self.state_dict,
-                                         next_player=flow_controller.next_player())
+            new_color = color if color is not None else player.get_color(play_state=self.state_dict,
+                                                                         next_player=flow_controller.next_player(),
+                                                                         clockwise=flow_controller.clockwise)
             assert isinstance(new_color, CardColor)
 
         elif card.is_draw2():
@@ -94,8 +103,9 @@ class StateController(Controller):
             new_to_draw = self.current_to_draw + 2
 
         elif card.is_draw4():
-            new_color = player.get_color(play_state=self.state_dict,
-                                         next_player=flow_controller.next_player())
+            new_color = color if color is not None else player.get_color(play_state=self.state_dict,
+                                                                         next_player=flow_controller.next_player(),
+                                                                         clockwise=flow_controller.clockwise)
             new_to_draw = self.current_to_draw + 4
             assert isinstance(new_color, CardColor)
             # add log: color selected
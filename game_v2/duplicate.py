@@ -0,0 +1,154 @@
+import math
+import numpy as np
+from .player import Player, construct_player
+from .card import make_standard_deck
+from .controller import ActionController, DealBank
+from .util import RunningStats
+
+
+def paired_stats(values, baseline_values, z=1.96):
+    """Statistics of the paired differences between two results over the same deals.
+
+    Parameters
+    ----------
+    values: array-like
+        Result of each deal under the configuration being compared.
+
+    baseline_values: array-like
+        Result of each deal under the baseline configuration.
+
+    z: float
+        Quantile of the standard normal distribution of the confidence interval (1.96 for 95%).
+
+    Returns
+    -------
+    stats: dict
+        Mean of the differences, its standard error and confidence interval, the standard error the same
+        difference would have from independent deals, and the ratio of both variances (the factor by which
+        pairing cuts the number of deals needed for the same confidence).
+    """
+    assert len(values) == len(baseline_values) and len(values) > 1
+    diffs = RunningStats.from_values([value - baseline_value for value, baseline_value in zip(values, baseline_values)])
+    num_deals = diffs.count
+    stderr = diffs.stderr
+    unpaired_stderr = math.sqrt((RunningStats.from_values(values).variance +
+                                 RunningStats.from_values(baseline_values).variance) / num_deals)
+    ci_low, ci_high = diffs.confidence_interval(z=z)
+    return {
+        "num_deals": num_deals,
+        "mean_diff": diffs.mean,
+        "stderr": stderr,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "unpaired_stderr": unpaired_stderr,
+        "variance_reduction": (unpaired_stderr / stderr) ** 2 if stderr > 0 else float("inf")
+    }
+
+
+class DuplicateEvaluation(object):
+    # duplicate evaluation of a target player: every configuration plays the same bank of deals, each deal once
+    # per seat of the target (the whole table is rotated, so that the relative seating is kept, e.g. of colluding
+    # neighbors), and configurations are compared by their per-deal differences, from which the luck of the deals
+    # cancels out
+    def __init__(self, deals, target_pos=0, rotate_seats=True, cards=None):
+        assert isinstance(deals, DealBank)
+        assert isinstance(target_pos, int) and target_pos >= 0
+        assert isinstance(rotate_seats, bool)
+        self.deals = deals
+        self.target_pos = target_pos
+        self.rotate_seats = rotate_seats
+        self.cards = make_standard_deck() if cards is None else cards
+        assert deals.deck_size == len(self.cards)
+        self.rewards = {}  # name of configuration -> rewards of the target, of shape (num_deals, num_seats)
+        self.wins = {}  # name of configuration -> wins of the target, of shape (num_deals, num_seats)
+
+    def __repr__(self):
+        return "DuplicateEvaluation(deals={}, configurations={})".format(self.deals, list(self.rewards.keys()))
+
+    def __str__(self):
+        return "DuplicateEvaluation(deals={}, configurations={})".format(self.deals, list(self.rewards.keys()))
+
+    @staticmethod
+    def _make_players(players):
+        # players as given to Game: Player objects, or (type, name[, kwargs]) tuples
+        made = []
+        for i, player in enumerate(players):
+            if isinstance(player, tuple):
+                kwargs = dict(player[2]) if len(player) == 3 else {}
+                kwargs.setdefault("stream", False)
+                player = construct_player(player[0], idx=i, name=player[1], **kwargs)
+            assert isinstance(player, Player)
+            made.append(player)
+        return made
+
+    def evaluate(self, name, players):
+        """Play every deal at every seat with the target at `target_pos` of `players`, and keep its results under
+        `name`. Returns the rewards and the wins of the target, of shape (num_deals, num_seats)."""
+        assert name not in self.rewards
+        players = self._make_players(players)
+        assert self.target_pos < len(players)
+        target = players[self.target_pos]
+        num_seats = len(players) if self.rotate_seats else 1
+        rewards = np.zeros((len(self.deals), num_seats), dtype=np.float64)
+        wins = np.zeros((len(self.deals), num_seats), dtype=np.float64)
+
+        action_controller = None
+        for shift in range(num_seats):
+            # the target moves to seat (target_pos + shift) % num_players
+            seated = players[len(players) - shift:] + players[:len(players) - shift]
+            for i, player in enumerate(seated):
+                player.set_idx(i)
+            for d, deal in enumerate(self.deals):
+                rng = deal.random_service()
+                for player in seated:
+                    player.set_random_service(rng)
+                reward_before = target.cumulative_reward
+                if action_controller is None:
+                    action_controller = ActionController(self.cards, seated, interval=0, stream=False, rng=rng,
+                                                         deal=deal)
+                else:
+                    action_controller.reset(players=seated, deal=deal, rng=rng)
+                winner = action_controller.run()
+                rewards[d, shift] = target.cumulative_reward - reward_before
+                wins[d, shift] = float(winner is target)
+
+        self.rewards[name] = rewards
+        self.wins[name] = wins
+        return rewards, wins
+
+    def compare(self, name, baseline, metric="reward"):
+        """Paired statistics of configuration `name` minus configuration `baseline`, deal by deal (see `paired_stats`),
+        on the mean over the seats of the reward or the win of the target. The variance reduction is against
+        as many rounds played on independent deals."""
+        assert metric in ("reward", "win")
+        results = self.rewards if metric == "reward" else self.wins
+        values, baseline_values = results[name], results[baseline]
+        assert values.shape == baseline_values.shape
+        stats = paired_stats(values.mean(axis=1), baseline_values.mean(axis=1))
+        # against as many rounds of independent deals, i.e. without rotating the seats either
+        stats["unpaired_stderr"] = math.sqrt((values.var(ddof=1) + baseline_values.var(ddof=1)) / values.size)
+        stats["variance_reduction"] = ((stats["unpaired_stderr"] / stats["stderr"]) ** 2 if stats["stderr"] > 0
+                                       else float("inf"))
+        return stats
+
+    def summary(self, baseline):
+        """One row per configuration (e.g. for a pandas DataFrame): mean reward and win rate of the target,
+        overall and per seat shift, and the paired differences of reward and win rate against `baseline`."""
+        rows = []
+        for name in self.rewards:
+            rewards, wins = self.rewards[name], self.wins[name]
+            row = {
+                "configuration": name,
+                "num_deals": len(rewards),
+                "mean_reward": float(rewards.mean()),
+                "win_rate": float(wins.mean()),
+                "seat_mean_rewards": rewards.mean(axis=0).tolist(),
+                "seat_win_rates": wins.mean(axis=0).tolist()
+            }
+            if name != baseline:
+                for metric in ("reward", "win"):
+                    for key, value in self.compare(name, baseline, metric=metric).items():
+                        if key != "num_deals":
+                            row["{}_{}".format(metric, key)] = value
+            rows.append(row)
+        return rows
@@ -0,0 +1,3 @@
+from .imitation_encoder import data_cols, num_data_cols, card_classes, card_names, card_id_to_col
+from .imitation_encoder import encode_play, encode_plays, encode_play_ids, encode_recorded_plays
+from .imitation_encoder import candidate_cols, num_candidate_cols, encode_candidates
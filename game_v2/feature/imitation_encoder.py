@@ -0,0 +1,195 @@
+import numpy as np
+from scipy import sparse
+from ..card import CardColor, CardType, num_card_ids, make_standard_unique_deck
+
+
+# =====================
+# 1s1r layout (1 state, 1 row): counts of the playable cards + one-hot play state
+# =====================
+# column order is the one of the original pandas pipeline, i.e. sorted column names
+data_cols = [
+    'DrawFourCard()',
+    'DrawTwoCard(BLUE)', 'DrawTwoCard(GREEN)', 'DrawTwoCard(RED)', 'DrawTwoCard(YELLOW)',
+    'NumberCard(BLUE, 0)', 'NumberCard(BLUE, 1)', 'NumberCard(BLUE, 2)', 'NumberCard(BLUE, 3)', 'NumberCard(BLUE, 4)',
+    'NumberCard(BLUE, 5)', 'NumberCard(BLUE, 6)', 'NumberCard(BLUE, 7)', 'NumberCard(BLUE, 8)', 'NumberCard(BLUE, 9)',
+    'NumberCard(GREEN, 0)', 'NumberCard(GREEN, 1)', 'NumberCard(GREEN, 2)', 'NumberCard(GREEN, 3)',
+    'NumberCard(GREEN, 4)', 'NumberCard(GREEN, 5)', 'NumberCard(GREEN, 6)', 'NumberCard(GREEN, 7)',
+    'NumberCard(GREEN, 8)', 'NumberCard(GREEN, 9)',
+    'NumberCard(RED, 0)', 'NumberCard(RED, 1)', 'NumberCard(RED, 2)', 'NumberCard(RED, 3)', 'NumberCard(RED, 4)',
+    'NumberCard(RED, 5)', 'NumberCard(RED, 6)', 'NumberCard(RED, 7)', 'NumberCard(RED, 8)', 'NumberCard(RED, 9)',
+    'NumberCard(YELLOW, 0)', 'NumberCard(YELLOW, 1)', 'NumberCard(YELLOW, 2)', 'NumberCard(YELLOW, 3)',
+    'NumberCard(YELLOW, 4)', 'NumberCard(YELLOW, 5)', 'NumberCard(YELLOW, 6)', 'NumberCard(YELLOW, 7)',
+    'NumberCard(YELLOW, 8)', 'NumberCard(YELLOW, 9)',
+    'ReverseCard(BLUE)', 'ReverseCard(GREEN)', 'ReverseCard(RED)', 'ReverseCard(YELLOW)',
+    'SkipCard(BLUE)', 'SkipCard(GREEN)', 'SkipCard(RED)', 'SkipCard(YELLOW)',
+    'WildCard()',
+    'color_BLUE', 'color_GREEN', 'color_RED', 'color_YELLOW',
+    'to_draw',
+    'type_DRAW_2', 'type_DRAW_4', 'type_NUMBER', 'type_REVERSE', 'type_SKIP', 'type_WILDCARD',
+    'value_-1', 'value_0', 'value_1', 'value_2', 'value_3', 'value_4',
+    'value_5', 'value_6', 'value_7', 'value_8', 'value_9'
+]
+num_data_cols = len(data_cols)
+card_classes = data_cols[:num_card_ids]  # the get_play labels, which are card names as well
+data_col_index = {col: i for i, col in enumerate(data_cols)}
+
+# card name (without ANSI codes) for each card id, e.g. "NumberCard(RED, 1)"
+card_names = ["{}({})".format(type(card).__name__, card.format_attribute()) for card in make_standard_unique_deck()]
+card_id_to_col = np.array([data_col_index[name] for name in card_names], dtype=np.int64)
+
+# play state columns, indexed by enum values; -1 for values that never appear in a play state
+color_to_col = np.full(len(CardColor), -1, dtype=np.int64)
+for _color in CardColor:
+    if _color != CardColor.WILD:
+        color_to_col[_color.value] = data_col_index["color_{}".format(_color.name)]
+type_to_col = np.full(len(CardType), -1, dtype=np.int64)
+for _ctype in CardType:
+    if _ctype != CardType.ABSTRACT:
+        type_to_col[_ctype.value] = data_col_index["type_{}".format(_ctype.name)]
+to_draw_col = data_col_index["to_draw"]
+value_col_offset = data_col_index["value_-1"] + 1  # column of value v is value_col_offset + v
+
+
+def encode_play(play_state, playable_cards, out=None):
+    """Encode a get_play decision as a single row of the 1s1r layout.
+
+    Parameters
+    ----------
+    play_state: dict | None
+        Play state with keys color, value, type and to_draw, as given to policies.
+
+    playable_cards: list
+        List of (index, card) tuples.
+
+    out: numpy.ndarray | None
+        Row to write into, it is cleared first. A new int64 row is allocated if not given.
+
+    Returns
+    -------
+    row: numpy.ndarray
+        Vector of `num_data_cols` features.
+    """
+    if out is None:
+        out = np.zeros(num_data_cols, dtype=np.int64)
+    else:
+        out[:] = 0
+
+    if play_state is not None:
+        out[color_to_col[play_state["color"].value]] = 1
+        out[type_to_col[play_state["type"].value]] = 1
+        out[value_col_offset + int(play_state["value"])] = 1
+        out[to_draw_col] = play_state["to_draw"]
+
+    for index, card in playable_cards:
+        out[card_id_to_col[card.card_id]] += 1
+    return out
+
+
+def encode_plays(plays):
+    """Encode a batch of (play_state, playable_cards) pairs as a dense matrix of the 1s1r layout."""
+    matrix = np.zeros((len(plays), num_data_cols), dtype=np.int64)
+    for i, (play_state, playable_cards) in enumerate(plays):
+        encode_play(play_state, playable_cards, out=matrix[i])
+    return matrix
+
+
+def encode_play_ids(state, card_offsets, card_ids):
+    """Encode a batch of get_play decisions given as card ids as a CSR matrix of the 1s1r layout.
+
+    Parameters
+    ----------
+    state: numpy.ndarray
+        Matrix of n x 4 play state fields (color value, value, type value, to_draw).
+
+    card_offsets: numpy.ndarray
+        Vector of n + 1 offsets, the playable card ids of decision i are
+        `card_ids[card_offsets[i]:card_offsets[i + 1]]`.
+
+    card_ids: numpy.ndarray
+        Flat vector of playable card ids.
+
+    Returns
+    -------
+    matrix: scipy.sparse.csr_matrix
+        Matrix of n x `num_data_cols` features.
+
+    The arguments are laid out as in the chunks written by `game_v2.io.ActionRecorder`.
+    """
+    state = np.asarray(state, dtype=np.int64)
+    card_offsets = np.asarray(card_offsets, dtype=np.int64)
+    card_ids = np.asarray(card_ids, dtype=np.int64)
+    n = state.shape[0]
+
+    # playable cards: one entry per card, duplicates are summed up by the CSR conversion
+    card_rows = np.repeat(np.arange(n), np.diff(card_offsets))
+    card_cols = card_id_to_col[card_ids]
+
+    # play state: one-hot color, type and value, plus the raw to_draw
+    state_rows = np.tile(np.arange(n), 4)
+    state_cols = np.concatenate([color_to_col[state[:, 0]],
+                                 value_col_offset + state[:, 1],
+                                 type_to_col[state[:, 2]],
+                                 np.full(n, to_draw_col)])
+    state_data = np.concatenate([np.ones(3 * n, dtype=np.int64), state[:, 3]])
+
+    rows = np.concatenate([card_rows, state_rows])
+    cols = np.concatenate([card_cols, state_cols])
+    data = np.concatenate([np.ones(len(card_cols), dtype=np.int64), state_data])
+    keep = data != 0
+    return sparse.csr_matrix((data[keep], (rows[keep], cols[keep])), shape=(n, num_data_cols))
+
+
+def encode_recorded_plays(chunk):
+    """Get the training matrix and labels from a get_play chunk written by `game_v2.io.ActionRecorder`.
+
+    Returns
+    -------
+    matrix: scipy.sparse.csr_matrix
+        Features of the decisions where a card was played.
+
+    labels: numpy.ndarray
+        Column (equally, index in `card_classes`) of the played card for each decision.
+    """
+    played = chunk["choice"] >= 0
+    offsets = chunk["card_offsets"]
+    chosen_ids = chunk["card_ids"][offsets[:-1][played] + chunk["choice"][played]]
+
+    # drop the decisions of not playing any card, together with their runs of card ids
+    lengths = np.diff(offsets)[played]
+    card_mask = np.repeat(played, np.diff(offsets))
+    card_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    matrix = encode_play_ids(chunk["state"][played], card_offsets, chunk["card_ids"][card_mask])
+    return matrix, card_id_to_col[chosen_ids]
+
+
+# =====================
+# 1c1r layout (1 card, 1 row): one row per playable card, one-hot play state and card attributes
+# =====================
+candidate_cols = (["card_color_{}".format(i) for i in range(5)] + ["card_score"] +
+                  ["card_type_{}".format(i) for i in range(6)] +
+                  ["color_{}".format(i) for i in range(1, 5)] + ["to_draw"] +
+                  ["type_{}".format(i) for i in range(6)] + ["value"])
+num_candidate_cols = len(candidate_cols)
+_candidate_col_index = {col: i for i, col in enumerate(candidate_cols)}
+_card_color_col = _candidate_col_index["card_color_0"]
+_card_score_col = _candidate_col_index["card_score"]
+_card_type_col = _candidate_col_index["card_type_0"]
+_color_col = _candidate_col_index["color_1"] - 1  # colors start from 1
+_to_draw_col = _candidate_col_index["to_draw"]
+_type_col = _candidate_col_index["type_0"]
+_value_col = _candidate_col_index["value"]
+
+
+def encode_candidates(play_state, playable_cards):
+    """Encode a get_play decision as one row of the 1c1r layout per playable card."""
+    matrix = np.zeros((len(playable_cards), num_candidate_cols), dtype=np.int64)
+    matrix[:, _color_col + play_state["color"].value] = 1
+    matrix[:, _to_draw_col] = play_state["to_draw"]
+    matrix[:, _type_col + play_state["type"].value] = 1
+    matrix[:, _value_col] = play_state["value"]
+    for i, (index, card) in enumerate(playable_cards):
+        row = matrix[i]
+        row[_card_color_col + card.color.value] = 1
+        row[_card_score_col] = card.score
+        row[_card_type_col + card.card_type.value] = 1
+    return matrix
@@ -1,10 +1,14 @@
+import json
 import time
 import tqdm
+import numpy as np
+from collections import deque
 from enum import Enum, unique
 from .player import PlayerType, Player, construct_player
 from .card import Card, make_standard_deck
-from .controller import ActionController
+from .controller import ActionController, DealBank
 from .io import get_input, UnoLogger
+from .util import RandomService, RunningStats, wilson_interval, atomic_write_json
 from colorama import init
 from colorama import Fore
 
@@ -44,20 +48,74 @@ pname_input_msg = "Please Input the Name for Player #{} (Max Length: 20)"
 pname_input_err = "Sorry, Your Input is Invalid, Try Again."
 
 
+class RoundResult(object):
+    # compact record of a played round, see `Game.iter_rounds`: the seat of the winner, the seat of each player
+    # (in the order of `Game.players`), the loss and the reward at each seat, the number of turns,
+    # the number of regenerations of the draw pile and how many of them added a deck
+    __slots__ = ("round_index", "winner_seat", "seats", "losses", "rewards", "num_turns", "num_regenerations",
+                 "num_deck_additions")
+
+    def __init__(self, round_index, winner_seat, seats, losses, rewards, num_turns, num_regenerations,
+                 num_deck_additions):
+        self.round_index = round_index
+        self.winner_seat = winner_seat
+        self.seats = seats
+        self.losses = losses
+        self.rewards = rewards
+        self.num_turns = num_turns
+        self.num_regenerations = num_regenerations
+        self.num_deck_additions = num_deck_additions
+
+    def __repr__(self):
+        return "RoundResult({})".format(self.format_attribute())
+
+    def __str__(self):
+        return "RoundResult({})".format(self.format_attribute())
+
+    def format_attribute(self):
+        return ", ".join([
+            "round_index={}".format(self.round_index),
+            "winner_seat={}".format(self.winner_seat),
+            "seats={}".format(self.seats),
+            "losses={}".format(self.losses),
+            "rewards={}".format(self.rewards),
+            "num_turns={}".format(self.num_turns),
+            "num_regenerations={}".format(self.num_regenerations),
+            "num_deck_additions={}".format(self.num_deck_additions)
+        ])
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
 class Game(object):
     def __init__(self, cards=None, players=None, end_condition=GameEndCondition.ROUND_1, interval=1,
-                 verbose=True, demo=0):
+                 verbose=True, demo=0, seed=None, deals=None, seat_rotation=0, checkpoint_path=None,
+                 checkpoint_interval=0, max_decks=None, pathological_turns=None):
         assert isinstance(end_condition, GameEndCondition)
+        assert isinstance(checkpoint_path, str) or checkpoint_path is None
+        assert isinstance(checkpoint_interval, int) and checkpoint_interval >= 0
+        assert checkpoint_interval == 0 or checkpoint_path is not None
+        assert max_decks is None or (isinstance(max_decks, int) and max_decks >= 1)
+        assert pathological_turns is None or (isinstance(pathological_turns, int) and pathological_turns > 0)
+        assert isinstance(deals, DealBank) or deals is None
+        assert isinstance(seat_rotation, int) and seat_rotation >= 0
         assert isinstance(interval, (int, float)) or interval > 0
         assert isinstance(verbose, bool)
         # set logger
         self.logger = UnoLogger(name="Game", color=Fore.LIGHTMAGENTA_EX)
         self.verbose = verbose
 
+        # set random numbers, shared by the deck and the players of the game
+        self.seed = seed
+        self.rng = RandomService(seed)
+
         # set players
         self.num_players = 0
         self.players = []
         self._init_players(players)
+        for player in self.players:
+            player.set_random_service(self.rng)
 
         # set cards
         self.cards = []
@@ -77,6 +135,34 @@ class Game(object):
 
         self.demo = demo
 
+        # set seat rotation: every `seat_rotation` rounds, the whole table moves one seat forward (0 for never),
+        # with the records of each player at each seat: seat_num_rounds[i, seat] is the number of rounds
+        # the i-th player of `players` played at `seat`
+        self.seat_rotation = seat_rotation
+        self.seat_num_rounds = np.zeros((self.num_players, self.num_players), dtype=np.int64)
+        self.seat_num_wins = np.zeros((self.num_players, self.num_players), dtype=np.int64)
+        self.seat_rewards = np.zeros((self.num_players, self.num_players), dtype=np.int64)
+        self.seat_reward_stats = [[RunningStats() for _ in range(self.num_players)] for _ in range(self.num_players)]
+
+        # set deals: each round replays a deal (deck order and random numbers), the game ends when they run out;
+        # with the seats rotating, every block of `seat_rotation` deals is replayed at each seat in turn
+        self.deals = deals
+        if deals is not None:
+            assert deals.deck_size == len(self.cards)
+
+        # set checkpoints: every `checkpoint_interval` rounds (0 for never), the state of the game between rounds
+        # is written to `checkpoint_path`, from which a game of the same configuration resumes, see `load_checkpoint`
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+        # set bounds of a round: at most `max_decks` decks in play (None for no cap, see `DeckController`),
+        # and the rounds adding a deck or lasting more than `pathological_turns` turns are reported as pathological,
+        # the last ones of them kept in `pathological_rounds`
+        self.max_decks = max_decks
+        self.pathological_turns = pathological_turns
+        self.num_pathological_rounds = 0
+        self.pathological_rounds = deque(maxlen=100)
+
     @staticmethod
     def get_num_players():
         return get_input(nplayers_input_msg,
@@ -187,6 +273,8 @@ class Game(object):
         return False
 
     def is_end(self):
+        if self.deals is not None and self.round_layout(self.num_rounds_played)[1] >= len(self.deals):
+            return True
         if self.end_condition == GameEndCondition.ROUND_1:
             return self._is_end_by_round(1)
         elif self.end_condition == GameEndCondition.ROUND_3:
@@ -225,28 +313,218 @@ class Game(object):
                                                               player.num_rounds,
                                                               round(player.win_rate * 100, 1)))
 
+    def log_seat_record(self):
+        self.logger("======================================================")
+        for index, player in enumerate(self.players):
+            assert isinstance(player, Player)
+            self.logger("{}: {}".format(player.name, ", ".join([
+                "seat {}: {}/{} ({})".format(seat,
+                                             self.seat_num_wins[index, seat],
+                                             self.seat_num_rounds[index, seat],
+                                             self.seat_rewards[index, seat])
+                for seat in range(self.num_players) if self.seat_num_rounds[index, seat] > 0])))
+
+    def summary(self, z=1.96):
+        """Statistics of every player, overall (seat None) and at each seat it played, e.g. for a pandas DataFrame:
+        rounds, wins and win rate with its Wilson interval, and mean, standard deviation, min, max and confidence
+        interval of the reward of a round. They are kept as streaming accumulators (see `util.RunningStats`),
+        which can be merged across games with `merge_summary`."""
+        rows = []
+        for index, player in enumerate(self.players):
+            seats = [(None, player.num_rounds, player.num_wins, player.reward_stats)]
+            seats += [(seat, int(self.seat_num_rounds[index, seat]), int(self.seat_num_wins[index, seat]),
+                       self.seat_reward_stats[index][seat])
+                      for seat in range(self.num_players) if self.seat_num_rounds[index, seat] > 0]
+            for seat, num_rounds, num_wins, stats in seats:
+                rows.append(Game._summary_row(player.name, seat, num_rounds, num_wins, stats, z))
+        return rows
+
+    @staticmethod
+    def _summary_row(name, seat, num_rounds, num_wins, stats, z):
+        win_ci = wilson_interval(num_wins, num_rounds, z=z)
+        reward_ci = stats.confidence_interval(z=z)
+        return {
+            "player": name,
+            "seat": seat,
+            "num_rounds": num_rounds,
+            "num_wins": num_wins,
+            "win_rate": float(num_wins) / num_rounds if num_rounds > 0 else float("nan"),
+            "win_rate_ci_low": win_ci[0],
+            "win_rate_ci_high": win_ci[1],
+            "mean_reward": stats.mean,
+            "std_reward": stats.std,
+            "min_reward": stats.min,
+            "max_reward": stats.max,
+            "reward_ci_low": reward_ci[0],
+            "reward_ci_high": reward_ci[1],
+            "reward_stats": stats.to_dict()
+        }
+
+    @staticmethod
+    def merge_summary(summaries, z=1.96):
+        """Merge the summaries of games run apart (e.g. by parallel workers) by player name and seat."""
+        merged = {}  # (player, seat) -> [num_rounds, num_wins, RunningStats]
+        for summary in summaries:
+            for row in summary:
+                entry = merged.setdefault((row["player"], row["seat"]), [0, 0, RunningStats()])
+                entry[0] += row["num_rounds"]
+                entry[1] += row["num_wins"]
+                entry[2].merge(RunningStats.from_dict(row["reward_stats"]))
+        return [Game._summary_row(name, seat, num_rounds, num_wins, stats, z)
+                for (name, seat), (num_rounds, num_wins, stats) in merged.items()]
+
+    def get_checkpoint(self):
+        """State of the game between two rounds, as a small json-serializable dict: the number of rounds played,
+        the random service, the seat records and the accumulators and policy states of the players. Loggers, cards
+        and the configuration (players, cards, deals, end condition) are not kept, they are given to the game
+        resuming from it."""
+        return {
+            "num_players": self.num_players,
+            "num_cards": len(self.cards),
+            "num_deals": None if self.deals is None else len(self.deals),
+            "num_rounds_played": self.num_rounds_played,
+            "rng": self.rng.get_state(),
+            "seat_num_rounds": self.seat_num_rounds.tolist(),
+            "seat_num_wins": self.seat_num_wins.tolist(),
+            "seat_rewards": self.seat_rewards.tolist(),
+            "seat_reward_stats": [[stats.to_dict() for stats in row] for row in self.seat_reward_stats],
+            "num_pathological_rounds": self.num_pathological_rounds,
+            "players": [player.get_state() for player in self.players]
+        }
+
+    def set_checkpoint(self, checkpoint):
+        if checkpoint["num_players"] != self.num_players or checkpoint["num_cards"] != len(self.cards) or \
+                checkpoint["num_deals"] != (None if self.deals is None else len(self.deals)):
+            raise Exception("Checkpoint of Another Game Configuration Encountered while Resuming Game")
+        self.num_rounds_played = checkpoint["num_rounds_played"]
+        self.rng.set_state(checkpoint["rng"])
+        self.seat_num_rounds = np.array(checkpoint["seat_num_rounds"], dtype=np.int64)
+        self.seat_num_wins = np.array(checkpoint["seat_num_wins"], dtype=np.int64)
+        self.seat_rewards = np.array(checkpoint["seat_rewards"], dtype=np.int64)
+        self.seat_reward_stats = [[RunningStats.from_dict(d) for d in row] for row in checkpoint["seat_reward_stats"]]
+        self.num_pathological_rounds = checkpoint.get("num_pathological_rounds", 0)
+        for player, state in zip(self.players, checkpoint["players"]):
+            player.set_state(state)
+        self.action_controller = None
+
+    def save_checkpoint(self, path=None):
+        # written atomically, so that a run killed while writing leaves the previous checkpoint intact
+        atomic_write_json(self.get_checkpoint(), self.checkpoint_path if path is None else path, indent=None)
+
+    def load_checkpoint(self, path=None):
+        with open(self.checkpoint_path if path is None else path, "r") as f:
+            self.set_checkpoint(json.load(f))
+        self.logger("Resumed after {} rounds".format(self.num_rounds_played))
+
+    def round_layout(self, round_index):
+        # (shift of the seats, index of the deal) of a round
+        if self.seat_rotation == 0:
+            return 0, round_index
+        block = round_index // self.seat_rotation
+        shift = block % self.num_players
+        deal_index = (block // self.num_players) * self.seat_rotation + round_index % self.seat_rotation
+        return shift, deal_index
+
+    def seated_players(self, shift):
+        # the players in seating order, the i-th player of `players` at seat (i + shift) % num_players
+        seated = self.players[self.num_players - shift:] + self.players[:self.num_players - shift]
+        for seat, player in enumerate(seated):
+            player.set_idx(seat)
+        return seated
+
+    def prepare_action_controller(self):
+        # the action controller of the next round: built for the first round, then reset for each new one
+        shift, deal_index = self.round_layout(self.num_rounds_played)
+        rng = self.rng
+        deal = None
+        if self.deals is not None:
+            if deal_index >= len(self.deals):
+                raise Exception("Deals Run Out while Starting Round")
+            deal = self.deals[deal_index]
+            rng = deal.random_service()
+            for player in self.players:
+                player.set_random_service(rng)
+        if self.action_controller is None:
+            self.action_controller = ActionController(self.cards,
+                                                      self.seated_players(shift),
+                                                      interval=self.interval,
+                                                      stream=self.verbose,
+                                                      rng=rng,
+                                                      deal=deal,
+                                                      max_decks=self.max_decks)
+        else:
+            self.action_controller.reset(players=self.seated_players(shift), deal=deal, rng=rng)
+        return self.action_controller
+
+    def play_round(self):
+        self.prepare_action_controller()
+        losses_before = [player.cumulative_loss for player in self.players]
+        rewards_before = [player.cumulative_reward for player in self.players]
+        winner = self.action_controller.run()
+
+        losses = [0] * self.num_players
+        rewards = [0] * self.num_players
+        for index, player in enumerate(self.players):
+            seat = player.idx
+            losses[seat] = player.cumulative_loss - losses_before[index]
+            rewards[seat] = player.cumulative_reward - rewards_before[index]
+            self.seat_num_rounds[index, seat] += 1
+            self.seat_num_wins[index, seat] += int(player is winner)
+            self.seat_rewards[index, seat] += rewards[seat]
+            self.seat_reward_stats[index][seat].push(rewards[seat])
+
+        dc = self.action_controller.deck_controller
+        result = RoundResult(self.num_rounds_played, winner.idx, tuple([player.idx for player in self.players]),
+                             tuple(losses), tuple(rewards), self.action_controller.num_turns,
+                             dc.num_regenerations, dc.num_deck_additions)
+        if self.is_pathological(result):
+            self.num_pathological_rounds += 1
+            self.pathological_rounds.append(result)
+            self.logger("Pathological round: {}".format(result))
+        self.num_rounds_played += 1
+        return result
+
+    def is_pathological(self, result):
+        # a round whose cards ran out (a deck was added), or too long
+        return result.num_deck_additions > 0 or \
+            (self.pathological_turns is not None and result.num_turns > self.pathological_turns)
+
+    def iter_rounds(self, num_rounds=None):
+        """Play rounds as a generator of `RoundResult`, `num_rounds` of them or until the end condition is met.
+
+        Nothing is kept per round, so the memory does not grow with the number of rounds, and the caller can
+        stop at any time: the players are seated back in their order once the generator is done or closed.
+        """
+        try:
+            num_played = 0
+            while not (self.is_end() if num_rounds is None else num_played >= num_rounds):
+                result = self.play_round()
+                num_played += 1
+                if self.checkpoint_interval > 0 and self.num_rounds_played % self.checkpoint_interval == 0:
+                    self.save_checkpoint()
+                yield result
+        finally:
+            self.seated_players(0)
+
     def run(self):
         self.last_start_time = time.time()
 
         if self.demo == 0:
-            while not self.is_end():
-                self.action_controller = ActionController(self.cards,
-                                                          self.players,
-                                                          interval=self.interval,
-                                                          stream=self.verbose)
-                self.action_controller.run()
-                self.num_rounds_played += 1
+            for _ in self.iter_rounds():
+                pass
         else:
-            for _ in tqdm.tqdm(range(self.demo), desc=self.logger.label + " "):
-                self.action_controller = ActionController(self.cards,
-                                                          self.players,
-                                                          interval=self.interval,
-                                                          stream=self.verbose)
-                self.action_controller.run()
-                self.num_rounds_played += 1
+            # a resumed game only plays the rounds left
+            num_rounds = max(0, self.demo - self.num_rounds_played)
+            for _ in tqdm.tqdm(self.iter_rounds(num_rounds), initial=self.demo - num_rounds, total=self.demo,
+                               desc=self.logger.label + " "):
+                pass
 
         self.last_end_time = time.time()
         self.logger("Game over after {} rounds".format(self.num_rounds_played))
         self.logger("Time consumption: {}s".format(round(self.last_end_time - self.last_start_time, 3)))
         self.log_reward()
         self.log_record()
+        if self.seat_rotation > 0:
+            self.log_seat_record()
+        if self.num_pathological_rounds > 0:
+            self.logger("Pathological rounds: {}/{}".format(self.num_pathological_rounds, self.num_rounds_played))
@@ -1,2 +1,4 @@
 from .input import get_input
 from .logger import UnoLogger
+from .action_recorder import ActionRecorder, iter_recorded_actions
+from .action_recorder import canonicalize_recorded_actions, dedup_recorded_plays
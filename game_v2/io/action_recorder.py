@@ -0,0 +1,193 @@
+import glob
+import os
+import numpy as np
+from array import array
+from ..card import canonical_permutations
+from ..card.color_permutation import color_maps, card_id_maps
+
+
+# state fields of a record, unknown fields (e.g. color before the initial wildcard is resolved) are -1
+state_fields = ("color", "value", "type", "to_draw")
+action_kinds = ("get_play", "get_color", "play_new")
+
+
+def encode_play_state(play_state):
+    if play_state is None:
+        return -1, -1, -1, -1
+    color = play_state.get("color", None)
+    value = play_state.get("value", None)
+    ctype = play_state.get("type", None)
+    to_draw = play_state.get("to_draw", None)
+    return (-1 if color is None else color.value,
+            -1 if value is None else value,
+            -1 if ctype is None else ctype.value,
+            -1 if to_draw is None else to_draw)
+
+
+class _ChunkBuffer(object):
+    # fixed-size columns plus a flat, CSR-like list of card ids (one variable-length run per record)
+    def __init__(self, kind, directory, chunk_size, compressed):
+        self.kind = kind
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.compressed = compressed
+        self.num_chunks = len(glob.glob(os.path.join(directory, "{}_*.npz".format(kind))))
+        self.num_records = 0
+        self.size = 0
+        self.round = np.zeros(chunk_size, dtype=np.int32)
+        self.player = np.zeros(chunk_size, dtype=np.int8)
+        self.state = np.zeros((chunk_size, len(state_fields)), dtype=np.int16)
+        self.choice = np.zeros(chunk_size, dtype=np.int16)
+        self.card_offsets = np.zeros(chunk_size + 1, dtype=np.int32)
+        self.card_ids = array("b")
+
+    def append(self, round_idx, player_idx, play_state, card_ids, choice):
+        i = self.size
+        self.round[i] = round_idx
+        self.player[i] = player_idx
+        self.state[i] = encode_play_state(play_state)
+        self.choice[i] = choice
+        self.card_ids.extend(card_ids)
+        self.card_offsets[i + 1] = len(self.card_ids)
+        self.size += 1
+        self.num_records += 1
+        if self.size == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.size == 0:
+            return
+        n = self.size
+        path = os.path.join(self.directory, "{}_{:06d}.npz".format(self.kind, self.num_chunks))
+        save = np.savez_compressed if self.compressed else np.savez
+        save(path,
+             round=self.round[:n],
+             player=self.player[:n],
+             state=self.state[:n],
+             choice=self.choice[:n],
+             card_offsets=self.card_offsets[:n + 1],
+             card_ids=np.frombuffer(self.card_ids, dtype=np.int8))
+        self.num_chunks += 1
+        self.size = 0
+        self.card_ids = array("b")
+
+
+class ActionRecorder(object):
+    """Stream the decisions of players to fixed-size chunks on disk.
+
+    Records are grouped by kind (get_play, get_color, play_new) and kept in preallocated buffers
+    of `chunk_size` records, each flushed to `<directory>/<kind>_<chunk>.npz` when full, so memory
+    stays bounded however many rounds are played. A chunk holds the columns
+
+    * round (int32), player (int8): round index and position of the deciding player
+    * state (int16, n x 4): color, value, type and to_draw of the play state
+    * choice (int16): index in the playable cards (-1 for not playing), color value, or 0/1 for play_new
+    * card_offsets (int32, n + 1), card_ids (int8): card ids of record i are
+      `card_ids[card_offsets[i]:card_offsets[i + 1]]`, i.e. the playable cards, the hand from which a
+      color is chosen, or the single new playable card
+
+    Use `iter_recorded_actions` to read them back.
+    """
+    def __init__(self, directory, chunk_size=65536, compressed=False):
+        assert isinstance(directory, str)
+        assert isinstance(chunk_size, int) and chunk_size > 0
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.buffers = {kind: _ChunkBuffer(kind, directory, chunk_size, compressed) for kind in action_kinds}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def record_get_play(self, player, play_state, playable_cards, play):
+        choice = -1 if play is None else playable_cards.index(play)
+        self.buffers["get_play"].append(player.num_rounds, player.idx, play_state,
+                                        [card.card_id for i, card in playable_cards], choice)
+
+    def record_get_color(self, player, play_state, cards, color):
+        self.buffers["get_color"].append(player.num_rounds, player.idx, play_state,
+                                         [card.card_id for card in cards], color.value)
+
+    def record_play_new(self, player, play_state, new_playable, play):
+        self.buffers["play_new"].append(player.num_rounds, player.idx, play_state,
+                                        [new_playable.card_id], int(play))
+
+    @property
+    def num_records(self):
+        return {kind: buffer.num_records for kind, buffer in self.buffers.items()}
+
+    def flush(self):
+        for buffer in self.buffers.values():
+            buffer.flush()
+
+    def close(self):
+        self.flush()
+
+
+def iter_recorded_actions(directory, kind):
+    """Yield the chunks of one kind of records written by `ActionRecorder`, in order.
+
+    Each chunk is a dict of NumPy arrays with the columns described in `ActionRecorder`.
+    """
+    assert kind in action_kinds
+    for path in sorted(glob.glob(os.path.join(directory, "{}_*.npz".format(kind)))):
+        with np.load(path) as chunk:
+            yield {key: chunk[key] for key in chunk.files}
+
+
+def canonicalize_recorded_actions(chunk, kind):
+    """Rename the colors of each record of a chunk to its canonical color ordering.
+
+    The color of the play state, the card ids and, for get_color records, the chosen color are mapped by
+    `game_v2.card.canonical_permutation` of the record; the permutation index of each record is added
+    under the key "permutation". Choices given as indices in the cards are kept.
+    """
+    assert kind in action_kinds
+    offsets = chunk["card_offsets"].astype(np.int64)
+    card_ids = chunk["card_ids"].astype(np.int64)
+    state = chunk["state"].copy()
+    permutations = canonical_permutations(state[:, 0], offsets, card_ids)
+
+    has_color = state[:, 0] > 0
+    state[has_color, 0] = color_maps[permutations[has_color], state[has_color, 0]]
+    canonical = dict(chunk)
+    canonical["state"] = state
+    canonical["card_ids"] = card_id_maps[np.repeat(permutations, np.diff(offsets)), card_ids].astype(
+        chunk["card_ids"].dtype)
+    if kind == "get_color":
+        canonical["choice"] = color_maps[permutations, chunk["choice"]].astype(chunk["choice"].dtype)
+    canonical["permutation"] = permutations
+    return canonical
+
+
+def dedup_recorded_plays(chunk):
+    """Merge the get_play records of a chunk with the same play state, playable cards (as a multiset) and
+    played card, e.g. after `canonicalize_recorded_actions`.
+
+    Returns a chunk with the columns state, choice, card_offsets and card_ids, where the card ids of each
+    record are sorted, plus the number of merged records under the key "count".
+    """
+    offsets = chunk["card_offsets"]
+    card_ids = chunk["card_ids"]
+    counts = {}
+    for i in range(len(chunk["choice"])):
+        cards = card_ids[offsets[i]:offsets[i + 1]]
+        choice = int(chunk["choice"][i])
+        key = (tuple(chunk["state"][i].tolist()),
+               tuple(sorted(cards.tolist())),
+               -1 if choice < 0 else int(cards[choice]))
+        counts[key] = counts.get(key, 0) + 1
+
+    state = np.array([key[0] for key in counts], dtype=np.int16).reshape((-1, len(state_fields)))
+    runs = [key[1] for key in counts]
+    choice = np.array([-1 if played < 0 else run.index(played) for (_, run, played) in counts], dtype=np.int16)
+    card_offsets = np.concatenate([[0], np.cumsum([len(run) for run in runs])]).astype(np.int32)
+    return {
+        "state": state,
+        "choice": choice,
+        "card_offsets": card_offsets,
+        "card_ids": np.array([card_id for run in runs for card_id in run], dtype=np.int8),
+        "count": np.array(list(counts.values()), dtype=np.int64)
+    }
@@ -1,6 +1,8 @@
+import copy
 from enum import Enum, unique
 from ..card import CardColor, Card
-from ..io import UnoLogger
+from ..io import UnoLogger, ActionRecorder
+from ..util import RandomService, RunningStats, wilson_interval
 from colorama import init
 from colorama import Fore
 
@@ -26,7 +28,8 @@ class PlayerType(Enum):
 
 
 class Player(object):
-    def __init__(self, ptype, name, idx, stream=True, filename=None, save_rewards=False, save_actions=False):
+    def __init__(self, ptype, name, idx, stream=True, filename=None, save_rewards=False, save_actions=False,
+                 recorder=None):
         assert isinstance(ptype, PlayerType)
         assert isinstance(name, str)
         assert isinstance(idx, int) and idx >= 0
@@ -34,6 +37,7 @@ class Player(object):
         assert isinstance(filename, str) or filename is None
         assert isinstance(save_rewards, bool)
         assert isinstance(save_actions, bool)
+        assert isinstance(recorder, ActionRecorder) or recorder is None
         self.type = ptype
         self.name = name
         self.idx = idx
@@ -42,6 +46,7 @@ class Player(object):
         self.num_wins = 0
         self.cumulative_loss = 0
         self.cumulative_reward = 0
+        self.reward_stats = RunningStats()  # of the reward of each round, without keeping them (see save_rewards)
         self.logger = UnoLogger(name="{} {}".format(type(self).__name__, self.name),
                                 color=Fore.CYAN,
                                 stream=stream,
@@ -51,6 +56,9 @@ class Player(object):
         self.rewards = []
         self.actions = []
         self.current_round_actions = None
+        self.recorder = recorder  # streams actions to disk instead of keeping them in memory
+        self.rng = RandomService()  # replaced by the one of the game, see `set_random_service`
+        self.hand_listeners = []  # notified of every change of the cards, see `add_hand_listener`
 
     def __repr__(self):
         return "{}({})".format(self.type.name, self.format_attribute())
@@ -85,16 +93,49 @@ class Player(object):
     def win_rate(self):
         return float(self.num_wins) / self.num_rounds
 
+    def win_rate_interval(self, z=1.96):
+        return wilson_interval(self.num_wins, self.num_rounds, z=z)
+
     def set_idx(self, idx):
         assert isinstance(idx, int) and idx >= 0
         self.idx = idx
 
+    def set_random_service(self, rng):
+        assert isinstance(rng, RandomService)
+        self.rng = rng
+
+    def get_state(self):
+        # accumulators of the player across rounds as json-serializable values, see `Game.get_checkpoint`;
+        # the actions kept by save_actions hold live cards and are left out (stream them with a recorder instead)
+        state = {
+            "name": self.name,
+            "num_rounds": self.num_rounds,
+            "num_wins": self.num_wins,
+            "cumulative_loss": self.cumulative_loss,
+            "cumulative_reward": self.cumulative_reward,
+            "reward_stats": self.reward_stats.to_dict()
+        }
+        if self.save_rewards:
+            state["rewards"] = list(self.rewards)
+        return state
+
+    def set_state(self, state):
+        assert state["name"] == self.name
+        self.num_rounds = state["num_rounds"]
+        self.num_wins = state["num_wins"]
+        self.cumulative_loss = state["cumulative_loss"]
+        self.cumulative_reward = state["cumulative_reward"]
+        self.reward_stats = RunningStats.from_dict(state["reward_stats"])
+        if self.save_rewards:
+            self.rewards = list(state.get("rewards", []))
+
     def count_loss(self):
         self.cumulative_loss += self.loss
 
     def add_reward(self, num):
         assert isinstance(num, int)
         self.cumulative_reward += num
+        self.reward_stats.push(num)
         if self.save_rewards:
             self.rewards.append(num)
 
@@ -110,9 +151,18 @@ class Player(object):
     def is_policy(self):
         return False  # to be overriden by PolicyPlayer
 
+    def add_hand_listener(self, listener):
+        # listener has the methods on_cards_added(cards), on_card_removed(card) and on_cards_cleared()
+        self.hand_listeners.append(listener)
+
+    def remove_hand_listener(self, listener):
+        self.hand_listeners.remove(listener)
+
     def get_card(self, card):
         assert isinstance(card, Card)
         self.cards.append(card)
+        for listener in self.hand_listeners:
+            listener.on_cards_added([card])
         self.logger("Draws 1 card.")
 
     def get_cards(self, cards):
@@ -120,10 +170,38 @@ class Player(object):
         for card in cards:
             assert isinstance(card, Card)
             self.cards.append(card)
+        for listener in self.hand_listeners:
+            listener.on_cards_added(cards)
         self.logger("Draws {} card.".format(len(cards)))
 
     def clear_cards(self):
         self.cards = []
+        for listener in self.hand_listeners:
+            listener.on_cards_cleared()
+
+    def set_cards(self, cards):
+        # replace the whole hand at once, e.g. when restoring a snapshot
+        self.cards = list(cards)
+        for listener in self.hand_listeners:
+            listener.on_cards_cleared()
+            listener.on_cards_added(self.cards)
+
+    def clone(self, logger=None):
+        # lightweight copy for a forked round: it shares the policies and the random service of the player,
+        # but has its own hand, no hand listeners and records nothing
+        player = copy.copy(self)
+        player.cards = list(self.cards)
+        player.hand_listeners = []
+        player.save_rewards = False
+        player.save_actions = False
+        player.rewards = []
+        player.reward_stats = RunningStats()
+        player.actions = []
+        player.current_round_actions = None
+        player.recorder = None
+        if logger is not None:
+            player.logger = logger
+        return player
 
     def start_round(self):
         # assume cards already cleared
@@ -139,6 +217,8 @@ class Player(object):
     def play_card(self, index):
         assert 0 <= index < self.num_cards
         card = self.cards.pop(index)
+        for listener in self.hand_listeners:
+            listener.on_card_removed(card)
         self.logger("Plays {} ({} cards left).".format(card, self.num_cards))
         if self.is_uno():
             self.logger("Calls UNO!")
@@ -177,7 +257,10 @@ class Player(object):
         raise NotImplementedError
 
     def get_play_from_playable(self, playable_cards, **info):
-        play = self._get_play_from_playable(playable_cards, **info)
+        return self.commit_play(playable_cards, self._get_play_from_playable(playable_cards, **info), **info)
+
+    def commit_play(self, playable_cards, play, **info):
+        # check and record a get_play decision, however it was made
         if play is not None:
             assert isinstance(play, tuple) and len(play) == 2
             assert isinstance(play[0], int) and 0 <= play[0] <= self.num_cards
@@ -189,6 +272,8 @@ class Player(object):
             self.current_round_actions.append((info.get("play_state", None),
                                                [card for i, card in playable_cards],
                                                index))
+        if self.recorder is not None:
+            self.recorder.record_get_play(self, info.get("play_state", None), playable_cards, play)
 
         return play
 
@@ -210,12 +295,16 @@ class Player(object):
         raise NotImplementedError
 
     def play_new_playable(self, new_playable, **info):
-        play = self._play_new_playable(new_playable, **info)
+        return self.commit_play_new(new_playable, self._play_new_playable(new_playable, **info), **info)
+
+    def commit_play_new(self, new_playable, play, **info):
         assert isinstance(play, bool)
 
         # append actions
         if self.save_actions:
             self.current_round_actions.append((info.get("play_state", None), new_playable, play))
+        if self.recorder is not None:
+            self.recorder.record_play_new(self, info.get("play_state", None), new_playable, play)
 
         return play
 
@@ -240,7 +329,9 @@ class Player(object):
         raise NotImplementedError
 
     def get_color(self, **info):
-        color = self._get_color(**info)
+        return self.commit_color(self._get_color(**info), **info)
+
+    def commit_color(self, color, **info):
         assert isinstance(color, CardColor)
         self.logger("Selects color {}".format(color(color)))
 
@@ -249,9 +340,23 @@ class Player(object):
             self.current_round_actions.append((info.get("play_state", None),
                                                [card for card in self.cards],
                                                color))
+        if self.recorder is not None:
+            self.recorder.record_get_color(self, info.get("play_state", None), self.cards, color)
 
         return color
 
+    def decide(self, request):
+        # make the decision of a request yielded by `ActionController.iter_run`, without checking or recording it,
+        # which is done by the engine with `commit_play`, `commit_color` or `commit_play_new` once it is answered
+        if request.kind == "get_play":
+            return self._get_play_from_playable(request.options, **request.info)
+        elif request.kind == "get_color":
+            return self._get_color(**request.info)
+        elif request.kind == "play_new":
+            return self._play_new_playable(request.options, **request.info)
+        else:
+            raise Exception("Unknown Decision Kind Encountered while Deciding")
+
     def is_done(self):
         return self.num_cards == 0
 
@@ -3,10 +3,11 @@ from ..card import CardColor, Card
 
 
 class PCGreedyPlayer(Player):
-    def __init__(self, name, idx, stream=True, filename=None, save_rewards=False, save_actions=False):
+    def __init__(self, name, idx, stream=True, filename=None, save_rewards=False, save_actions=False,
+                 recorder=None):
         super().__init__(PlayerType.PC_GREEDY, name, idx,
                          stream=stream, filename=filename,
-                         save_rewards=save_rewards, save_actions=save_actions)
+                         save_rewards=save_rewards, save_actions=save_actions, recorder=recorder)
 
     def _get_play_from_playable(self, playable_cards, **info):
         assert isinstance(playable_cards, list) and len(playable_cards) > 0
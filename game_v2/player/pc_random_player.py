@@ -1,9 +1,10 @@
-import numpy as np
-import random
 from .base import PlayerType, Player
 from ..card import CardColor
 
 
+random_colors = [CardColor.RED, CardColor.GREEN, CardColor.BLUE, CardColor.YELLOW]
+
+
 class PCRandomPlayer(Player):
     def __init__(self, name, idx, play_draw=1., stream=True, filename=None, save_rewards=False):
         assert (isinstance(play_draw, float) and 0 <= play_draw <= 1) or play_draw == 0 or play_draw == 1
@@ -13,10 +14,10 @@ class PCRandomPlayer(Player):
 
     def _get_play_from_playable(self, playable_cards, **info):
         assert isinstance(playable_cards, list) and len(playable_cards) > 0
-        return random.choice(playable_cards)
+        return self.rng.choice(playable_cards)
 
     def _play_new_playable(self, new_playable, **info):
-        return bool(np.random.choice([True, False], p=self.probs_for_draw))  # to unify type
+        return self.rng.bernoulli(self.probs_for_draw[0])
 
     def _get_color(self, **info):
-        return np.random.choice([CardColor.RED, CardColor.GREEN, CardColor.BLUE, CardColor.YELLOW])
+        return self.rng.choice(random_colors)
@@ -8,14 +8,14 @@ class PolicyPlayer(Player):
                  get_color=GreedyGetColorPolicy(),
                  play_new=GreedyPlayNewPolicy(),
                  stream=True, filename=None,
-                 save_rewards=False, save_actions=False):
+                 save_rewards=False, save_actions=False, recorder=None):
         assert isinstance(get_play, Policy) and get_play.atype == ActionType.GET_PLAY
         assert isinstance(get_color, Policy) and get_color.atype == ActionType.GET_COLOR
         assert isinstance(play_new, Policy) and play_new.atype == ActionType.PLAY_NEW
 
         super().__init__(PlayerType.POLICY, name, idx,
                          stream=stream, filename=filename,
-                         save_rewards=save_rewards, save_actions=save_actions)
+                         save_rewards=save_rewards, save_actions=save_actions, recorder=recorder)
         self.get_play_policy = get_play
         self.get_color_policy = get_color
         self.play_new_policy = play_new
@@ -55,17 +55,32 @@ class PolicyPlayer(Player):
         ]
         return ", ".join(policy_strings)
 
+    def get_state(self):
+        state = super().get_state()
+        state["get_play_policy"] = self.get_play_policy.get_state()
+        state["get_color_policy"] = self.get_color_policy.get_state()
+        state["play_new_policy"] = self.play_new_policy.get_state()
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.get_play_policy.set_state(state["get_play_policy"])
+        self.get_color_policy.set_state(state["get_color_policy"])
+        self.play_new_policy.set_state(state["play_new_policy"])
+
+    def get_play_kwargs(self, playable_cards, **info):
+        # keyword arguments of the get_play policy, also used to batch the requests of model policies
+        return dict(playable_cards=playable_cards, num_cards_left=self.num_cards, current_player=self, rng=self.rng,
+                    **info)
+
     def _get_play_from_playable(self, playable_cards, **info):
-        return self.get_play_policy.get_action(playable_cards=playable_cards,
-                                               num_cards_left=self.num_cards,
-                                               current_player=self,
-                                               **info)
+        return self.get_play_policy.get_action(**self.get_play_kwargs(playable_cards, **info))
 
     def _play_new_playable(self, new_playable, **info):
-        return self.play_new_policy.get_action(new_playable=new_playable, current_player=self, **info)
+        return self.play_new_policy.get_action(new_playable=new_playable, current_player=self, rng=self.rng, **info)
 
     def _get_color(self, **info):
-        return self.get_color_policy.get_action(cards=self.cards, current_player=self, **info)
+        return self.get_color_policy.get_action(cards=self.cards, current_player=self, rng=self.rng, **info)
 
     def is_policy(self):
         return True
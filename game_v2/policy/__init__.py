@@ -1,9 +1,20 @@
-from .base import Policy, ActionType
+from .base import Policy, ModelPolicy, ActionType
 from .greedy_policy import GreedyGetPlayPolicy, GreedyGetColorPolicy, GreedyPlayNewPolicy
 from .lr_policy import LRPolicy
 from .keras_policy import KerasPolicy
+from .dense_network import DenseNetwork
+from .cached_policy import CachedPolicy
+from .inference_service import InferenceService, InferenceServer, RemoteInferenceService
 from .colluding_policy import ColludingPolicy, NeighborColludingGetPlay, NeighborColludingGetColor
+from .hand_index import HandIndex
+from .team_view import TeamView
+from .determinization import DeterminizationSampler, sample_deals, determinize_snapshots
 from .first_card_policy import FirstCardGetPlayPolicy, FirstCardGetColorPolicy, FirstCardPlayNewPolicy
 from .first_two_greedy_policy import FirstTwoGreedyGetPlayPolicy, FirstTwoGreedyGetColorPolicy, FirstTwoGreedyPlayNewPolicy
 from .probabilistic_fc_or_greedy_policy import ProbabilisticFCOrGreedyGetPlayPolicy, ProbabilisticFCOrGreedyGetColorPolicy, ProbabilisticFCOrGreedyPlayNewPolicy
 from .weighted_fc_or_greedy_policy import WeightedFCOrGreedyGetPlayPolicy, WeightedFCOrGreedyGetColorPolicy, WeightedFCOrGreedyPlayNewPolicy
+from .ismcts_policy import ISMCTS, ISMCTSPolicy
+from .ismcts_policy import ISMCTSGetPlayPolicy, ISMCTSGetColorPolicy, ISMCTSPlayNewPolicy
+from .endgame_solver import EndgameSolver, EndgameResult, EndgamePolicy
+from .endgame_solver import EndgameGetPlayPolicy, EndgameGetColorPolicy, EndgamePlayNewPolicy
+from .endgame_solver import make_endgame_policies
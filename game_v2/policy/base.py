@@ -1,5 +1,7 @@
-from ..card import Card, CardColor
+from ..card import Card, CardColor, num_card_ids
+from ..feature import card_names, encode_play
 from enum import Enum, unique
+import numpy as np
 import functools
 
 
@@ -94,14 +96,38 @@ class Policy(object):
     def is_colluding_policy(self):
         return False
 
+    def can_batch(self):
+        # whether `get_actions` answers a batch of requests at once, see `controller.answer_requests`
+        return False
+
+    def get_state(self):
+        # json-serializable state to carry over a checkpoint of a game, see `Game.get_checkpoint`:
+        # counters and random services of the stateful policies, not their models nor their caches
+        return {}
+
+    def set_state(self, state):
+        assert isinstance(state, dict)
+
 
 class ModelPolicy(Policy):
-    def __init__(self, name, atype, model, strategy, classmap=None):
+    # if no strategy is given, get_play decisions are made by `model_get_play`:
+    # the features are encoded by `encode`, the model scores its classes by `predict_rows`,
+    # and the playable card of the highest score is played;
+    # with an inference service set, the rows are scored by the service instead, batched with other games
+    def __init__(self, name, atype, model, strategy=None, classmap=None):
         assert classmap is None or isinstance(classmap, dict)
+        self.use_default_strategy = strategy is None
+        if self.use_default_strategy:
+            strategy = self.model_get_play
         super().__init__(name, atype, strategy)
+        assert not self.use_default_strategy or self.atype == ActionType.GET_PLAY
         self.model = None  # to mute IDE warning
         self.classmap = None  # to mute IDE warning
         self.init_model(model, classmap)
+        self.card_class_index = self.make_card_class_index()
+        if self.use_default_strategy and not (self.card_class_index >= 0).any():
+            raise Exception("ModelPolicy with the Default Strategy Needs a Classmap of Card Names")
+        self.inference_service = None
         self.fix_param()
 
     def init_model(self, model, classmap):
@@ -109,3 +135,61 @@ class ModelPolicy(Policy):
 
     def fix_param(self):
         self.strategy = functools.partial(self.strategy, model=self.model, classmap=self.classmap)
+
+    def can_batch(self):
+        return self.use_default_strategy and self.inference_service is None
+
+    def set_inference_service(self, service):
+        # service is an InferenceService or a RemoteInferenceService of this model, or None to predict locally
+        assert service is None or callable(getattr(service, "predict", None))
+        assert service is None or self.use_default_strategy
+        self.inference_service = service
+
+    def make_card_class_index(self):
+        # class index of each card id, -1 if the model has no class for the card
+        index = np.full(num_card_ids, -1, dtype=np.int64)
+        if self.classmap is not None:
+            for card_id, name in enumerate(card_names):
+                index[card_id] = self.classmap.get(name, -1)
+        return index
+
+    def encode(self, playable_cards, **info):
+        return encode_play(info.get("play_state", None), playable_cards)
+
+    def predict_rows(self, rows):
+        # scores of all classes for a batch of feature rows, the higher the better
+        raise NotImplementedError
+
+    def score_playable(self, row, class_indices):
+        # to override if the scores of a few classes can be computed cheaper than all of them
+        return self.predict_rows(row.reshape((1, -1)))[0][class_indices]
+
+    def _select_playable(self, playable_cards, score_fn):
+        class_indices = self.card_class_index[[card.card_id for index, card in playable_cards]]
+        scores = np.asarray(score_fn(class_indices), dtype=np.float64)
+        scores[class_indices < 0] = -np.inf
+        return playable_cards[int(np.argmax(scores))]
+
+    def model_get_play(self, playable_cards, model=None, classmap=None, **info):
+        row = self.encode(playable_cards, **info)
+        if self.inference_service is not None:
+            return self._select_playable(playable_cards, self.inference_service.predict(row).__getitem__)
+        return self._select_playable(playable_cards, lambda class_indices: self.score_playable(row, class_indices))
+
+    def get_actions(self, requests):
+        """Make get_play decisions for a batch of states with a single model call.
+
+        `requests` is a list of keyword argument dicts as given to `get_action`, each with at least
+        `playable_cards`. Only available with the default strategy.
+        """
+        assert self.use_default_strategy
+        if len(requests) == 0:
+            return []
+        rows = np.vstack([self.encode(**request) for request in requests])
+        scores = self.predict_rows(rows)
+        actions = []
+        for request, row_scores in zip(requests, scores):
+            action = self._select_playable(request["playable_cards"], row_scores.__getitem__)
+            self.check_action(action)
+            actions.append(action)
+        return actions
@@ -0,0 +1,217 @@
+from .base import Policy, ActionType
+from ..card import Card, CardColor, identity_permutation, inverse_permutations, canonical_permutation
+from ..card import permute_card_id, permute_color
+from collections import OrderedDict
+from enum import Enum
+
+
+_missing = object()
+
+
+def freeze_play_state(play_state, p=identity_permutation):
+    if play_state is None:
+        return None
+    color = permute_color(p, play_state.get("color", None))
+    ctype = play_state.get("type", None)
+    return (None if color is None else color.value,
+            play_state.get("value", None),
+            None if ctype is None else ctype.value,
+            play_state.get("to_draw", None))
+
+
+def freeze_info(value, p=identity_permutation, order_insensitive=False):
+    # hashable stand-in of an info value: card ids for cards (sorted for collections of cards if order_insensitive),
+    # with cards and colors renamed by the color permutation p
+    if isinstance(value, Card):
+        return permute_card_id(p, value.card_id)
+    elif isinstance(value, CardColor):
+        return permute_color(p, value).value
+    elif isinstance(value, Enum):
+        return value.value
+    elif isinstance(value, (list, tuple)):
+        frozen = tuple(freeze_info(elem, p, order_insensitive) for elem in value)
+        if order_insensitive and len(value) > 0 and all(isinstance(elem, Card) for elem in value):
+            frozen = tuple(sorted(frozen))
+        return frozen
+    elif isinstance(value, dict):
+        return tuple(sorted((key, freeze_info(elem, p, order_insensitive)) for key, elem in value.items()))
+    else:
+        hash(value)  # fail early on unhashable values
+        return value
+
+
+def thaw_key(value):
+    # key read back from json, which turns its tuples into lists
+    if isinstance(value, list):
+        return tuple(thaw_key(elem) for elem in value)
+    return value
+
+
+class CachedPolicy(Policy):
+    # memoize the decisions of a deterministic policy, keyed by the play state, the card ids of the options
+    # (playable cards, hand for get_color, or the new playable card) and the values of `info_keys`;
+    # `info_keys` must cover whatever else the wrapped strategy reads (e.g. "num_cards_left");
+    # the options (and the collections of cards in the info) are keyed in their order, as the strategies choosing
+    # by position (first_two_greedy, weighted_fc, first_card) or breaking score ties by position (greedy) depend on
+    # it, and get_play decisions are kept as the position in the playable cards; order_insensitive keys them as
+    # multisets instead, which is only correct for policies whose decision does not depend on that order;
+    # with canonical_colors, decisions equal up to a permutation of the colors share their entry,
+    # which is only correct for policies treating the colors symmetrically (e.g. the greedy ones);
+    # the entries only save time, so they are left out of checkpoints unless checkpoint_cache (to resume warm)
+    def __init__(self, policy, max_size=65536, info_keys=(), order_insensitive=False, canonical_colors=False,
+                 checkpoint_cache=False):
+        assert isinstance(policy, Policy)
+        assert not policy.is_colluding_policy(), "Colluding policies depend on the cards of other players"
+        assert isinstance(max_size, int) and max_size > 0
+        assert isinstance(order_insensitive, bool)
+        assert isinstance(canonical_colors, bool)
+        assert isinstance(checkpoint_cache, bool)
+        super().__init__(name="cached_{}".format(policy.name), atype=policy.atype, strategy=self.cached_get_action)
+        self.policy = policy
+        self.max_size = max_size
+        self.info_keys = tuple(info_keys)
+        self.order_insensitive = order_insensitive
+        self.canonical_colors = canonical_colors
+        self.checkpoint_cache = checkpoint_cache
+        self.cache = OrderedDict()
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def __repr__(self):
+        return "CachedPolicy({})".format(self.policy)
+
+    def __str__(self):
+        return "CachedPolicy({})".format(self.policy)
+
+    @property
+    def hit_rate(self):
+        num_lookups = self.num_hits + self.num_misses
+        return float(self.num_hits) / num_lookups if num_lookups > 0 else 0.
+
+    def get_state(self):
+        # the entries in least recently used order, as pairs of key and value (colors by their values)
+        state = {"policy": self.policy.get_state(), "num_hits": self.num_hits, "num_misses": self.num_misses}
+        if self.checkpoint_cache:
+            if self.atype == ActionType.GET_COLOR:
+                state["cache"] = [(key, value.value) for key, value in self.cache.items()]
+            else:
+                state["cache"] = list(self.cache.items())
+        return state
+
+    def set_state(self, state):
+        self.policy.set_state(state["policy"])
+        self.num_hits = state["num_hits"]
+        self.num_misses = state["num_misses"]
+        self.cache.clear()
+        for key, value in state.get("cache", []):
+            self.cache[thaw_key(key)] = CardColor(value) if self.atype == ActionType.GET_COLOR else value
+
+    def clear_cache(self):
+        self.cache.clear()
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def can_batch(self):
+        return self.policy.can_batch()
+
+    def _option_ids(self, **kwargs):
+        if self.atype == ActionType.GET_PLAY:
+            return [card.card_id for index, card in kwargs["playable_cards"]]
+        elif self.atype == ActionType.GET_COLOR:
+            return [card.card_id for card in kwargs.get("cards", [])]
+        else:
+            return [kwargs["new_playable"].card_id]
+
+    def make_key(self, **kwargs):
+        # the key, and the color permutation applied to the decision to get it
+        play_state = kwargs.get("play_state", None)
+        option_ids = self._option_ids(**kwargs)
+        p = identity_permutation
+        if self.canonical_colors:
+            p = canonical_permutation(None if play_state is None else play_state.get("color", None), option_ids)
+        options = tuple(permute_card_id(p, card_id) for card_id in option_ids)
+        if self.order_insensitive:
+            options = tuple(sorted(options))
+        key = ((freeze_play_state(play_state, p), options) +
+               tuple(freeze_info(kwargs.get(key, None), p, self.order_insensitive) for key in self.info_keys))
+        return key, p
+
+    def _encode_action(self, action, p, **kwargs):
+        # get_play decisions are kept as the position in the playable cards, or as the card id played
+        # if order_insensitive (None for not playing), others as they are, in the colors of the key
+        if self.atype == ActionType.GET_PLAY:
+            if action is None:
+                return None
+            if not self.order_insensitive:
+                for position, (index, card) in enumerate(kwargs["playable_cards"]):
+                    if index == action[0]:
+                        return position
+                raise Exception("Played Card Not Found in Playable Cards")
+            return permute_card_id(p, action[1].card_id)
+        elif self.atype == ActionType.GET_COLOR:
+            return permute_color(p, action)
+        return action
+
+    def _decode_action(self, value, p, **kwargs):
+        inverse = inverse_permutations[p]
+        if self.atype == ActionType.GET_PLAY:
+            if value is None:
+                return None
+            if not self.order_insensitive:
+                return kwargs["playable_cards"][value]
+            card_id = permute_card_id(inverse, value)
+            for index, card in kwargs["playable_cards"]:
+                if card.card_id == card_id:
+                    return index, card
+            raise Exception("Cached Card Not Found in Playable Cards")
+        elif self.atype == ActionType.GET_COLOR:
+            return permute_color(inverse, value)
+        return value
+
+    def lookup(self, key):
+        # cached value of the key, or `_missing`
+        value = self.cache.get(key, _missing)
+        if value is not _missing:
+            self.cache.move_to_end(key)
+            self.num_hits += 1
+        return value
+
+    def store(self, key, p, action, **kwargs):
+        self.num_misses += 1
+        self.cache[key] = self._encode_action(action, p, **kwargs)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def cached_get_action(self, **kwargs):
+        key, p = self.make_key(**kwargs)
+        value = self.lookup(key)
+        if value is not _missing:
+            return self._decode_action(value, p, **kwargs)
+        action = self.policy.get_action(**kwargs)
+        self.store(key, p, action, **kwargs)
+        return action
+
+    def get_actions(self, requests):
+        # batch version for model policies, only the misses are sent to the wrapped policy
+        assert self.can_batch()
+        actions = [None] * len(requests)
+        misses = {}  # key -> positions of the requests and their permutations
+        for i, request in enumerate(requests):
+            key, p = self.make_key(**request)
+            value = self.lookup(key)
+            if value is not _missing:
+                actions[i] = self._decode_action(value, p, **request)
+            else:
+                misses.setdefault(key, []).append((i, p))
+
+        keys = list(misses.keys())
+        if len(keys) == 0:
+            return actions
+        computed = self.policy.get_actions([requests[misses[key][0][0]] for key in keys])
+        for key, action in zip(keys, computed):
+            first, first_p = misses[key][0]
+            self.store(key, first_p, action, **requests[first])
+            value = self._encode_action(action, first_p, **requests[first])
+            for i, p in misses[key]:
+                actions[i] = self._decode_action(value, p, **requests[i])
+        return actions
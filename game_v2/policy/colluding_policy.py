@@ -1,8 +1,9 @@
 from .base import Policy, ActionType
 from .greedy_policy import greedy_get_play, greedy_get_color
+from .team_view import TeamView
 from ..player import Player
 from ..card import Card, CardColor
-import random
+from ..util import get_random_service
 
 
 # number card: 4 * (1 * 0 + 2 * (1 + 2 + 3 + 4 + 5 + 6 + 7 + 8 + 9)) = 360
@@ -12,18 +13,24 @@ import random
 # draw4 card: 4 * 50 = 200
 # wild card: 4 * 50 = 200
 # sum = 360 + 160 + 160 + 160 + 200 + 200 = 1240
-# therefore, score expectation of a card in a standard deck is 1240/108
+# therefore, score expectation of a card in a standard deck is 1240/108,
+# used when the round gives no expected score of the cards left (see `controller.CardCounter`)
 _avg_score = 1240 / 108
 
 
-def get_best_score_from_raw_playable(raw_playable_cards):
+def get_best_score_from_raw_playable(raw_playable_cards, avg_score=_avg_score):
     filtered_playable_cards = Player.filter_draw_four(raw_playable_cards)
-    filtered_best_score = -_avg_score  # no card can be played
+    filtered_best_score = -avg_score  # no card can be played
     if len(filtered_playable_cards) > 0:
         filtered_best_score = max([card.score for index, card in filtered_playable_cards])
     return filtered_best_score
 
 
+def _score_or_avg(score, avg_score=_avg_score):
+    # score of a HandIndex query, which is None if no card can be played
+    return -avg_score if score is None else score
+
+
 # nc stands for neighbor collusion
 # ================
 # greedy collusion
@@ -32,21 +39,28 @@ def _default_nc_greedy_get_play(playable_cards, next_player_cards, num_cards_lef
     assert isinstance(num_cards_left, int) and num_cards_left > 0
     assert isinstance(playable_cards, list) and len(playable_cards) > 0
     assert isinstance(next_player_cards, list) and len(next_player_cards) > 0
+    next_player_index = info.get("next_player_index", None)  # HandIndex of next_player_cards, if any
+    avg_score = info.get("expected_score", _avg_score)  # of a card drawn
 
     # only one card left and it's playable, so just play it, and then the team will win
     if num_cards_left == 1:
         return playable_cards[0]
 
     best_play = None
-    best_score = - 2 * _avg_score  # the case neither the current player and the partner play any cards
+    best_score = - 2 * avg_score  # the case neither the current player and the partner play any cards
 
     for index, card in playable_cards:
         assert isinstance(card, Card)
         if card.is_number():
             # then see whether the partner has valid cards to play in actuality
-            next_player_playable_cards = [(i, next_card) for i, next_card in enumerate(next_player_cards)
-                                          if next_card.check_playable(card.color, card.num, card.card_type, 0)]
-            filtered_best_next_score = get_best_score_from_raw_playable(next_player_playable_cards)
+            if next_player_index is not None:
+                filtered_best_next_score = _score_or_avg(next_player_index.best_number_followup(card.color,
+                                                                                                card.num),
+                                                         avg_score)
+            else:
+                next_player_playable_cards = [(i, next_card) for i, next_card in enumerate(next_player_cards)
+                                              if next_card.check_playable(card.color, card.num, card.card_type, 0)]
+                filtered_best_next_score = get_best_score_from_raw_playable(next_player_playable_cards, avg_score)
             score = card.score + filtered_best_next_score
             if score > best_score:
                 best_play = index, card
@@ -59,23 +73,26 @@ def _default_nc_greedy_get_play(playable_cards, next_player_cards, num_cards_lef
                 best_score = card.score
 
         elif card.is_wildcard():
-            next_player_cards_with_index = [(i, next_card) for i, next_card in enumerate(next_player_cards)]
-            filtered_best_next_score = get_best_score_from_raw_playable(next_player_cards_with_index)
+            if next_player_index is not None:
+                filtered_best_next_score = _score_or_avg(next_player_index.best_any_followup(), avg_score)
+            else:
+                next_player_cards_with_index = [(i, next_card) for i, next_card in enumerate(next_player_cards)]
+                filtered_best_next_score = get_best_score_from_raw_playable(next_player_cards_with_index, avg_score)
             score = card.score + filtered_best_next_score
             if score > best_score:
                 best_play = index, card
                 best_score = score
 
         elif card.is_draw2():
-            # expected reward = 20 - 2 * _avg_score > -_avg_score, so consider this case
-            score = card.score - 2 * _avg_score
+            # expected reward = 20 - 2 * avg_score > -avg_score, so consider this case
+            score = card.score - 2 * avg_score
             if score > best_score:
                 best_play = index, card
                 best_score = score
 
         elif card.is_draw4():
-            # expected reward = 50 - 4 * _avg_score > -_avg_score, so consider this case
-            score = card.score - 4 * _avg_score
+            # expected reward = 50 - 4 * avg_score > -avg_score, so consider this case
+            score = card.score - 4 * avg_score
             if score > best_score:
                 best_play = index, card
                 best_score = score
@@ -87,11 +104,15 @@ def _default_nc_greedy_get_play(playable_cards, next_player_cards, num_cards_lef
     # if current player does not play a card, and next player plays the card with highest score
     if "play_state" in info:
         play_state = info["play_state"]
-        next_player_playable_cards = [(i, next_card) for i, next_card in enumerate(next_player_cards)
-                                      if next_card.check_playable(play_state["color"], play_state["value"],
-                                                                  play_state["type"], play_state["to_draw"])]
-        filtered_best_next_score = get_best_score_from_raw_playable(next_player_playable_cards)
-        if -_avg_score + filtered_best_next_score > best_score:
+        if next_player_index is not None:
+            filtered_best_next_score = _score_or_avg(next_player_index.best_playable(
+                play_state["color"], play_state["value"], play_state["type"], play_state["to_draw"]), avg_score)
+        else:
+            next_player_playable_cards = [(i, next_card) for i, next_card in enumerate(next_player_cards)
+                                          if next_card.check_playable(play_state["color"], play_state["value"],
+                                                                      play_state["type"], play_state["to_draw"])]
+            filtered_best_next_score = get_best_score_from_raw_playable(next_player_playable_cards, avg_score)
+        if -avg_score + filtered_best_next_score > best_score:
             best_play = None
     return best_play
 
@@ -104,30 +125,39 @@ def _default_nnc_greedy_get_play(playable_cards, num_cards_left, next_partner_ca
     assert isinstance(num_cards_left, int) and num_cards_left > 0
     assert isinstance(playable_cards, list) and len(playable_cards) > 0
     assert isinstance(next_partner_cards, list) and len(next_partner_cards) > 0
+    next_partner_index = info.get("next_partner_index", None)  # HandIndex of next_partner_cards, if any
+    avg_score = info.get("expected_score", _avg_score)  # of a card drawn
 
     # only one card left and it's playable, so just play it, and then the team will win
     if num_cards_left    == 1:
         return playable_cards[0]
 
     best_play = None
-    best_score = - 2 * _avg_score  # the case neither the current player and the partner play any cards
+    best_score = - 2 * avg_score  # the case neither the current player and the partner play any cards
 
     for index, card in playable_cards:
         assert isinstance(card, Card)
         if card.is_number() or card.is_reverse() or card.is_skip() or card.is_draw2():
             # then see whether the partner has valid cards to play in actuality
             # for non-neighboring case, simply checking color is enough
-            next_partner_playable_cards = [(i, next_card) for i, next_card in enumerate(next_partner_cards)
-                                           if next_card.color == card.color or next_card.is_strong_action()]
-            filtered_best_next_score = get_best_score_from_raw_playable(next_partner_playable_cards)
+            if next_partner_index is not None:
+                filtered_best_next_score = _score_or_avg(next_partner_index.best_color_followup(card.color),
+                                                         avg_score)
+            else:
+                next_partner_playable_cards = [(i, next_card) for i, next_card in enumerate(next_partner_cards)
+                                               if next_card.color == card.color or next_card.is_strong_action()]
+                filtered_best_next_score = get_best_score_from_raw_playable(next_partner_playable_cards, avg_score)
             score = card.score + filtered_best_next_score
             if score > best_score:
                 best_play = index, card
                 best_score = score
 
         elif card.is_wildcard() or card.is_draw4():
-            next_partner_cards_with_index = [(i, next_card) for i, next_card in enumerate(next_partner_cards)]
-            filtered_best_next_score = get_best_score_from_raw_playable(next_partner_cards_with_index)
+            if next_partner_index is not None:
+                filtered_best_next_score = _score_or_avg(next_partner_index.best_any_followup(), avg_score)
+            else:
+                next_partner_cards_with_index = [(i, next_card) for i, next_card in enumerate(next_partner_cards)]
+                filtered_best_next_score = get_best_score_from_raw_playable(next_partner_cards_with_index, avg_score)
             score = card.score + filtered_best_next_score
             if score > best_score:
                 best_play = index, card
@@ -140,10 +170,14 @@ def _default_nnc_greedy_get_play(playable_cards, num_cards_left, next_partner_ca
     # if current player does not play a card, and next player plays the card with highest score
     if "play_state" in info:
         play_state = info["play_state"]
-        next_partner_playable_cards = [(i, next_card) for i, next_card in enumerate(next_partner_cards)
-                                       if next_card.color == play_state["color"] or next_card.is_strong_action()]
-        filtered_best_next_score = get_best_score_from_raw_playable(next_partner_playable_cards)
-        if -_avg_score + filtered_best_next_score > best_score:
+        if next_partner_index is not None:
+            filtered_best_next_score = _score_or_avg(next_partner_index.best_color_followup(play_state["color"]),
+                                                     avg_score)
+        else:
+            next_partner_playable_cards = [(i, next_card) for i, next_card in enumerate(next_partner_cards)
+                                           if next_card.color == play_state["color"] or next_card.is_strong_action()]
+            filtered_best_next_score = get_best_score_from_raw_playable(next_partner_playable_cards, avg_score)
+        if -avg_score + filtered_best_next_score > best_score:
             best_play = None
     return best_play
 
@@ -159,6 +193,7 @@ def _default_nc_first_card_get_play(playable_cards, next_player_cards, num_cards
     assert isinstance(num_cards_left, int) and num_cards_left > 0
     assert isinstance(playable_cards, list) and len(playable_cards) > 0
     assert isinstance(next_player_cards, list) and len(next_player_cards) > 0
+    next_player_index = info.get("next_player_index", None)  # HandIndex of next_player_cards, if any
 
     # only one card left and it's playable, so just play it, and then the team will win
     if num_cards_left == 1:
@@ -169,10 +204,13 @@ def _default_nc_first_card_get_play(playable_cards, next_player_cards, num_cards
         assert isinstance(card, Card)
         # confirm whether next player can also play if this current card is played
         if card.is_number():
-            next_player_playable_cards = [(i, next_card) for i, next_card in enumerate(next_player_cards)
-                                          if next_card.check_playable(card.color, card.num, card.card_type, 0)]
-            filtered_next_playable_cards = Player.filter_draw_four(next_player_playable_cards)
-            if len(filtered_next_playable_cards) > 0:
+            if next_player_index is not None:
+                can_follow = next_player_index.best_number_followup(card.color, card.num) is not None
+            else:
+                next_player_playable_cards = [(i, next_card) for i, next_card in enumerate(next_player_cards)
+                                              if next_card.check_playable(card.color, card.num, card.card_type, 0)]
+                can_follow = len(Player.filter_draw_four(next_player_playable_cards)) > 0
+            if can_follow:
                 selected_play = index, card
                 break
 
@@ -214,14 +252,20 @@ def _default_nc_first_card_get_color(next_player_cards, **info):
 
 
 class ColludingPolicy(Policy):
-    def __init__(self, name, atype, strategy):
+    # the policies of a team can share one TeamView, so that its indexes are kept once for all of them
+    def __init__(self, name, atype, strategy, team=None):
+        assert isinstance(team, TeamView) or team is None
         super().__init__(name, atype, strategy)
-        self.players = set()
+        self.team = TeamView() if team is None else team
+        self.info_probability = 1  # if 1, full knowledge
+
+    @property
+    def players(self):
+        return self.team.players
 
     def add_player(self, player):
         assert isinstance(player, Player) and player.is_policy()
-        if not self.is_player_in(player):
-            self.players.add(player)
+        self.team.add_player(player)
 
     def add_players(self, players):
         for player in players:
@@ -229,7 +273,7 @@ class ColludingPolicy(Policy):
 
     def is_player_in(self, player):
         assert isinstance(player, Player)
-        return player in self.players
+        return self.team.is_member(player)
 
     @property
     def all_player_cards(self):
@@ -242,13 +286,25 @@ class ColludingPolicy(Policy):
         assert isinstance(exclude, Player) or exclude is None
         return [player for player in self.players if player != exclude]
 
+    def get_next_partner(self, current_player, clockwise=True):
+        # the teammate who plays next after the current player, None if the current player has no teammate
+        return self.team.next_teammate(current_player, clockwise)
+
     @staticmethod
-    def keep_by_probability(next_player_cards, info_probability):
+    def get_expected_score(current_player=None, action_controller=None):
+        # expected score of a card the current player draws, from the card counter of the round if any
+        if action_controller is None:
+            return _avg_score
+        cards = [] if current_player is None else current_player.cards
+        return action_controller.deck_controller.card_counter.expected_score_without(cards)
+
+    @staticmethod
+    def keep_by_probability(next_player_cards, info_probability, rng=None):
         # helper function to adjust knowledge accessible by partner
         # order of cards need to be preserved
         total_num = len(next_player_cards)
         kept_num = round(total_num * info_probability)
-        target_indices = random.sample(range(total_num), kept_num)
+        target_indices = get_random_service(rng).sample(range(total_num), kept_num)
         target_indices.sort()
         available_cards = list(map(next_player_cards.__getitem__, target_indices))
         return available_cards
@@ -256,40 +312,50 @@ class ColludingPolicy(Policy):
 
 class NeighborColludingGetPlay(ColludingPolicy):
     def __init__(self, name, strategy=_default_nc_greedy_get_play,
-                 nn_strategy=_default_nnc_greedy_get_play, info_probability=1):
+                 nn_strategy=_default_nnc_greedy_get_play, info_probability=1, team=None):
         # nn stands for non-neighbor
         assert callable(nn_strategy)
-        super().__init__(name, ActionType.GET_PLAY, strategy)
+        super().__init__(name, ActionType.GET_PLAY, strategy, team=team)
         self.nn_strategy = nn_strategy
-        self.info_probability = info_probability  # if 1, full knowledge
+        self.info_probability = info_probability
 
     def _get_action(self, current_player=None, next_player=None, *args, **kwargs):
         assert isinstance(current_player, Player) or current_player is None
         assert isinstance(next_player, Player) or next_player is None
-        available_next_player_cards = ColludingPolicy.keep_by_probability(next_player.cards, self.info_probability)
-        if self.is_player_in(next_player) and len(available_next_player_cards) > 0:
-            return self.strategy(next_player_cards=available_next_player_cards, *args, **kwargs)
-        else:
-            # assume only two colluding players so far, so only one partner
-            partner = list(self.get_partner(exclude=current_player))[0]
-            return self.nn_strategy(next_partner_cards=partner.cards, *args, **kwargs)
+        if "expected_score" not in kwargs:
+            kwargs["expected_score"] = self.get_expected_score(current_player, kwargs.get("action_controller", None))
+        if self.is_player_in(next_player):
+            next_player_index = self.team.get_index(next_player, self.info_probability)
+            if len(next_player_index.visible_cards) > 0:
+                return self.strategy(next_player_cards=next_player_index.visible_cards,
+                                     next_player_index=next_player_index, *args, **kwargs)
+
+        partner = self.get_next_partner(current_player, kwargs.get("clockwise", True))
+        if partner is None or partner.num_cards == 0:
+            return greedy_get_play(*args, **kwargs)
+        return self.nn_strategy(next_partner_cards=partner.cards, next_partner_index=self.team.get_index(partner),
+                                *args, **kwargs)
 
 
 class NeighborColludingGetColor(ColludingPolicy):
     def __init__(self, name, strategy=_default_nc_greedy_get_color,
-                 nn_strategy=_default_nnc_greedy_get_color, info_probability=1):
+                 nn_strategy=_default_nnc_greedy_get_color, info_probability=1, team=None):
         assert callable(nn_strategy)
-        super().__init__(name, ActionType.GET_COLOR, strategy)
+        super().__init__(name, ActionType.GET_COLOR, strategy, team=team)
         self.nn_strategy = nn_strategy
-        self.info_probability = info_probability  # if 1, full knowledge
+        self.info_probability = info_probability
 
     def _get_action(self, current_player=None, next_player=None, *args, **kwargs):
         assert isinstance(current_player, Player) or current_player is None
         assert isinstance(next_player, Player) or next_player is None
-        available_next_player_cards = ColludingPolicy.keep_by_probability(next_player.cards, self.info_probability)
-        if self.is_player_in(next_player) and len(available_next_player_cards) > 0:
-            return self.strategy(next_player_cards=available_next_player_cards, *args, **kwargs)
-        else:
-            # assume only two colluding players so far, so only one partner
-            partner = list(self.get_partner(exclude=current_player))[0]
-            return self.nn_strategy(next_partner_cards=partner.cards, *args, **kwargs)
+        if self.is_player_in(next_player):
+            next_player_index = self.team.get_index(next_player, self.info_probability)
+            if len(next_player_index.visible_cards) > 0:
+                return self.strategy(next_player_cards=next_player_index.visible_cards,
+                                     next_player_index=next_player_index, *args, **kwargs)
+
+        partner = self.get_next_partner(current_player, kwargs.get("clockwise", True))
+        if partner is None or partner.num_cards == 0:
+            return greedy_get_color(*args, **kwargs)
+        return self.nn_strategy(next_partner_cards=partner.cards, next_partner_index=self.team.get_index(partner),
+                                *args, **kwargs)
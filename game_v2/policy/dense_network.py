@@ -0,0 +1,111 @@
+import numpy as np
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def _elu(x):
+    return np.where(x > 0, x, np.expm1(np.minimum(x, 0)))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0., 1.)
+
+
+activation_functions = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1. / (1. + np.exp(-x)),
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+    "softplus": lambda x: np.logaddexp(x, 0),
+    "elu": _elu,
+}
+
+
+class DenseNetwork(object):
+    """NumPy evaluator of a stack of Dense layers, as exported from a Keras model.
+
+    Inference is one matrix product and one activation per layer, without importing Keras,
+    so networks can be used in lightweight worker processes. Networks are stored as `.npz` files.
+    """
+    def __init__(self, weights, biases, activations):
+        assert len(weights) == len(biases) == len(activations) > 0
+        for activation in activations:
+            if activation not in activation_functions:
+                raise ValueError("Unsupported activation for DenseNetwork: {}".format(activation))
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self._functions = [activation_functions[activation] for activation in self.activations]
+
+    def __repr__(self):
+        return "DenseNetwork({})".format(self.format_attribute())
+
+    def __str__(self):
+        return "DenseNetwork({})".format(self.format_attribute())
+
+    def format_attribute(self):
+        return ", ".join(["{}x{}:{}".format(w.shape[0], w.shape[1], activation)
+                          for w, activation in zip(self.weights, self.activations)])
+
+    @property
+    def input_dim(self):
+        return self.weights[0].shape[0]
+
+    @property
+    def output_dim(self):
+        return self.weights[-1].shape[1]
+
+    @staticmethod
+    def from_keras(model):
+        # only Dense layers carry computation, Activation layers are folded into the previous Dense layer,
+        # and InputLayer / Dropout layers are no-ops at inference time
+        weights, biases, activations = [], [], []
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            config = layer.get_config()
+            if layer_type == "Dense":
+                params = layer.get_weights()
+                kernel = params[0]
+                bias = params[1] if config.get("use_bias", True) else np.zeros(kernel.shape[1])
+                weights.append(kernel)
+                biases.append(bias)
+                activations.append(config.get("activation", "linear"))
+            elif layer_type == "Activation":
+                assert len(activations) > 0 and activations[-1] == "linear"
+                activations[-1] = config["activation"]
+            elif layer_type in ("InputLayer", "Dropout"):
+                pass
+            else:
+                raise ValueError("Unsupported layer for DenseNetwork: {}".format(layer_type))
+        return DenseNetwork(weights, biases, activations)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            num_layers = int(data["num_layers"])
+            return DenseNetwork([data["weight_{}".format(i)] for i in range(num_layers)],
+                                [data["bias_{}".format(i)] for i in range(num_layers)],
+                                [str(activation) for activation in data["activations"]])
+
+    def save(self, path):
+        arrays = {"num_layers": np.array(len(self.weights)), "activations": np.array(self.activations)}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays["weight_{}".format(i)] = w
+            arrays["bias_{}".format(i)] = b
+        np.savez(path, **arrays)
+
+    def predict(self, x):
+        # same contract as keras' predict: a batch of rows in, a batch of outputs out;
+        # the first layer also accepts scipy sparse rows
+        if not hasattr(x, "tocsr"):
+            x = np.asarray(x, dtype=np.float32)
+            if x.ndim == 1:
+                x = x.reshape((1, -1))
+        for w, b, function in zip(self.weights, self.biases, self._functions):
+            x = function(np.asarray(x @ w) + b)
+        return x
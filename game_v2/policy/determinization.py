@@ -0,0 +1,177 @@
+import numpy as np
+from ..card import num_card_ids
+from ..util import get_random_service
+
+
+def sample_deals(unseen_ids, sizes, num_samples, generator):
+    """Deal the unseen cards at random into piles of the given sizes, `num_samples` times at once.
+
+    Parameters
+    ----------
+    unseen_ids: array-like
+        Card ids of the unseen cards, as a multiset.
+
+    sizes: list
+        Size of each pile (e.g. the hands of the other players, then the draw pile), summing to the number
+        of unseen cards.
+
+    num_samples: int
+        Number of deals.
+
+    generator: numpy.random.Generator
+        Source of randomness, e.g. the one of a `game_v2.util.RandomService`.
+
+    Returns
+    -------
+    piles: list
+        One uint8 array of shape (num_samples, size) per pile, row i being deal i.
+    """
+    unseen_ids = np.asarray(unseen_ids, dtype=np.uint8)
+    assert sum(sizes) == len(unseen_ids)
+    assert isinstance(num_samples, int) and num_samples > 0
+    # a random permutation per row, all at once
+    dealt = unseen_ids[np.argsort(generator.random((num_samples, len(unseen_ids))), axis=1)]
+    offsets = np.cumsum([0] + list(sizes))
+    return [dealt[:, offsets[i]:offsets[i + 1]] for i in range(len(sizes))]
+
+
+def determinize_snapshots(snapshot, observer_pos, num_samples, generator, unseen_ids=None):
+    """Copies of a `RoundSnapshot` with the cards unseen by the player at `observer_pos` dealt again.
+
+    The size of every hand is kept. The unseen cards default to the hands of the other players and the draw pile
+    of the snapshot, whose multiset is public: all the cards minus the used pile, the hand of the observer
+    and the initial cards.
+    """
+    other_positions = [pos for pos in range(len(snapshot.hands)) if pos != observer_pos]
+    if unseen_ids is None:
+        unseen_ids = np.frombuffer(b"".join([snapshot.hands[pos] for pos in other_positions] + [snapshot.draw_pile]),
+                                   dtype=np.uint8)
+    sizes = [len(snapshot.hands[pos]) for pos in other_positions] + [len(snapshot.draw_pile)]
+    piles = sample_deals(unseen_ids, sizes, num_samples, generator)
+
+    snapshots = []
+    for i in range(num_samples):
+        hands = list(snapshot.hands)
+        for pos, pile in zip(other_positions, piles):
+            hands[pos] = pile[i].tobytes()
+        snapshots.append(snapshot.replace(draw_pile=piles[-1][i].tobytes(), hands=tuple(hands)))
+    return snapshots
+
+
+class DeterminizationSampler(object):
+    # the multiset of the cards unseen by a player in a round (hands of the other players and draw pile),
+    # kept up to date through the hand listeners of the player and the listeners of the deck controller,
+    # to sample the hidden cards many times at once without rescanning the piles;
+    # it is counted from the round once (and again after its piles are set at once, e.g. by a restore)
+    def __init__(self, action_controller, player, rng=None):
+        assert player in action_controller.players
+        self.action_controller = action_controller
+        self.player = player
+        self.rng = rng
+        self.counts = np.zeros(num_card_ids, dtype=np.int64)
+        self._dirty = True
+        player.add_hand_listener(self)
+        action_controller.deck_controller.add_listener(self)
+
+    def __repr__(self):
+        return "DeterminizationSampler(player={}, num_unseen={})".format(self.player.name, self.num_unseen)
+
+    def __str__(self):
+        return "DeterminizationSampler(player={}, num_unseen={})".format(self.player.name, self.num_unseen)
+
+    def detach(self):
+        self.player.remove_hand_listener(self)
+        self.action_controller.deck_controller.remove_listener(self)
+
+    @property
+    def observer_pos(self):
+        return self.action_controller.players.index(self.player)
+
+    def _recount(self):
+        dc = self.action_controller.deck_controller
+        self.counts = np.zeros(num_card_ids, dtype=np.int64)
+        for card in dc.draw_pile:
+            self.counts[card.card_id] += 1
+        for player in self.action_controller.players:
+            if player is not self.player:
+                for card in player.cards:
+                    self.counts[card.card_id] += 1
+        self._dirty = False
+
+    def _add(self, cards, num):
+        if not self._dirty:
+            for card in cards:
+                self.counts[card.card_id] += num
+
+    # ==============
+    # hand listeners
+    # ==============
+    def on_cards_added(self, cards):
+        self._add(cards, -1)
+
+    def on_card_removed(self, card):
+        self._add([card], 1)  # to be seen again in the used pile
+
+    def on_cards_cleared(self):
+        self._dirty = True
+
+    # ==============
+    # deck listeners
+    # ==============
+    def on_card_drawn(self, card):
+        pass  # from the draw pile to a hand: drawn by the player, it is counted by on_cards_added
+
+    def on_card_discarded(self, card):
+        self._add([card], -1)
+
+    def on_card_revealed(self, card):
+        self._add([card], -1)
+
+    def on_draw_pile_regenerated(self, cards):
+        self._add(cards, 1)
+
+    def on_deck_added(self, cards):
+        self._add(cards, 1)
+
+    def on_piles_set(self):
+        self._dirty = True
+
+    # =======
+    # queries
+    # =======
+    @property
+    def unseen_counts(self):
+        if self._dirty:
+            self._recount()
+        return self.counts
+
+    @property
+    def num_unseen(self):
+        return int(self.unseen_counts.sum())
+
+    @property
+    def unseen_ids(self):
+        return np.repeat(np.arange(num_card_ids, dtype=np.uint8), self.unseen_counts)
+
+    def _generator(self):
+        return get_random_service(self.player.rng if self.rng is None else self.rng).generator
+
+    def sample(self, num_samples):
+        """Sample the hidden cards `num_samples` times.
+
+        Returns the hands of the players as uint8 arrays of card ids of shape (num_samples, num_cards),
+        None for the observing player, and the draw piles as an array of shape (num_samples, draw_pile_size).
+        """
+        ac = self.action_controller
+        other_players = [player for player in ac.players if player is not self.player]
+        sizes = [player.num_cards for player in other_players] + [ac.deck_controller.draw_pile_size]
+        piles = sample_deals(self.unseen_ids, sizes, num_samples, self._generator())
+        hands_of = dict(zip(other_players, piles))
+        return [hands_of.get(player, None) for player in ac.players], piles[-1]
+
+    def sample_snapshots(self, num_samples, snapshot=None):
+        """Sample the hidden cards `num_samples` times as snapshots of the round (see `ActionController.restore`)."""
+        if snapshot is None:
+            snapshot = self.action_controller.snapshot()
+        return determinize_snapshots(snapshot, self.observer_pos, num_samples, self._generator(),
+                                     unseen_ids=self.unseen_ids)
@@ -0,0 +1,463 @@
+import functools
+from .base import Policy, ActionType
+from .greedy_policy import GreedyGetPlayPolicy, GreedyGetColorPolicy, GreedyPlayNewPolicy
+from ..card import CardColor, CardType, unique_cards
+from ..player import Player
+from ..util import RandomService
+
+
+# Solver of the end of a 2-player round with both hands known. A state is
+# (hands, to_move, color, value, ctype, to_draw, draw) where the hands are sorted tuples of card ids,
+# so that the same cards held in any order share one transposition-table entry, and draw is either
+# the draw pile in drawing order (known_draw_order) or the counts of its card ids, drawn by chance.
+# Values are from the point of view of the player to move at the root: with the "score" objective,
+# the score of the hand of the loser, won or lost as in `ActionController.update_reward`; with "win", +1 / -1.
+
+_inf = float("inf")
+_colors = [color for color in CardColor if color != CardColor.WILD]
+_exact, _lower, _upper = 0, 1, 2
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _remove(hand, card_id):
+    i = hand.index(card_id)
+    return hand[:i] + hand[i + 1:]
+
+
+def _add(hand, card_ids):
+    return tuple(sorted(hand + tuple(card_ids)))
+
+
+def _score(hand):
+    return sum([unique_cards[card_id].score for card_id in hand])
+
+
+@functools.lru_cache(maxsize=None)
+def _check_playable(card_id, color, value, ctype, to_draw):
+    return unique_cards[card_id].check_playable(color, value, ctype, to_draw)
+
+
+def _playable_ids(hand, color, value, ctype, to_draw):
+    # distinct card ids of `Player.get_playable`
+    playable = [(i, unique_cards[card_id]) for i, card_id in enumerate(dict.fromkeys(hand))
+                if _check_playable(card_id, color, value, ctype, to_draw)]
+    return [card.card_id for i, card in Player.filter_draw_four(playable)]
+
+
+def _new_card_playable(hand, card_id, color, value, ctype, to_draw):
+    # `Player.check_new_card_playable`, the new card being in the hand
+    card = unique_cards[card_id]
+    if not card.is_draw4():
+        return _check_playable(card_id, color, value, ctype, to_draw)
+    for other_id in hand:
+        other = unique_cards[other_id]
+        if (other.is_number() or other.is_weak_action()) and _check_playable(other_id, color, value, ctype, to_draw):
+            return False
+    return True
+
+
+def _card_moves(card_id):
+    # a card to play, with each color for a wildcard or a draw4
+    card = unique_cards[card_id]
+    if card.is_wildcard() or card.is_draw4():
+        return [(card_id, color) for color in _colors]
+    return [(card_id, None)]
+
+
+class EndgameResult(object):
+    def __init__(self, value, move, depth, complete, num_nodes):
+        self.value = value  # for the player to move
+        self.move = move  # (card id, color or None) to play, None to draw
+        self.depth = depth  # of the deepest finished iteration
+        self.complete = complete  # whether the value is exact, not cut by the depth of the search
+        self.num_nodes = num_nodes
+
+    def __repr__(self):
+        return "EndgameResult(value={}, move={}, depth={}, complete={}, num_nodes={})".format(
+            self.value, self.move, self.depth, self.complete, self.num_nodes)
+
+    def __str__(self):
+        return "EndgameResult(value={}, move={}, depth={}, complete={}, num_nodes={})".format(
+            self.value, self.move, self.depth, self.complete, self.num_nodes)
+
+
+class EndgameSolver(object):
+    # iterative deepening alpha-beta / expectimax with a transposition table, the depth counting the decisions
+    # and the draws, and `node_budget` the positions searched by a solve over all its iterations;
+    # a search stops at the first complete iteration or when `node_budget` nodes are spent, and gives the result
+    # of the deepest finished iteration; a penalty of several cards drawn by chance is averaged over
+    # `num_chance_samples` samples (single cards are enumerated), and an empty draw pile ends the search there,
+    # both of which make the value incomplete;
+    # unless pass_when_playable, a player holding a playable card plays (as all the strategies of this package do),
+    # otherwise drawing instead is searched as well, which seldom lets a search complete
+    def __init__(self, node_budget=200000, max_depth=64, objective="score", known_draw_order=False,
+                 pass_when_playable=False, num_chance_samples=16, seed=None):
+        assert isinstance(node_budget, int) and node_budget > 0
+        assert isinstance(max_depth, int) and max_depth > 0
+        assert objective in ("score", "win")
+        assert isinstance(known_draw_order, bool)
+        assert isinstance(pass_when_playable, bool)
+        assert isinstance(num_chance_samples, int) and num_chance_samples > 0
+        self.node_budget = node_budget
+        self.max_depth = max_depth
+        self.objective = objective
+        self.known_draw_order = known_draw_order
+        self.pass_when_playable = pass_when_playable
+        self.num_chance_samples = num_chance_samples
+        self.rng = RandomService(seed)
+        self.table = {}
+        self.num_nodes = 0
+        self.colors = {}  # player -> color of the wildcard or draw4 just decided, see EndgameGetColorPolicy
+        self._root = 0
+
+    def __repr__(self):
+        return "EndgameSolver(node_budget={}, objective={}, known_draw_order={})".format(
+            self.node_budget, self.objective, self.known_draw_order)
+
+    def __str__(self):
+        return "EndgameSolver(node_budget={}, objective={}, known_draw_order={})".format(
+            self.node_budget, self.objective, self.known_draw_order)
+
+    # ===========
+    # evaluations
+    # ===========
+    def _terminal(self, hands, winner):
+        loser = 1 - winner
+        if self.objective == "win":
+            value = 1.
+        else:
+            value = float(_score(hands[loser]))
+        return value if winner == self._root else -value
+
+    def _heuristic(self, hands):
+        # the fewer and cheaper the cards left, the better
+        own, other = hands[self._root], hands[1 - self._root]
+        if self.objective == "win":
+            return float(len(other) - len(own)) / max(1, len(own) + len(other))
+        return float(_score(other) - _score(own)) / 2
+
+    # =====
+    # draws
+    # =====
+    def _draw(self, draw, num_cards):
+        # outcomes (probability, card ids drawn, draw pile left) and whether they are exact, None if too few cards
+        if self.known_draw_order:
+            if len(draw) < num_cards:
+                return None, False
+            return [(1., draw[:num_cards], draw[num_cards:])], True
+
+        total = sum(draw)
+        if total < num_cards:
+            return None, False
+        if num_cards == 1:
+            return [(float(count) / total, (card_id,), draw[:card_id] + (count - 1,) + draw[card_id + 1:])
+                    for card_id, count in enumerate(draw) if count > 0], True
+
+        pool = [card_id for card_id, count in enumerate(draw) for _ in range(count)]
+        outcomes = []
+        for _ in range(self.num_chance_samples):
+            drawn = self.rng.sample(pool, num_cards)
+            counts = list(draw)
+            for card_id in drawn:
+                counts[card_id] -= 1
+            outcomes.append((1. / self.num_chance_samples, tuple(sorted(drawn)), tuple(counts)))
+        return outcomes, False
+
+    # ======
+    # search
+    # ======
+    def _count_node(self):
+        self.num_nodes += 1
+        if self.num_nodes > self.node_budget:
+            raise _BudgetExceeded()
+
+    def _lookup(self, key, depth, alpha, beta):
+        entry = self.table.get(key, None)
+        if entry is not None:
+            entry_depth, value, flag, complete = entry
+            if complete or entry_depth >= depth:
+                if (flag == _exact or (flag == _lower and value >= beta) or
+                        (flag == _upper and value <= alpha)):
+                    return value, complete
+        return None
+
+    def _store(self, key, depth, value, alpha, beta, complete):
+        flag = _upper if value <= alpha else (_lower if value >= beta else _exact)
+        self.table[key] = (depth, value, flag, complete)
+
+    def _play(self, state, card_id, chosen_color, depth, alpha, beta):
+        hands, p, color, value, ctype, to_draw, draw = state
+        hand = _remove(hands[p], card_id)
+        new_hands = (hand, hands[1]) if p == 0 else (hands[0], hand)
+        if len(hand) == 0:
+            return self._terminal(new_hands, p), True
+
+        card = unique_cards[card_id]
+        next_p = 1 - p
+        new_value = -1
+        new_to_draw = 0
+        if card.is_number():
+            new_color, new_value = card.color, card.num
+        elif card.is_reverse() or card.is_skip():
+            new_color, next_p = card.color, p  # the other player is skipped
+        elif card.is_wildcard():
+            new_color = chosen_color
+        elif card.is_draw2():
+            new_color, new_to_draw = card.color, to_draw + 2
+        else:
+            new_color, new_to_draw = chosen_color, to_draw + 4
+        return self._turn((new_hands, next_p, new_color, new_value, card.card_type, new_to_draw, draw),
+                          depth, alpha, beta)
+
+    def _penalty(self, state, depth, alpha, beta):
+        hands, p, color, value, ctype, to_draw, draw = state
+        if depth == 0:
+            return self._heuristic(hands), False
+        outcomes, complete = self._draw(draw, max(1, to_draw))
+        if outcomes is None:
+            return self._heuristic(hands), False
+
+        total = 0.
+        for prob, drawn, new_draw in outcomes:
+            self._count_node()
+            hand = _add(hands[p], drawn)
+            new_hands = (hand, hands[1]) if p == 0 else (hands[0], hand)
+            window = (alpha, beta) if len(outcomes) == 1 else (-_inf, _inf)
+            if to_draw == 0 and _new_card_playable(hand, drawn[0], color, value, ctype, to_draw):
+                v, c = self._play_new((new_hands, p, color, value, ctype, to_draw, new_draw), drawn[0],
+                                      depth - 1, *window)
+            else:
+                v, c = self._turn((new_hands, 1 - p, color, value, ctype, 0, new_draw), depth - 1, *window)
+            total += prob * v
+            complete = complete and c
+        return total, complete
+
+    def _decide(self, key, moves, apply, maximizing, depth, alpha, beta):
+        # alpha-beta over the moves of a decision, returns (value, complete, best move)
+        found = self._lookup(key, depth, alpha, beta)
+        if found is not None:
+            return found[0], found[1], None
+        self._count_node()
+
+        alpha0, beta0 = alpha, beta
+        best_value, best_move = (-_inf if maximizing else _inf), None
+        complete = True
+        for move in moves:
+            v, c = apply(move, alpha, beta)
+            complete = complete and c
+            if (v > best_value) if maximizing else (v < best_value):
+                best_value, best_move = v, move
+            if maximizing:
+                alpha = max(alpha, v)
+            else:
+                beta = min(beta, v)
+            if alpha >= beta:
+                break
+        self._store(key, depth, best_value, alpha0, beta0, complete)
+        return best_value, complete, best_move
+
+    def _turn(self, state, depth, alpha, beta, root=False):
+        # a get_play decision, or the penalty if nothing is playable
+        hands, p, color, value, ctype, to_draw, draw = state
+        playable = _playable_ids(hands[p], color, value, ctype, to_draw)
+        if len(playable) == 0:
+            result = self._penalty(state, depth, alpha, beta)
+            return result + (None,) if root else result
+        if depth == 0:
+            result = self._heuristic(hands), False
+            return result + (None,) if root else result
+
+        # high scores first for earlier cutoffs, drawing last
+        playable.sort(key=lambda card_id: -unique_cards[card_id].score)
+        moves = [move for card_id in playable for move in _card_moves(card_id)]
+        if self.pass_when_playable:
+            moves.append(None)
+
+        def apply(move, a, b):
+            if move is None:
+                return self._penalty(state, depth - 1, a, b)
+            return self._play(state, move[0], move[1], depth - 1, a, b)
+
+        key = ("play", state)
+        if root:
+            self.table.pop(key, None)  # searched again for its move
+        value, complete, move = self._decide(key, moves, apply, p == self._root, depth, alpha, beta)
+        return (value, complete, move) if root else (value, complete)
+
+    def _play_new(self, state, card_id, depth, alpha, beta, root=False):
+        # whether to play the card just drawn, which is playable
+        hands, p = state[0], state[1]
+        if depth == 0:
+            result = self._heuristic(hands), False
+            return result + (None,) if root else result
+        moves = _card_moves(card_id)
+        if self.pass_when_playable:
+            moves.append(None)
+
+        def apply(move, a, b):
+            if move is None:
+                next_state = (hands, 1 - p) + state[2:]
+                return self._turn(next_state, depth - 1, a, b)
+            return self._play(state, move[0], move[1], depth - 1, a, b)
+
+        key = ("new", state, card_id)
+        if root:
+            self.table.pop(key, None)  # searched again for its move
+        value, complete, move = self._decide(key, moves, apply, p == self._root, depth, alpha, beta)
+        return (value, complete, move) if root else (value, complete)
+
+    # ===
+    # api
+    # ===
+    def solve(self, hands, to_move, play_state, draw_pile, new_card=None):
+        """Solve the end of a round.
+
+        Parameters
+        ----------
+        hands: list
+            The cards of the 2 players.
+
+        to_move: int
+            Index in `hands` of the player to decide.
+
+        play_state: dict
+            The play state, as `StateController.state_dict`.
+
+        draw_pile: list
+            The cards of the draw pile, in drawing order (only used with known_draw_order).
+
+        new_card: Card | None
+            For a play_new decision, the card just drawn (the last one of the hand), None for a get_play decision.
+
+        Returns
+        -------
+        result: EndgameResult | None
+            None if the budget is too small for the first iteration.
+        """
+        assert len(hands) == 2 and to_move in (0, 1)
+        sorted_hands = tuple(tuple(sorted(card.card_id for card in hand)) for hand in hands)
+        if self.known_draw_order:
+            draw = tuple(card.card_id for card in draw_pile)
+        else:
+            counts = [0] * len(unique_cards)
+            for card in draw_pile:
+                counts[card.card_id] += 1
+            draw = tuple(counts)
+        state = (sorted_hands, to_move, play_state["color"], play_state["value"], play_state["type"],
+                 play_state["to_draw"], draw)
+
+        self._root = to_move
+        self.table = {}
+        self.num_nodes = 0
+        result = None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                if new_card is None:
+                    value, complete, move = self._turn(state, depth, -_inf, _inf, root=True)
+                else:
+                    value, complete, move = self._play_new(state, new_card.card_id, depth, -_inf, _inf, root=True)
+            except _BudgetExceeded:
+                break
+            result = EndgameResult(value, move, depth, complete, self.num_nodes)
+            if complete:
+                break
+        return result
+
+    def solve_round(self, controller, player, new_card=None):
+        """Solve the decision of a player of a 2-player round, e.g. an `ActionController` or a `BattleEnv`."""
+        assert len(controller.players) == 2
+        sc = controller.state_controller
+        return self.solve([p.cards for p in controller.players], controller.players.index(player), sc.state_dict,
+                          controller.deck_controller.draw_pile, new_card=new_card)
+
+
+class EndgamePolicy(Policy):
+    # plays the solved move once the round is down to 2 players holding at most `max_hand_size` cards each
+    # (reading the hand of the other player), and the fallback policy otherwise;
+    # the get_color policy plays the color of the wildcard or draw4 solved by the get_play or play_new policy,
+    # so it must share their solver (see `make_endgame_policies`)
+    def __init__(self, atype, solver=None, fallback=None, max_hand_size=4):
+        assert isinstance(solver, EndgameSolver) or solver is None
+        assert isinstance(fallback, Policy) or fallback is None
+        assert isinstance(max_hand_size, int) and max_hand_size > 0
+        super().__init__(name="endgame", atype=atype, strategy=self.endgame_get_action)
+        assert solver is not None or self.atype != ActionType.GET_COLOR, \
+            "The Endgame get_color Policy Needs the Solver of the get_play and play_new Policies"
+        self.solver = EndgameSolver() if solver is None else solver
+        if fallback is None:
+            fallback = {ActionType.GET_PLAY: GreedyGetPlayPolicy,
+                        ActionType.GET_COLOR: GreedyGetColorPolicy,
+                        ActionType.PLAY_NEW: GreedyPlayNewPolicy}[self.atype]()
+        assert fallback.atype == self.atype
+        self.fallback = fallback
+        self.max_hand_size = max_hand_size
+        self.num_solved = 0
+
+    def get_state(self):
+        return {"solver_rng": self.solver.rng.get_state(), "fallback": self.fallback.get_state(),
+                "num_solved": self.num_solved}
+
+    def set_state(self, state):
+        self.solver.rng.set_state(state["solver_rng"])
+        self.fallback.set_state(state["fallback"])
+        self.num_solved = state["num_solved"]
+
+    def _solve(self, **kwargs):
+        controller = kwargs.get("action_controller", None)
+        if controller is None or len(controller.players) != 2:
+            return None
+        if any([player.num_cards > self.max_hand_size for player in controller.players]):
+            return None
+        player = kwargs["current_player"]
+        new_card = kwargs["new_playable"] if self.atype == ActionType.PLAY_NEW else None
+        result = self.solver.solve_round(controller, player, new_card=new_card)
+        if result is None:
+            return None
+        self.num_solved += 1
+        if result.move is not None and result.move[1] is not None:
+            self.solver.colors[player] = result.move[1]
+        return result
+
+    def endgame_get_action(self, **kwargs):
+        if self.atype == ActionType.GET_COLOR:
+            color = self.solver.colors.pop(kwargs["current_player"], None)
+            return self.fallback.get_action(**kwargs) if color is None else color
+
+        result = self._solve(**kwargs)
+        if result is None:
+            return self.fallback.get_action(**kwargs)
+        if self.atype == ActionType.PLAY_NEW:
+            return result.move is not None
+        if result.move is None:
+            return None
+        for index, card in kwargs["playable_cards"]:
+            if card.card_id == result.move[0]:
+                return index, card
+        raise Exception("Solved Card Not Found in Playable Cards")
+
+
+class EndgameGetPlayPolicy(EndgamePolicy):
+    def __init__(self, solver=None, fallback=None, max_hand_size=4):
+        super().__init__(ActionType.GET_PLAY, solver=solver, fallback=fallback, max_hand_size=max_hand_size)
+
+
+class EndgameGetColorPolicy(EndgamePolicy):
+    def __init__(self, solver=None, fallback=None, max_hand_size=4):
+        super().__init__(ActionType.GET_COLOR, solver=solver, fallback=fallback, max_hand_size=max_hand_size)
+
+
+class EndgamePlayNewPolicy(EndgamePolicy):
+    def __init__(self, solver=None, fallback=None, max_hand_size=4):
+        super().__init__(ActionType.PLAY_NEW, solver=solver, fallback=fallback, max_hand_size=max_hand_size)
+
+
+def make_endgame_policies(solver=None, max_hand_size=4):
+    """The get_play, get_color and play_new endgame policies around one solver, as keyword arguments of
+    `PolicyPlayer`; the colors solved with the plays only reach the get_color policy through the shared solver."""
+    solver = EndgameSolver() if solver is None else solver
+    return {"get_play": EndgameGetPlayPolicy(solver=solver, max_hand_size=max_hand_size),
+            "get_color": EndgameGetColorPolicy(solver=solver, max_hand_size=max_hand_size),
+            "play_new": EndgamePlayNewPolicy(solver=solver, max_hand_size=max_hand_size)}
@@ -0,0 +1,168 @@
+from ..card import CardType, num_card_ids
+
+
+_num_colors = 4
+_num_ranks = 13
+_wild_id = 52
+_draw_four_id = 53
+_reverse_rank, _skip_rank, _draw_two_rank = 10, 11, 12
+
+
+class HandIndex(object):
+    # card-id counts of the hand of a player, kept up to date through the hand listeners of the player,
+    # so that the best score the player could play after a given card is an O(1) lookup;
+    # with info_probability < 1, only a random subset of round(n * info_probability) cards is visible,
+    # which is redrawn once per change of the hand instead of once per query (with rng, or the one of the player)
+    def __init__(self, player, info_probability=1, rng=None):
+        assert 0 <= info_probability <= 1
+        self.player = player
+        self.info_probability = info_probability
+        self.rng = rng
+        self.counts = [0] * num_card_ids
+        self.num_visible = 0
+        self._visible_cards = []
+        self._dirty = True  # the visible cards need to be redrawn
+        self._tables = None  # summaries of the counts, built on the first query after a change
+        player.add_hand_listener(self)
+
+    def __repr__(self):
+        return "HandIndex(player={}, num_visible={})".format(self.player.name, self.num_visible)
+
+    def __str__(self):
+        return "HandIndex(player={}, num_visible={})".format(self.player.name, self.num_visible)
+
+    @property
+    def is_masked(self):
+        return self.info_probability < 1
+
+    # ==============
+    # hand listeners
+    # ==============
+    def on_cards_added(self, cards):
+        if self.is_masked or self._dirty:
+            self._dirty = True
+            return
+        for card in cards:
+            self.counts[card.card_id] += 1
+        self.num_visible += len(cards)
+        self._tables = None
+
+    def on_card_removed(self, card):
+        if self.is_masked or self._dirty:
+            self._dirty = True
+            return
+        self.counts[card.card_id] -= 1
+        self.num_visible -= 1
+        self._tables = None
+
+    def on_cards_cleared(self):
+        self.counts = [0] * num_card_ids
+        self.num_visible = 0
+        self._visible_cards = []
+        self._dirty = False
+        self._tables = None
+
+    # =======
+    # refresh
+    # =======
+    def _hand(self):
+        return self.player.cards
+
+    def _redraw(self):
+        cards = self._hand()
+        if self.is_masked:
+            # same subset semantics as ColludingPolicy.keep_by_probability, order of the hand preserved
+            kept_num = round(len(cards) * self.info_probability)
+            rng = self.player.rng if self.rng is None else self.rng
+            kept_indices = sorted(rng.sample(range(len(cards)), kept_num))
+            visible_cards = [cards[i] for i in kept_indices]
+            self._visible_cards = visible_cards
+        else:
+            visible_cards = cards
+            self._visible_cards = None  # the hand itself
+        self.counts = [0] * num_card_ids
+        for card in visible_cards:
+            self.counts[card.card_id] += 1
+        self.num_visible = sum(self.counts)
+        self._dirty = False
+        self._tables = None
+
+    def _build_tables(self):
+        counts = self.counts
+        max_num = [-1] * _num_colors  # highest number of each color, -1 for none
+        has_weak = [False] * _num_colors  # any reverse, skip or draw2 of each color
+        has_value = [False] * 10  # any number of each value
+        has_rank_any = [False] * _num_ranks  # any card of each rank, in any color
+        for color in range(_num_colors):
+            offset = color * _num_ranks
+            for rank in range(_num_ranks):
+                if counts[offset + rank] > 0:
+                    has_rank_any[rank] = True
+                    if rank < 10:
+                        has_value[rank] = True
+                        max_num[color] = rank
+                    else:
+                        has_weak[color] = True
+        best_color = [20 if has_weak[color] else max_num[color] for color in range(_num_colors)]
+        self._tables = (max_num, has_weak, has_value, has_rank_any, best_color,
+                        counts[_wild_id] > 0, counts[_draw_four_id] > 0)
+
+    def _refresh(self):
+        if self._dirty:
+            self._redraw()
+        if self._tables is None:
+            self._build_tables()
+        return self._tables
+
+    @property
+    def visible_cards(self):
+        if self._dirty:
+            self._redraw()
+        return self._hand() if self._visible_cards is None else self._visible_cards
+
+    # =======
+    # queries
+    # =======
+    # scores follow Player.filter_draw_four: a draw4 only counts if no number or weak action card is playable,
+    # None is returned if no card is playable
+    @staticmethod
+    def _combine(strict_best, wild_playable, has_draw_four):
+        if wild_playable:
+            return 50
+        elif strict_best >= 0:
+            return strict_best
+        elif has_draw_four:
+            return 50
+        return None
+
+    def best_number_followup(self, color, num):
+        """Best score playable after a number card of the given color and number."""
+        max_num, has_weak, has_value, has_rank_any, best_color, has_wild, has_draw_four = self._refresh()
+        strict_best = max(best_color[color.value - 1], num if has_value[num] else -1)
+        return self._combine(strict_best, has_wild, has_draw_four)
+
+    def best_color_followup(self, color):
+        """Best score among the cards of a color and the strong action cards."""
+        max_num, has_weak, has_value, has_rank_any, best_color, has_wild, has_draw_four = self._refresh()
+        return self._combine(best_color[color.value - 1], has_wild, has_draw_four)
+
+    def best_any_followup(self):
+        """Best score among all the cards, e.g. after a wildcard."""
+        max_num, has_weak, has_value, has_rank_any, best_color, has_wild, has_draw_four = self._refresh()
+        return self._combine(max(best_color), has_wild, has_draw_four)
+
+    def best_playable(self, color, value, ctype, to_draw):
+        """Best score playable in a play state."""
+        max_num, has_weak, has_value, has_rank_any, best_color, has_wild, has_draw_four = self._refresh()
+        if to_draw > 0:
+            strict_best = 20 if ctype == CardType.DRAW_2 and has_rank_any[_draw_two_rank] else -1
+            return self._combine(strict_best, False, has_draw_four)
+
+        strict_best = best_color[color.value - 1]
+        if 0 <= value <= 9 and has_value[value]:
+            strict_best = max(strict_best, value)
+        if ((ctype == CardType.REVERSE and has_rank_any[_reverse_rank]) or
+                (ctype == CardType.SKIP and has_rank_any[_skip_rank]) or
+                (ctype == CardType.DRAW_2 and has_rank_any[_draw_two_rank])):
+            strict_best = 20
+        return self._combine(strict_best, has_wild, has_draw_four)
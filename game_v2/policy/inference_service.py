@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from multiprocessing.connection import Listener, Client
+
+
+class InferenceService(object):
+    """Collect single-row model requests from many games or threads into batched predict calls.
+
+    A background thread waits for the first pending row, then keeps collecting rows until
+    `max_batch_size` rows are pending or `max_latency` seconds have passed since the first one,
+    runs `predict_fn` once on the stacked rows and hands each caller its own row of scores.
+
+    Parameters
+    ----------
+    predict_fn: callable
+        Maps a matrix of n feature rows to a matrix of n score rows, e.g. `ModelPolicy.predict_rows`.
+
+    max_batch_size: int
+        Maximum number of rows per predict call.
+
+    max_latency: float
+        Maximum number of seconds the first row of a batch waits for others to join.
+    """
+    def __init__(self, predict_fn, max_batch_size=256, max_latency=0.002):
+        assert callable(predict_fn)
+        assert isinstance(max_batch_size, int) and max_batch_size > 0
+        assert isinstance(max_latency, (int, float)) and max_latency >= 0
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.num_rows = 0
+        self.num_batches = 0
+        self._requests = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._work, name="InferenceService", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def avg_batch_size(self):
+        return float(self.num_rows) / self.num_batches if self.num_batches > 0 else 0.
+
+    def submit(self, row):
+        """Queue a single feature row, and return a Future of its scores."""
+        assert not self._closed, "Inference service is already closed"
+        future = Future()
+        self._requests.put((np.asarray(row).reshape(-1), future))
+        return future
+
+    def predict(self, row):
+        """Get the scores of a single feature row, blocking until its batch has been run."""
+        return self.submit(row).result()
+
+    def _collect(self):
+        first = self._requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.time() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.time()
+            try:
+                request = self._requests.get(block=timeout > 0, timeout=max(timeout, 0))
+            except queue.Empty:
+                break
+            if request is None:
+                self._requests.put(None)  # stop after this batch
+                break
+            batch.append(request)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            futures = [future for row, future in batch]
+            try:
+                scores = self.predict_fn(np.vstack([row for row, future in batch]))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.num_rows += len(batch)
+            self.num_batches += 1
+            for future, row_scores in zip(futures, scores):
+                future.set_result(row_scores)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(None)
+        self._thread.join()
+
+
+class InferenceServer(object):
+    """Serve an InferenceService over a local socket, so that games in other processes share its batches.
+
+    Each client connection is handled by its own thread, which forwards rows to the service;
+    rows from different connections are batched together.
+
+    Parameters
+    ----------
+    service: InferenceService
+        Service that runs the model.
+
+    address: string | tuple
+        Path of a unix socket (or a named pipe on Windows), or a (host, port) pair.
+
+    authkey: bytes | None
+        Key required from the clients.
+    """
+    def __init__(self, service, address, authkey=None):
+        assert isinstance(service, InferenceService)
+        self.service = service
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept, name="InferenceServer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                return  # listener closed
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    row = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(self.service.predict(row))
+                except Exception as e:
+                    conn.send(e)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.listener.close()
+
+
+class RemoteInferenceService(object):
+    """Client of an InferenceServer, with the same `predict` interface as InferenceService."""
+    def __init__(self, address, authkey=None):
+        self.conn = Client(address, authkey=authkey)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def predict(self, row):
+        with self._lock:
+            self.conn.send(np.asarray(row).reshape(-1))
+            scores = self.conn.recv()
+        if isinstance(scores, Exception):
+            raise scores
+        return scores
+
+    def close(self):
+        self.conn.close()
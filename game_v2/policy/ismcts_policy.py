@@ -0,0 +1,340 @@
+import math
+import time
+import multiprocessing
+from .base import Policy, ActionType
+from .greedy_policy import greedy_get_play, greedy_get_color, greedy_play_new
+from .determinization import DeterminizationSampler, determinize_snapshots
+from ..card import CardColor, unique_cards
+from ..player import Player, PlayerType
+from ..util import RandomService
+
+
+# Information-set Monte Carlo tree search (single observer): every iteration deals the cards the deciding player
+# cannot see again at random (see `DeterminizationSampler`), then plays the round out on a fork of the engine
+# (see `ActionController.fork`). The tree holds the decisions of the deciding player only, keyed by (kind, action);
+# the other players and the decisions out of the tree are played by the greedy strategies. The reward is 1 for a win
+# and 0 otherwise.
+
+_colors = [color for color in CardColor if color != CardColor.WILD]
+_block_size = 64  # determinizations sampled at once
+_action_types = {
+    ActionType.GET_PLAY: "get_play",
+    ActionType.GET_COLOR: "get_color",
+    ActionType.PLAY_NEW: "play_new"
+}
+
+
+def _option_keys(kind, options):
+    if kind == "get_play":
+        # not playing is allowed as well, identical cards are the same option
+        return list(dict.fromkeys([(kind, card.card_id) for index, card in options] + [(kind, None)]))
+    elif kind == "get_color":
+        return [(kind, color.value) for color in _colors]
+    return [(kind, True), (kind, False)]
+
+
+def _key_to_action(key, options):
+    kind, value = key
+    if kind == "get_play":
+        if value is None:
+            return None
+        for index, card in options:
+            if card.card_id == value:
+                return index, card
+        raise Exception("Searched Card Not Found in Playable Cards")
+    elif kind == "get_color":
+        return CardColor(value)
+    return value
+
+
+def _rollout_action(request):
+    if request.kind == "get_play":
+        return greedy_get_play(request.options)
+    elif request.kind == "get_color":
+        return greedy_get_color(cards=request.player.cards)
+    return greedy_play_new(request.options)
+
+
+class ISMCTSNode(object):
+    __slots__ = ("visits", "wins", "availability", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.wins = 0.
+        self.availability = 0  # number of times the action was legal when its parent was visited
+        self.children = {}
+
+    def __repr__(self):
+        return "ISMCTSNode(visits={}, wins={})".format(self.visits, self.wins)
+
+    def __str__(self):
+        return "ISMCTSNode(visits={}, wins={})".format(self.visits, self.wins)
+
+    def ucb(self, exploration):
+        return self.wins / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+    def select(self, keys, exploration, rng):
+        # child of the legal actions to follow, and whether it has just been added
+        unexpanded = [key for key in keys if key not in self.children]
+        if len(unexpanded) > 0:
+            key = rng.choice(unexpanded)
+            self.children[key] = ISMCTSNode()
+        else:
+            key = max(keys, key=lambda key: self.children[key].ucb(exploration))
+        for legal_key in keys:
+            child = self.children.get(legal_key, None)
+            if child is not None:
+                child.availability += 1
+        return key, len(unexpanded) > 0
+
+
+def _iter_continue(fork, kind, observer, action):
+    # the rest of the round after the root decision, which was pending when the snapshot was taken
+    if kind == "get_play":
+        yield from fork.iter_apply_play(observer, action)
+    elif kind == "get_color":
+        card = fork.deck_controller.used_pile[-1]
+        fork.state_controller.accept_card(card, observer, fork.flow_controller, color=action)
+    elif action:
+        yield from fork.iter_play_card(observer, (observer.num_cards - 1, observer.cards[-1]))
+    winner = yield from fork.iter_play_out()
+    return winner
+
+
+def _root_options(fork, kind, observer):
+    sc = fork.state_controller
+    if kind == "get_play":
+        return observer.get_playable(sc.current_color, sc.current_value, sc.current_type, sc.current_to_draw)
+    elif kind == "get_color":
+        return observer.cards
+    return observer.cards[-1]
+
+
+def _run_iteration(fork, determinized, observer_pos, kind, root, exploration, rng):
+    fork.restore(determinized)
+    observer = fork.players[observer_pos]
+    path = []
+    node = root  # None once out of the tree
+
+    def choose(request_kind, options):
+        nonlocal node
+        keys = _option_keys(request_kind, options)
+        key, expanded = node.select(keys, exploration, rng)
+        node = node.children[key]
+        path.append(node)
+        if expanded:
+            node = None
+        return _key_to_action(key, options)
+
+    decisions = _iter_continue(fork, kind, observer, choose(kind, _root_options(fork, kind, observer)))
+    try:
+        request = next(decisions)
+        while True:
+            if request.player is observer and node is not None:
+                action = choose(request.kind, request.options)
+            else:
+                action = _rollout_action(request)
+            request = decisions.send(action)
+    except StopIteration as stop:
+        winner = stop.value
+
+    reward = 1. if winner is observer else 0.
+    root.visits += 1
+    root.wins += reward
+    for node in path:
+        node.visits += 1
+        node.wins += reward
+
+
+def _search(fork, sample, observer_pos, kind, root, num_iterations, time_budget, exploration, rng):
+    # run iterations until the budget is spent, return their number;
+    # sample(n) gives n determinized snapshots, drawn in blocks
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    num_done = 0
+    determinized = []
+    while ((num_iterations is None or num_done < num_iterations) and
+           (deadline is None or time.perf_counter() < deadline)):
+        if len(determinized) == 0:
+            num_left = _block_size if num_iterations is None else min(_block_size, num_iterations - num_done)
+            determinized = sample(num_left)[::-1]
+        _run_iteration(fork, determinized.pop(), observer_pos, kind, root, exploration, rng)
+        num_done += 1
+    return num_done
+
+
+def _search_worker(args):
+    # root-parallel search in a worker process, on a round rebuilt from the card ids of the deck
+    deck_ids, snapshot, observer_pos, kind, num_iterations, time_budget, exploration, seed = args
+    from ..controller import ActionController  # deferred: the controllers import the players, which import policies
+    rng = RandomService(seed)
+    players = [Player(PlayerType.POLICY, "sim {}".format(pos), pos, stream=False)
+               for pos in range(len(snapshot.hands))]
+    fork = ActionController([unique_cards[card_id] for card_id in deck_ids], players,
+                            interval=0, stream=False, rng=rng).fork(1, snapshot=snapshot)[0]
+    root = ISMCTSNode()
+
+    def sample(num_samples):
+        return determinize_snapshots(snapshot, observer_pos, num_samples, rng.generator)
+
+    _search(fork, sample, observer_pos, kind, root, num_iterations, time_budget, exploration, rng)
+    return {key: (child.visits, child.wins) for key, child in root.children.items()}
+
+
+class ISMCTS(object):
+    # search shared by the policies of a player (or of several players), so that the subtree of the action taken
+    # is reused at the next decision of the same player in the same round;
+    # each decision runs `num_iterations` iterations and / or until `time_budget` seconds are spent,
+    # in `num_workers` processes (root parallelization: one tree per worker, merged by visits, not reused)
+    def __init__(self, num_iterations=500, time_budget=None, exploration=0.7, reuse_tree=True, num_workers=1,
+                 seed=None):
+        assert num_iterations is None or (isinstance(num_iterations, int) and num_iterations > 0)
+        assert time_budget is None or (isinstance(time_budget, (int, float)) and time_budget > 0)
+        assert num_iterations is not None or time_budget is not None
+        assert isinstance(exploration, (int, float)) and exploration >= 0
+        assert isinstance(reuse_tree, bool)
+        assert isinstance(num_workers, int) and num_workers > 0
+        self.num_iterations = num_iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self.num_workers = num_workers
+        self.rng = RandomService(seed)
+        self.trees = {}  # player -> (action controller and index of the round, node of the next decision)
+        self.samplers = {}  # player -> DeterminizationSampler of the current round
+        self.num_searches = 0
+        self.num_iterations_done = 0
+        self._pool = None
+
+    def __repr__(self):
+        return "ISMCTS(num_iterations={}, time_budget={}, num_workers={})".format(
+            self.num_iterations, self.time_budget, self.num_workers)
+
+    def __str__(self):
+        return "ISMCTS(num_iterations={}, time_budget={}, num_workers={})".format(
+            self.num_iterations, self.time_budget, self.num_workers)
+
+    def get_state(self):
+        return {"rng": self.rng.get_state(), "num_searches": self.num_searches,
+                "num_iterations_done": self.num_iterations_done}
+
+    def set_state(self, state):
+        self.rng.set_state(state["rng"])
+        self.num_searches = state["num_searches"]
+        self.num_iterations_done = state["num_iterations_done"]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _get_root(self, player, action_controller):
+        if self.reuse_tree and player in self.trees:
+            (tree_controller, round_index), node = self.trees[player]
+            if tree_controller is action_controller and round_index == action_controller.round_index and \
+                    node is not None:
+                return node
+        return ISMCTSNode()
+
+    def _get_sampler(self, player, action_controller):
+        sampler = self.samplers.get(player, None)
+        if sampler is None or sampler.action_controller is not action_controller:
+            if sampler is not None:
+                sampler.detach()
+            sampler = self.samplers[player] = DeterminizationSampler(action_controller, player, rng=self.rng)
+        return sampler
+
+    def _search_parallel(self, action_controller, snapshot, observer_pos, kind):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.num_workers)
+        num_iterations = None
+        if self.num_iterations is not None:
+            num_iterations = max(1, self.num_iterations // self.num_workers)
+        deck_ids = bytes([card.card_id for card in action_controller.deck_controller.deck])
+        tasks = [(deck_ids, snapshot, observer_pos, kind, num_iterations, self.time_budget, self.exploration,
+                  int(self.rng.randrange(2 ** 31))) for _ in range(self.num_workers)]
+        root = ISMCTSNode()
+        for stats in self._pool.map(_search_worker, tasks):
+            for key, (visits, wins) in stats.items():
+                child = root.children.setdefault(key, ISMCTSNode())
+                child.visits += visits
+                child.wins += wins
+                root.visits += visits
+                root.wins += wins
+        return root
+
+    def get_action(self, kind, **kwargs):
+        action_controller = kwargs.get("action_controller", None)
+        player = kwargs["current_player"]
+        if kind == "get_play":
+            options = kwargs["playable_cards"]
+        elif kind == "get_color":
+            options = kwargs.get("cards", [])
+        else:
+            options = kwargs["new_playable"]
+
+        # without the round (e.g. in BattleEnv), or for the color of an initial wildcard, play greedily
+        if action_controller is None or (kind == "get_color" and action_controller.deck_controller.used_pile_size == 0):
+            if kind == "get_play":
+                return greedy_get_play(options)
+            elif kind == "get_color":
+                return greedy_get_color(cards=options)
+            return greedy_play_new(options)
+
+        keys = _option_keys(kind, options)
+        snapshot = action_controller.snapshot()
+        observer_pos = action_controller.players.index(player)
+        if self.num_workers > 1:
+            root = self._search_parallel(action_controller, snapshot, observer_pos, kind)
+            self.num_iterations_done += root.visits
+        else:
+            root = self._get_root(player, action_controller)
+            fork = action_controller.fork(1, snapshot=snapshot, rng=self.rng)[0]
+            sampler = self._get_sampler(player, action_controller)
+
+            def sample(num_samples):
+                return sampler.sample_snapshots(num_samples, snapshot=snapshot)
+
+            self.num_iterations_done += _search(fork, sample, observer_pos, kind, root,
+                                                self.num_iterations, self.time_budget, self.exploration, self.rng)
+        self.num_searches += 1
+
+        # the most visited legal action, the first one if none was visited
+        best_key = max(keys, key=lambda key: root.children[key].visits if key in root.children else -1)
+        if self.reuse_tree and self.num_workers == 1:
+            self.trees[player] = ((action_controller, action_controller.round_index),
+                                  root.children.get(best_key, None))
+        return _key_to_action(best_key, options)
+
+
+class ISMCTSPolicy(Policy):
+    def __init__(self, atype, search=None):
+        assert isinstance(search, ISMCTS) or search is None
+        super().__init__(name="ismcts", atype=atype, strategy=self.ismcts_get_action)
+        self.search = ISMCTS() if search is None else search
+        self.kind = _action_types[self.atype]
+
+    def get_state(self):
+        # of the search, which may be shared by the policies of a player (it is then restored more than once)
+        return {"search": self.search.get_state()}
+
+    def set_state(self, state):
+        self.search.set_state(state["search"])
+
+    def ismcts_get_action(self, **kwargs):
+        return self.search.get_action(self.kind, **kwargs)
+
+
+class ISMCTSGetPlayPolicy(ISMCTSPolicy):
+    def __init__(self, search=None):
+        super().__init__(atype=ActionType.GET_PLAY, search=search)
+
+
+class ISMCTSGetColorPolicy(ISMCTSPolicy):
+    def __init__(self, search=None):
+        super().__init__(atype=ActionType.GET_COLOR, search=search)
+
+
+class ISMCTSPlayNewPolicy(ISMCTSPolicy):
+    def __init__(self, search=None):
+        super().__init__(atype=ActionType.PLAY_NEW, search=search)
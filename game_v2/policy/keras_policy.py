@@ -1,20 +1,48 @@
 from .base import ModelPolicy
-import keras as ks
+from .dense_network import DenseNetwork
+from ..feature import card_classes
 import os
 
 
 class KerasPolicy(ModelPolicy):
-    def __init__(self, name, atype, model, strategy, classmap):
+    # the model is either a keras model (or a path to one), or a DenseNetwork (or a path to its .npz file),
+    # keras is only imported for the former; without a classmap, a model with one output per card class
+    # is taken to score them in the order of `card_classes` (the get_play labels of the imitation data)
+    def __init__(self, name, atype, model, strategy=None, classmap=None):
         super().__init__(name, atype, model, strategy, classmap)
 
     def init_model(self, model, classmap):
-        if isinstance(model, ks.models.Model):
+        if isinstance(model, DenseNetwork):
             self.model = model
-        elif isinstance(model, str):
+        elif isinstance(model, str) and model.endswith(".npz"):
             assert os.path.exists(model)
-            self.model = ks.models.load_model(model)
-            assert isinstance(self.model, ks.models.Model)
+            self.model = DenseNetwork.load(model)
         else:
-            raise Exception("Unknown model for LRPolicy")
+            import keras as ks
+            if isinstance(model, ks.models.Model):
+                self.model = model
+            elif isinstance(model, str):
+                assert os.path.exists(model)
+                self.model = ks.models.load_model(model)
+                assert isinstance(self.model, ks.models.Model)
+            else:
+                raise Exception("Unknown model for KerasPolicy")
 
+        if classmap is None and self.output_dim == len(card_classes):
+            classmap = {name: i for i, name in enumerate(card_classes)}
         self.classmap = classmap  # class name (str) to index (int)
+
+    @property
+    def output_dim(self):
+        if isinstance(self.model, DenseNetwork):
+            return self.model.output_dim
+        return self.model.output_shape[-1]
+
+    def export_numpy(self, path):
+        """Save the Dense stack of the model to a .npz file loadable without keras, and return it."""
+        network = self.model if isinstance(self.model, DenseNetwork) else DenseNetwork.from_keras(self.model)
+        network.save(path)
+        return network
+
+    def predict_rows(self, rows):
+        return self.model.predict(rows)
@@ -1,12 +1,13 @@
 from .base import ModelPolicy
 from sklearn.linear_model import LogisticRegression
+import numpy as np
 import functools
 import pickle
 import os
 
 
 class LRPolicy(ModelPolicy):
-    def __init__(self, name, atype, model, strategy):
+    def __init__(self, name, atype, model, strategy=None):
         super().__init__(name, atype, model, strategy)
 
     def init_model(self, model, classmap):
@@ -21,3 +22,24 @@ class LRPolicy(ModelPolicy):
             raise Exception("Unknown model for LRPolicy")
 
         self.classmap = {cls: i for i, cls in enumerate(self.model.classes_)}  # class name (str) to index (int)
+
+        # extract the parameters once, so that scoring is a plain matrix-vector product
+        # without the per-call overhead of sklearn
+        coef = np.asarray(self.model.coef_, dtype=np.float64)
+        intercept = np.broadcast_to(np.asarray(self.model.intercept_, dtype=np.float64), (coef.shape[0],))
+        if coef.shape[0] == 1:
+            # binary case: sklearn predicts classes_[1] iff the decision function is positive
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.], intercept])
+        self.coef = np.ascontiguousarray(coef)
+        self.intercept = np.array(intercept)
+        self.classes = self.model.classes_
+
+    def predict_rows(self, rows):
+        # logits of all classes; the argmax agrees with sklearn's predict for both ovr and multinomial models,
+        # and so does the order of the classes with predict_proba
+        return np.asarray(rows @ self.coef.T) + self.intercept
+
+    def score_playable(self, row, class_indices):
+        # only the rows of the playable classes are needed
+        return self.coef[class_indices] @ row + self.intercept[class_indices]
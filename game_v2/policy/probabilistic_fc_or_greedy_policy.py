@@ -1,5 +1,5 @@
 from .base import Policy, ActionType
-from numpy.random import choice
+from ..util import get_random_service
 from .greedy_policy import greedy_get_play, greedy_get_color
 from .first_card_policy import first_card_get_play, first_card_get_color
 
@@ -7,12 +7,14 @@ from .first_card_policy import first_card_get_play, first_card_get_color
 def probabilistic_fc_or_greedy_get_play(playable_cards, **info):
     assert isinstance(playable_cards, list) and len(playable_cards) > 0
     fc_prob = info.get("fc_prob", 0.5)
-    return choice([first_card_get_play, greedy_get_play], p=[fc_prob, 1-fc_prob])(playable_cards, **info)
+    rng = get_random_service(info.get("rng", None))
+    return (first_card_get_play if rng.bernoulli(fc_prob) else greedy_get_play)(playable_cards, **info)
 
 
 def probabilistic_fc_or_greedy_get_color(**info):
     fc_prob = info.get("fc_prob", 0.5)
-    return choice([first_card_get_color, greedy_get_color], p=[fc_prob, 1-fc_prob])(**info)
+    rng = get_random_service(info.get("rng", None))
+    return (first_card_get_color if rng.bernoulli(fc_prob) else greedy_get_color)(**info)
 
 
 def probabilistic_fc_or_greedy_play_new(new_playable, **info):
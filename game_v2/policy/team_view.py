@@ -0,0 +1,66 @@
+from .hand_index import HandIndex
+
+
+class TeamView(object):
+    # state shared by the policies of a team of colluding players, of any size and seating:
+    # the hand index of each member (one per info probability) and, for each seat and direction,
+    # the teammate who plays next, all kept up to date as cards move
+    def __init__(self, players=()):
+        self.players = []
+        self.hand_indices = {}  # (player, info_probability) -> HandIndex
+        self._next_teammate = None  # (clockwise, seat) -> teammate, rebuilt when seats may have changed
+        for player in players:
+            self.add_player(player)
+
+    def __repr__(self):
+        return "TeamView(players={})".format([player.name for player in self.players])
+
+    def __str__(self):
+        return "TeamView(players={})".format([player.name for player in self.players])
+
+    @property
+    def size(self):
+        return len(self.players)
+
+    def is_member(self, player):
+        return (player, 1) in self.hand_indices
+
+    def add_player(self, player):
+        if self.is_member(player):
+            return
+        self.players.append(player)
+        self.hand_indices[(player, 1)] = HandIndex(player)
+        player.add_hand_listener(self)
+        self._next_teammate = None
+
+    def get_index(self, player, info_probability=1):
+        key = (player, info_probability)
+        if key not in self.hand_indices:
+            assert self.is_member(player)
+            self.hand_indices[key] = HandIndex(player, info_probability)
+        return self.hand_indices[key]
+
+    def _build_order(self):
+        # clockwise, the next teammate is the one of the smallest seat after the current one, wrapping around
+        seats = sorted(self.players, key=lambda player: player.idx)
+        self._next_teammate = {}
+        for i, player in enumerate(seats):
+            if len(seats) > 1:
+                self._next_teammate[(True, player.idx)] = seats[(i + 1) % len(seats)]
+                self._next_teammate[(False, player.idx)] = seats[i - 1]
+
+    def next_teammate(self, player, clockwise=True):
+        """Get the teammate who plays next after a member in turn order, None for a team of one."""
+        if self._next_teammate is None:
+            self._build_order()
+        return self._next_teammate.get((clockwise, player.idx), None)
+
+    # hand listener: seats only change between rounds, when hands are cleared
+    def on_cards_added(self, cards):
+        pass
+
+    def on_card_removed(self, card):
+        pass
+
+    def on_cards_cleared(self):
+        self._next_teammate = None
@@ -1,3 +1,6 @@
 from .performance import format_secs, format_memory, format_memory_diff
 from .performance import get_time_str, get_memory_bytes, get_memory_str
 from .performance import profiler
+from .checkpoint import atomic_save, atomic_write_json, AsyncCheckpointWriter
+from .random_service import RandomService, get_random_service
+from .stats import RunningStats, wilson_interval
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_temp_path(path) -> str:
+    """Get the sibling path used to stage an atomic write.
+
+    The extension is kept so that writers dispatching on it (e.g. `model.save`) still work.
+
+    Examples
+    --------
+    >>> make_temp_path("battle-dqn-001-best-wr-local.h5")
+    'battle-dqn-001-best-wr-local.tmp.h5'
+    """
+    root, ext = os.path.splitext(path)
+    return "{}.tmp{}".format(root, ext)
+
+
+def atomic_save(path, save_fn):
+    """Write a file atomically.
+
+    Parameters
+    ----------
+    path: string
+        Final destination of the file.
+
+    save_fn: callable
+        Function taking a single path argument and writing the whole file to it. It is given
+        a temporary sibling path, which replaces `path` only once `save_fn` has returned,
+        so readers never observe a partially written file.
+    """
+    assert callable(save_fn)
+    tmp_path = make_temp_path(path)
+    try:
+        save_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def atomic_write_json(obj, path, indent=2):
+    """Dump a json-serializable object to `path` atomically, indented for reading or on one line if `indent` is None."""
+    def save_fn(tmp_path):
+        # encoded at once rather than streamed by `json.dump`, which goes through the slow pure python encoder
+        text = json.dumps(obj, indent=indent, sort_keys=indent is not None,
+                          separators=None if indent is not None else (",", ":"))
+        with open(tmp_path, "w") as f:
+            f.write(text)
+    atomic_save(path, save_fn)
+
+
+class AsyncCheckpointWriter(object):
+    """Write checkpoints from a background thread.
+
+    The caller hands over an in-memory snapshot (e.g. the list returned by `model.get_weights()`),
+    so it can keep training while the file is written. If a path is submitted again before its
+    previous snapshot was written, only the latest snapshot is kept. Every written checkpoint is
+    recorded in an optional json manifest together with the metadata given on submission.
+
+    Parameters
+    ----------
+    save_fn: callable
+        `save_fn(snapshot, path)` writes a snapshot to a file. It is only ever called from the
+        writer thread, one checkpoint at a time.
+
+    manifest_path: string | None
+        Path of the json manifest. Existing entries are kept and updated.
+    """
+    def __init__(self, save_fn, manifest_path=None):
+        assert callable(save_fn)
+        assert manifest_path is None or isinstance(manifest_path, str)
+        self.save_fn = save_fn
+        self.manifest_path = manifest_path
+        self.manifest = {}
+        if manifest_path is not None and os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                self.manifest = json.load(f)
+
+        self.num_submitted = 0
+        self.num_written = 0
+        self.num_failed = 0
+        self.num_coalesced = 0
+        self.error = None
+
+        self._pending = OrderedDict()  # path -> (snapshot, meta)
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._work, name="AsyncCheckpointWriter", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def num_pending(self):
+        with self._cond:
+            return len(self._pending) + int(self._busy)
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def submit(self, path, snapshot, **meta):
+        """Queue a snapshot to be written to `path`, replacing any unwritten snapshot of the same path.
+
+        Keyword arguments (e.g. `episode=i, metric="window_win_rate", value=wr`) are stored
+        in the manifest entry of the checkpoint.
+        """
+        assert isinstance(path, str)
+        with self._cond:
+            assert not self._closed, "Checkpoint writer is already closed"
+            self._raise_error()
+            if path in self._pending:
+                del self._pending[path]  # move to the end, so the latest snapshot is written in order
+                self.num_coalesced += 1
+            self._pending[path] = (snapshot, meta)
+            self.num_submitted += 1
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while len(self._pending) == 0 and not self._closed:
+                    self._cond.wait()
+                if len(self._pending) == 0:
+                    return  # closed and drained
+                path, (snapshot, meta) = self._pending.popitem(last=False)
+                self._busy = True
+
+            error = None
+            try:
+                atomic_save(path, lambda tmp_path: self.save_fn(snapshot, tmp_path))
+                self._update_manifest(path, meta)
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                self._busy = False
+                if error is None:
+                    self.num_written += 1
+                else:
+                    self.num_failed += 1
+                    self.error = error
+                self._cond.notify_all()
+
+    def _update_manifest(self, path, meta):
+        if self.manifest_path is None:
+            return
+        entry = dict(meta)
+        entry["written_at"] = time.time()
+        self.manifest[os.path.basename(path)] = entry
+        atomic_write_json(self.manifest, self.manifest_path)
+
+    def flush(self):
+        """Block until all submitted snapshots are written."""
+        with self._cond:
+            while len(self._pending) > 0 or self._busy:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self):
+        """Write the remaining snapshots and stop the writer thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise_error()
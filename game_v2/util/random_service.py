@@ -0,0 +1,127 @@
+import numpy as np
+
+
+_default_random_service = None
+
+
+def get_random_service(rng=None):
+    """Get the given service, or a shared unseeded one for callers without a game-level service."""
+    global _default_random_service
+    if rng is not None:
+        return rng
+    if _default_random_service is None:
+        _default_random_service = RandomService()
+    return _default_random_service
+
+
+class RandomService(object):
+    """Cheap single random draws, served from blocks pre-drawn by a seeded NumPy generator.
+
+    A call like `np.random.choice([True, False], p=...)` costs microseconds of overhead for a single
+    number; here uniforms are drawn `block_size` at a time and handed out one by one, and the other
+    draws are derived from them. All draws of a game come from one service, so a seed makes it reproducible.
+
+    Parameters
+    ----------
+    seed: int | None
+        Seed of the underlying `numpy.random.Generator`, fresh entropy if None.
+
+    block_size: int
+        Number of uniforms drawn at once.
+
+    Examples
+    --------
+    >>> rng = RandomService(seed=0)
+    >>> rng.randrange(6) in range(6)
+    True
+    """
+    def __init__(self, seed=None, block_size=4096):
+        assert seed is None or isinstance(seed, (int, np.integer))
+        assert isinstance(block_size, int) and block_size > 0
+        self.seed = seed
+        self.block_size = block_size
+        self.generator = np.random.default_rng(seed)
+        self._block = []
+        self._pos = 0
+        self._block_state = None  # state of the generator before drawing the current block, see `get_state`
+
+    def __repr__(self):
+        return "RandomService(seed={})".format(self.seed)
+
+    def __str__(self):
+        return "RandomService(seed={})".format(self.seed)
+
+    def spawn(self):
+        """Get an independent service seeded from this one, e.g. one per game of a sweep."""
+        return RandomService(seed=int(self.generator.integers(2 ** 63)), block_size=self.block_size)
+
+    def get_state(self):
+        """Get the state of the service as a small json-serializable dict, to resume it with `set_state`.
+
+        The uniforms left in the current block are not stored: the block is drawn again from the state
+        the generator had before drawing it.
+        """
+        return {
+            "seed": None if self.seed is None else int(self.seed),
+            "block_size": self.block_size,
+            "generator": self.generator.bit_generator.state,
+            "block_state": self._block_state,
+            "pos": self._pos
+        }
+
+    def set_state(self, state):
+        assert state["block_size"] == self.block_size
+        self.seed = state["seed"]
+        self._block = []
+        self._pos = state["pos"]
+        self._block_state = state["block_state"]
+        if self._block_state is not None:
+            self.generator.bit_generator.state = self._block_state
+            self._block = self.generator.random(self.block_size).tolist()
+        self.generator.bit_generator.state = state["generator"]
+
+    def random(self):
+        """Get a uniform float in [0, 1)."""
+        if self._pos >= len(self._block):
+            self._block_state = self.generator.bit_generator.state
+            self._block = self.generator.random(self.block_size).tolist()
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+    def bernoulli(self, p):
+        """Get True with probability p."""
+        return self.random() < p
+
+    def randrange(self, n):
+        """Get a uniform integer in [0, n)."""
+        return min(int(self.random() * n), n - 1)
+
+    def choice(self, seq, p=None):
+        """Get a uniform element of a sequence, or one drawn with the given probabilities."""
+        if p is None:
+            return seq[self.randrange(len(seq))]
+        assert len(p) == len(seq)
+        u = self.random()
+        cumulative = 0.
+        for elem, prob in zip(seq, p):
+            cumulative += prob
+            if u < cumulative:
+                return elem
+        return seq[-1]  # rounding of the cumulative probabilities
+
+    def sample(self, population, k):
+        """Get k distinct elements of a sequence, in selection order (partial Fisher-Yates shuffle)."""
+        pool = list(population)
+        assert 0 <= k <= len(pool)
+        for i in range(k):
+            j = i + self.randrange(len(pool) - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+    def shuffle(self, lst):
+        """Shuffle a list in place (Fisher-Yates shuffle)."""
+        for i in range(len(lst) - 1, 0, -1):
+            j = self.randrange(i + 1)
+            lst[i], lst[j] = lst[j], lst[i]
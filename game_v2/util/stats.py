@@ -0,0 +1,131 @@
+import math
+
+
+def wilson_interval(num_successes, num_trials, z=1.96):
+    """Get the Wilson score interval of a proportion, e.g. a win rate.
+
+    Parameters
+    ----------
+    num_successes: int
+        Number of successes (e.g. wins).
+
+    num_trials: int
+        Number of trials (e.g. rounds).
+
+    z: float
+        Quantile of the standard normal distribution (1.96 for 95%).
+
+    Returns
+    -------
+    interval: tuple
+        Lower and upper bounds, (0., 1.) without any trial.
+
+    Examples
+    --------
+    >>> [round(bound, 4) for bound in wilson_interval(30, 100)]
+    [0.2189, 0.3959]
+    """
+    assert 0 <= num_successes <= num_trials
+    if num_trials == 0:
+        return 0., 1.
+    p = float(num_successes) / num_trials
+    denominator = 1 + z * z / num_trials
+    center = (p + z * z / (2 * num_trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / num_trials + z * z / (4 * num_trials * num_trials)) / denominator
+    return max(0., center - half_width), min(1., center + half_width)
+
+
+class RunningStats(object):
+    """Streaming count, mean, variance, min and max of a sequence of numbers in O(1) memory.
+
+    Values are pushed one at a time with Welford's update, and accumulators of disjoint sequences
+    (e.g. from parallel workers) are merged exactly with Chan's parallel formula.
+
+    Examples
+    --------
+    >>> stats = RunningStats.from_values([1, 2, 3])
+    >>> other = RunningStats.from_values([4, 5])
+    >>> stats.merge(other).mean, stats.variance, stats.min, stats.max
+    (3.0, 2.5, 1.0, 5.0)
+    """
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.  # sum of the squared differences to the mean
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def __repr__(self):
+        return "RunningStats(count={}, mean={}, std={}, min={}, max={})".format(
+            self.count, self.mean, self.std, self.min, self.max)
+
+    def __str__(self):
+        return "RunningStats(count={}, mean={}, std={}, min={}, max={})".format(
+            self.count, self.mean, self.std, self.min, self.max)
+
+    @staticmethod
+    def from_values(values):
+        stats = RunningStats()
+        for value in values:
+            stats.push(value)
+        return stats
+
+    def push(self, value):
+        """Add a value."""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add the values of another accumulator, in place, and return this one."""
+        assert isinstance(other, RunningStats)
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self):
+        return RunningStats().merge(self)
+
+    @property
+    def variance(self):
+        # sample variance
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def stderr(self):
+        return self.std / math.sqrt(self.count) if self.count > 0 else float("inf")
+
+    def confidence_interval(self, z=1.96):
+        """Normal confidence interval of the mean."""
+        return self.mean - z * self.stderr, self.mean + z * self.stderr
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @staticmethod
+    def from_dict(d):
+        stats = RunningStats()
+        stats.count, stats.mean, stats.m2, stats.min, stats.max = d["count"], d["mean"], d["m2"], d["min"], d["max"]
+        return stats
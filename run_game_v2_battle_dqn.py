@@ -1,3 +1,4 @@
+import os
 import random
 import logging
 import argparse
@@ -8,6 +9,7 @@ from keras.layers import Dense
 from keras.optimizers import Adam
 from keras.models import Sequential
 from game_v2 import *
+from game_v2.util import AsyncCheckpointWriter
 
 
 class DQNAgent:
@@ -33,6 +35,7 @@ class DQNAgent:
         self.memory = deque(maxlen=memory_size)
         self.model = self.build_model()
         self.target_model = self.build_model()
+        self.checkpoint_model = self.build_model()  # only touched by the checkpoint writer thread
         self.update_target_model()
 
     def build_model(self):
@@ -93,6 +96,13 @@ class DQNAgent:
     def save_model(self, name):
         self.model.save(name)
 
+    def snapshot_weights(self):
+        return [w.copy() for w in self.model.get_weights()]
+
+    def write_model(self, weights, name):
+        self.checkpoint_model.set_weights(weights)
+        self.checkpoint_model.save(name)
+
 
 if __name__ == "__main__":
     # parse arguments
@@ -110,10 +120,14 @@ if __name__ == "__main__":
     parser.add_argument('--episodes', type=int, default=1000)
     parser.add_argument('--state', type=str, default="1d_1")
     parser.add_argument('--reward', type=str, default="score_1")
+    parser.add_argument('--checkpoint_every', type=int, default=100)  # episodes, 0 for never
+    parser.add_argument('--resume', action='store_true')
     args = parser.parse_args()
     kwargs = OrderedDict(sorted(args._get_kwargs(), key=lambda x: x[0]))
 
     episodes = kwargs.pop('episodes')
+    checkpoint_every = kwargs.pop('checkpoint_every')
+    resume = kwargs.pop('resume')
 
     # initialize logger
     log_id = kwargs.pop('log_id')
@@ -127,6 +141,9 @@ if __name__ == "__main__":
 
     model_path_wr = 'battle-dqn-{:0>3}-best-wr-local.h5'.format(log_id)
     model_path_ar = 'battle-dqn-{:0>3}-best-ar-local.h5'.format(log_id)
+    manifest_path = 'battle-dqn-{:0>3}-checkpoints-local.json'.format(log_id)
+    model_path_last = 'battle-dqn-{:0>3}-last-local.h5'.format(log_id)
+    checkpoint_path = 'battle-dqn-{:0>3}-checkpoint-local.json'.format(log_id)
 
     # log hyper-parameters
     for k, v, in kwargs.items():
@@ -139,14 +156,30 @@ if __name__ == "__main__":
     state_size = env.state_space_dim
     action_size = env.action_space_dim
     agent = DQNAgent(state_size, action_size, **kwargs)
+    writer = AsyncCheckpointWriter(agent.write_model, manifest_path=manifest_path)
     wins = []
     rewards = []
     max_window_wr = -sys.maxsize - 1
     max_window_ar = -sys.maxsize - 1
+    start_episode = 0
+
+    # resume from the last checkpoint: the weights, the environment and the training loop are restored,
+    # the replay memory is not (it is filled again before training, see train_start)
+    if resume and os.path.exists(checkpoint_path):
+        training_state = env.load_checkpoint(checkpoint_path)
+        agent.load_weights(model_path_last)
+        agent.update_target_model()
+        agent.epsilon = training_state["epsilon"]
+        wins = training_state["wins"]
+        rewards = training_state["rewards"]
+        max_window_wr = training_state["max_window_wr"]
+        max_window_ar = training_state["max_window_ar"]
+        start_episode = training_state["episode"]
+        logger.info("Resumed at episode {}".format(start_episode))
 
     state, done = env.start_round()
 
-    for i in range(episodes):
+    for i in range(start_episode, episodes):
         reward = 0
 
         while not done:
@@ -185,19 +218,32 @@ if __name__ == "__main__":
 
         if window_wr > max_window_wr:
             max_window_wr = window_wr
-            agent.save_model(model_path_wr)
+            writer.submit(model_path_wr, agent.snapshot_weights(),
+                          episode=i, metric="window_win_rate", value=window_wr)
             msg += " (best wwr)"
         if window_ar > max_window_ar:
             max_window_ar = window_ar
-            agent.save_model(model_path_ar)
+            writer.submit(model_path_ar, agent.snapshot_weights(),
+                          episode=i, metric="window_avg_reward", value=window_ar)
             msg += " (best war)"
 
         logger.info(msg)
 
         if i < episodes - 1:
-            state, done = env.reset()
+            if checkpoint_every > 0 and (i + 1) % checkpoint_every == 0:
+                # between rounds, after the weights it refers to are written
+                env.end_round()
+                writer.submit(model_path_last, agent.snapshot_weights(), episode=i, metric="last")
+                writer.flush()
+                env.save_checkpoint(checkpoint_path, episode=i + 1, epsilon=agent.epsilon,
+                                    wins=wins[-100:], rewards=rewards[-100:],
+                                    max_window_wr=max_window_wr, max_window_ar=max_window_ar)
+                state, done = env.start_round()
+            else:
+                state, done = env.reset()
 
     env.end_round()
+    writer.close()
 
     logger.info("best window win rate: {}\nbest window avg reward: {}".format(
         round(max_window_wr, 2),
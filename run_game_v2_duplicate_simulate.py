@@ -0,0 +1,48 @@
+import pandas as pd
+import datetime
+import sys
+try:
+    from .game_v2 import *
+except (ModuleNotFoundError if sys.version_info >= (3, 6) else SystemError) as e:
+    from game_v2 import *
+
+
+if __name__ == "__main__":
+    # ==============
+    # target players
+    # ==============
+    target_players = [
+        (PlayerType.PC_FIRST_CARD, "PC_FIRSTCARD_1"),
+        (PlayerType.PC_RANDOM, "PC_RANDOM_1", dict(play_draw=1)),
+        (PlayerType.PC_RANDOM, "PC_RANDOM_2", dict(play_draw=.5)),
+        (PlayerType.PC_RANDOM, "PC_RANDOM_3", dict(play_draw=0))
+    ]
+    baseline_player = (PlayerType.PC_GREEDY, "PC_GREEDY_1")
+    opponent_player = (PlayerType.PC_GREEDY, "NPC")
+
+    # ===================
+    # records preparation
+    # ===================
+    num_deals = 1000  # each played at every seat by every target player
+    final_csv_name = "duplicate_simulation_{}deals_{}".format(num_deals,
+                                                               datetime.datetime.today().strftime('%Y%m%d%H%M%S'))
+    out_path = "{}.csv".format(final_csv_name)
+    rows = []
+
+    # ===========
+    # other setup
+    # ===========
+    min_num_players = 2
+    max_num_players = 10
+    deals = DealBank(num_deals, seed=0)  # the same deals for every target player
+
+    for num_players in range(min_num_players, max_num_players + 1):
+        evaluation = DuplicateEvaluation(deals)
+        for target_player_tup in [baseline_player] + target_players:
+            print("Testing {} ({} players)...".format(target_player_tup[1], num_players))
+            evaluation.evaluate(target_player_tup[1], [target_player_tup] + [opponent_player] * (num_players - 1))
+
+        for row in evaluation.summary(baseline_player[1]):
+            row["num_players"] = num_players
+            rows.append(row)
+        pd.DataFrame(rows).to_csv(out_path, index=False)
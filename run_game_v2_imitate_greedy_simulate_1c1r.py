@@ -7,57 +7,14 @@ import sys
 from sklearn.linear_model import LogisticRegression
 try:
     from .game_v2 import *
+    from .game_v2.feature import encode_candidates
 except (ModuleNotFoundError if sys.version_info >= (3, 6) else SystemError) as e:
     from game_v2 import *
-
-
-shared_keys = ['color', 'to_draw', 'type', 'value', 'card_color', 'card_type', 'card_score']
-
-
-def append_state_to_dict(state, data_dict):
-    data_dict['color'].append(state['color'].value)
-    data_dict['type'].append(state['type'].value)
-    data_dict['to_draw'].append(state['to_draw'])
-    data_dict['value'].append(state['value'])
-
-
-def append_card_info_to_dict(available_card, data_dict):
-    data_dict['card_color'].append(available_card.color.value)
-    data_dict['card_type'].append(available_card.card_type.value)
-    data_dict['card_score'].append(available_card.score)
-
-
-def standardize_df(raw_df):
-    possibilities = ["color_{}".format(index) for index in range(1, 5)] + \
-                    ["card_color_{}".format(index) for index in range(5)] + \
-                    ["card_type_{}".format(index) for index in range(6)] + \
-                    ["type_{}".format(index) for index in range(6)] + ['card_score', 'to_draw', "value"]
-    differences = [key for key in possibilities if key not in raw_df.columns]
-    for key in differences:
-        raw_df.insert(0, key, int(0))
-    assert len([key for key in possibilities if key not in raw_df.columns]) == 0
-    return raw_df
-
-
-def transform_data_matrix(raw_df):
-    raw_df = pd.get_dummies(raw_df, columns=['color', 'card_color', 'card_type', 'type'])
-    raw_df = standardize_df(raw_df)
-    assert len(raw_df.columns) == 24
-    raw_df.sort_index(axis=1, inplace=True)
-
-    # convert to matrix
-    data = raw_df.values
-    return data
+    from game_v2.feature import encode_candidates
 
 
 def prepare_model_data(play_state, possible_cards):
-    data_dict = {key: [] for key in shared_keys}
-    for (_, playable_card) in possible_cards:
-        append_state_to_dict(play_state, data_dict)
-        append_card_info_to_dict(playable_card, data_dict)
-
-    data_df = pd.DataFrame.from_dict(data_dict)
-    return transform_data_matrix(data_df)
+    return encode_candidates(play_state, possible_cards)
 
 
 class LRPolicy(Policy):
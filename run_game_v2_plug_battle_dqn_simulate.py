@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import datetime
 import argparse
+import os
 from game_v2 import *
 
 
@@ -71,14 +72,24 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--log_id', '-i', type=int, required=True)
     parser.add_argument('--best', '-b', default="")
+    parser.add_argument('--engine', '-e', choices=["numpy", "keras"], default="numpy")
     kwargs = dict(parser.parse_args()._get_kwargs())
     log_id = kwargs.pop('log_id')
     best = kwargs.pop("best")
+    engine = kwargs.pop("engine")
     if best == "":
         model_path = 'battle-dqn-{:0>3}-local.h5'.format(log_id)
     else:
         model_path = 'battle-dqn-{:0>3}-best-{}-local.h5'.format(log_id, best)
 
+    # the numpy engine evaluates the exported Dense stack without keras, keras is only needed once to export it
+    if engine == "numpy":
+        npz_path = "{}.npz".format(os.path.splitext(model_path)[0])
+        if not os.path.exists(npz_path):
+            KerasPolicy(name="dqn_policy", atype="get_play", model=model_path,
+                        strategy=dqn_get_play, classmap=action_map).export_numpy(npz_path)
+        model_path = npz_path
+
     # =======
     # players
     # =======
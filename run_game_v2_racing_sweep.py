@@ -0,0 +1,50 @@
+import pandas as pd
+import datetime
+import sys
+try:
+    from .game_v2 import *
+except (ModuleNotFoundError if sys.version_info >= (3, 6) else SystemError) as e:
+    from game_v2 import *
+
+
+opponent_player = (PlayerType.PC_GREEDY, "NPC")
+
+
+def make_weighted_fc_players(num_players):
+    def make_players(fc_weight):
+        target = (PlayerType.POLICY, "WFC_GREEDY", dict(get_play=WeightedFCOrGreedyGetPlayPolicy(fc_weight),
+                                                        get_color=WeightedFCOrGreedyGetColorPolicy(fc_weight)))
+        return [target] + [opponent_player] * (num_players - 1)
+    return make_players
+
+
+def make_probabilistic_fc_players(num_players):
+    def make_players(fc_prob):
+        target = (PlayerType.POLICY, "PFC_GREEDY", dict(get_play=ProbabilisticFCOrGreedyGetPlayPolicy(fc_prob),
+                                                        get_color=ProbabilisticFCOrGreedyGetColorPolicy(fc_prob)))
+        return [target] + [opponent_player] * (num_players - 1)
+    return make_players
+
+
+if __name__ == "__main__":
+    ts = datetime.datetime.today().strftime('%Y%m%d%H%M%S')  # time string
+    out_path = "racing_sweep_{}.csv".format(ts)
+    sweeps = [
+        ("fc_weight", make_weighted_fc_players),
+        ("fc_prob", make_probabilistic_fc_players)
+    ]
+    values = [x / 10.0 for x in range(0, 11)]
+    rows = []
+
+    for param, make_players in sweeps:
+        for num_players in range(2, 11):
+            print("Racing {} ({} players)...".format(param, num_players))
+            sweep = RacingSweep(make_players(num_players), values, batch_rounds=100 * num_players,
+                                max_rounds=10000, seed=0)
+            best = sweep.run()
+            print("Best {}: {} after {} rounds in total".format(param, best, sweep.total_rounds))
+
+            for row in sweep.summary():
+                row.update({"param": param, "num_players": num_players})
+                rows.append(row)
+            pd.DataFrame(rows).to_csv(out_path, index=False)
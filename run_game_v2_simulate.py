@@ -32,6 +32,7 @@ if __name__ == "__main__":
     # other setup
     # ===========
     end_condition = GameEndCondition.ROUND_10000
+    num_rounds_per_seat = 10000
     min_num_players = 2
     max_num_players = 10
     num_backup_step = 3
@@ -41,19 +42,20 @@ if __name__ == "__main__":
         assert isinstance(target_player_tup, tuple)
 
         for num_players in range(min_num_players, max_num_players + 1):
+            print("Testing {} (all seats of {})...".format(target_player_tup[1], num_players))
 
-            for pos in range(num_players):
-                print("Testing {} ({}@{})...".format(target_player_tup[1], pos, num_players))
-
-                players = [opponent_player]*pos + [target_player_tup] + [opponent_player]*(num_players-1-pos)
-                game = Game(players=players, end_condition=end_condition, interval=0, verbose=False)
-                game.run()
+            # the target player moves one seat forward every round, num_rounds_per_seat rounds at each seat
+            players = [target_player_tup] + [opponent_player]*(num_players-1)
+            game = Game(players=players, end_condition=end_condition, interval=0, verbose=False,
+                        demo=num_rounds_per_seat * num_players, seat_rotation=1)
+            game.run()
 
-                # *** After game ***
-                target_player = game.players[pos]
-                assert isinstance(target_player, Player)
-                assert target_player.name == target_player_tup[1]
+            # *** After game ***
+            target_player = game.players[0]
+            assert isinstance(target_player, Player)
+            assert target_player.name == target_player_tup[1]
 
+            for pos in range(num_players):
                 # update records
                 # player_type | player_params | num_players | pos | num_wins | cum_rewards
                 row = {
@@ -61,13 +63,13 @@ if __name__ == "__main__":
                     cols[1]: target_player_tup[2] if len(target_player_tup) == 3 else "",
                     cols[2]: num_players,
                     cols[3]: pos,
-                    cols[4]: target_player.num_wins,
-                    cols[5]: target_player.cumulative_reward
+                    cols[4]: game.seat_num_wins[0, pos],
+                    cols[5]: game.seat_rewards[0, pos]
                 }
                 df = df.append(row, ignore_index=True)
-                # *** END ***
+            # *** END ***
 
-                print()
+            print()
             # backup current df
             # TODO: backup the whole df or just the part that has not been backuped yet?
             if num_players in num_backup_points: